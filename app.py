@@ -1,22 +1,42 @@
+import startup_profile
+
+# run_app.py --profile-startup: sunucu açılışı ile app.py importları ayrı aşamalar olarak ölçülür
+startup_profile.install()
+startup_profile.mark("Sunucu açılışı ve ilk tarayıcı bağlantısı (bekleme dahil)")
+
 import streamlit as st
-import json
-import requests
-import pandas as pd
 import time
-import threading
 import os
 import uuid
 from datetime import datetime
-from streamlit.runtime import get_instance
 from dataclasses import asdict
 
 # Kendi modüllerimiz
-from student_streamable import AIService, Config, FileHandler, StudentManager, Student, Grade, AIInsight
+from student_streamable import (AIService, Config, FileHandler, StudentManager, Student, Grade, AIInsight,
+                                VersionConflictError, SYSTEM_PROMPT, build_analysis_prompt)
+from autosave import get_autosaver
+from batch_analysis import get_batch_runner
+from stream_renderer import StreamRenderer
+from document_analysis import prepare_document
+from bulk_ingest import ingest_files, files_from_zip, files_from_folder
+from search_index import get_search_index
+from session_lifecycle import get_session_tracker, session_handle
+# pandas/pyarrow kullanan modüller (grade_import, grade_analytics, generation_metrics,
+# data_export) açılışı yavaşlatmaması için ilk kullanıldıkları yerde import edilir
+
+startup_profile.mark("app.py importları")
 
 # ---------------------------------------------------------
 # CONFIGURATION & SETUP
 # ---------------------------------------------------------
 manager = StudentManager()
+autosaver = get_autosaver(manager)
+batch_runner = get_batch_runner(manager)
+search_index = get_search_index(manager)
+session_tracker = get_session_tracker(autosaver)
+# Sunucu modunda tarayıcıdan sunucunun dosya sistemindeki yollar okunup yazılamaz
+LOCAL_PATHS_ALLOWED = Config.APP_MODE != "server"
+startup_profile.mark("Servis kurulumu")
 
 # Sayfa Ayarları
 st.set_page_config(
@@ -52,11 +72,14 @@ def initialize_session_state():
             "behavior": [],
             "observation": "",
             "file_content": "",
-            "ai_insights": []
+            "ai_insights": [],
+            "version": 0
         },
+        # Otomatik kayıt anahtarı oturuma özgüdür; aynı öğrenciyi açan oturumlar birbirini ezmez
+        "session_token": uuid.uuid4().hex,
         "course_list": ["Matematik", "Türkçe", "Fen Bilimleri", "Sosyal Bilgiler"],
         "last_ai_response": "",
-        "watcher_thread_started": False,
+        "last_ai_stats": {},
         "pending_student_selector": None,
         "student_selector": None
     }
@@ -72,6 +95,11 @@ initialize_session_state()
 # ---------------------------------------------------------
 # HELPER FUNCTIONS
 # ---------------------------------------------------------
+def form_key(data):
+    """Formun otomatik kayıt anahtarı (oturum + öğrenci)."""
+    return f"{st.session_state.session_token}:{data['id']}"
+
+
 def reset_form():
     """Formu temizler."""
     st.session_state.form_data = {
@@ -82,7 +110,8 @@ def reset_form():
         "behavior": [],
         "observation": "",
         "file_content": "",
-        "ai_insights": []
+        "ai_insights": [],
+        "version": 0
     }
 
     for course in st.session_state.course_list:
@@ -90,6 +119,7 @@ def reset_form():
         st.session_state.pop(f"check_{course}", None)
 
     st.session_state.student_selector = None
+    st.session_state.pop("student_selector_widget", None)
     st.session_state.last_ai_response = ""
 
 
@@ -99,7 +129,7 @@ def load_student_to_form(student_obj):
 
     # AI Analizlerini Dict formatına çevir
     insights_list = [
-        {"analysis": i.analysis, "model": i.model, "date": i.date}
+        {"analysis": i.analysis, "model": i.model, "date": i.date, "stats": i.stats}
         for i in student_obj.ai_insights
     ]
 
@@ -111,7 +141,8 @@ def load_student_to_form(student_obj):
         "behavior": [],
         "observation": "",
         "file_content": student_obj.file_content,
-        "ai_insights": insights_list
+        "ai_insights": insights_list,
+        "version": student_obj.version
     }
 
     # Ders listesini güncelle
@@ -132,80 +163,88 @@ def load_student_to_form(student_obj):
             st.session_state[check_key] = False
 
     st.session_state.last_ai_response = ""
+    # Diskten yeni gelen form tekrar kaydedilmesin
+    autosaver.mark_saved(form_key(st.session_state.form_data), st.session_state.form_data)
 
 
-def save_current_form(update_ui=False):
-    """Formdaki veriyi kaydeder."""
-    data = st.session_state.form_data
-    if not data["name"]:
-        if update_ui:
-            st.error("❌ Öğrenci adı girmediniz!")
-        return False
-
+def form_to_student(data):
+    """Form sözlüğünden kaydedilecek Student nesnesini oluşturur."""
     # Grade objelerini oluştur
     grade_objs = [Grade(subject=k, score=v) for k, v in data["notes"].items()]
 
     # AI Analizlerini geri obje formatına çevir
     ai_objs = [
-        AIInsight(analysis=i["analysis"], model=i["model"], date=i["date"])
+        AIInsight(analysis=i["analysis"], model=i["model"], date=i["date"], stats=i.get("stats", {}))
         for i in data["ai_insights"]
     ]
 
-    student = Student(
+    return Student(
         id=data["id"],
         name=data["name"],
         class_name=data["class_name"],
         grades=grade_objs,
         file_content=data["file_content"],
-        ai_insights=ai_objs
+        ai_insights=ai_objs,
+        version=data.get("version", 0)
     )
 
+
+def save_current_form(update_ui=False, force=False):
+    """Formdaki veriyi hemen (senkron) kaydeder.
+
+    force=True, kayıt başka bir oturumda değişmiş olsa da formdaki hali yazar.
+    """
+    data = st.session_state.form_data
+    if not data["name"]:
+        if update_ui:
+            st.error("❌ Öğrenci adı girmediniz!")
+        return False
+
     try:
-        manager.save_student(student)
+        student = autosaver.save_now(form_key(data), data, form_to_student, force=force)
         if update_ui:
-            display_name = f"{student.name} ({student.class_name})"
-            st.session_state.pending_student_selector = display_name
+            st.session_state.pending_student_selector = student.id
         return True
+    except VersionConflictError:
+        if update_ui:
+            st.error("⚠️ Bu öğrenci başka bir oturumda değiştirildi, kayıt yapılmadı.")
+        return False
     except Exception as e:
         if update_ui:
             st.error(f"Kaydetme hatası: {str(e)}")
         return False
 
 
+def absorb_merged_changes():
+    """Kayıt sırasında başka oturumlardan katılan analiz ve notları forma ekler.
+
+    Not alanları bu fonksiyondan sonra çizildiği için widget durumları da
+    güncellenir; aksi halde işaretsiz kalan ders notu bir sonraki kayıtta silinirdi.
+    """
+    data = st.session_state.form_data
+    insights, grades = autosaver.take_merged(form_key(data))
+    for insight in insights:
+        insight_dict = {"analysis": insight.analysis, "model": insight.model, "date": insight.date,
+                        "stats": insight.stats}
+        if insight_dict not in data["ai_insights"]:
+            data["ai_insights"].append(insight_dict)
+    for grade in grades:
+        if grade.subject in data["notes"]:
+            continue
+        data["notes"][grade.subject] = grade.score
+        if grade.subject not in st.session_state.course_list:
+            st.session_state.course_list.append(grade.subject)
+        st.session_state[f"check_{grade.subject}"] = True
+        st.session_state[f"grade_{grade.subject}"] = grade.score
+
+
+absorb_merged_changes()
+
 # ---------------------------------------------------------
-# WATCHDOG (OTOMATİK KAYITÇI)
+# OTURUM YAŞAM DÖNGÜSÜ
 # ---------------------------------------------------------
-def browser_watcher():
-    """Tarayıcı kapanırsa verileri otomatik kaydeder."""
-    time.sleep(5)
-
-    while True:
-        try:
-            runtime = get_instance()
-            active_sessions = 1
-
-            if runtime:
-                # Farklı Streamlit sürümleri için uyumluluk
-                for attr in ["_client_mgr", "_session_mgr", "_session_manager"]:
-                    if hasattr(runtime, attr):
-                        manager = getattr(runtime, attr)
-                        active_sessions = len(manager.list_active_sessions())
-                        break
-
-                if active_sessions == 0:
-                    # Session state'e doğrudan erişmek yerine daha güvenli bir yöntem
-                    print("Tarayıcı kapatıldı, otomatik kayıt yapılıyor...")
-                    os._exit(0)
-        except Exception as e:
-            print(f"Watchdog hatası: {e}")
-        time.sleep(2)
-
-
-# Thread başlat (sadece bir kez)
-if not st.session_state.watcher_thread_started:
-    t = threading.Thread(target=browser_watcher, daemon=True)
-    t.start()
-    st.session_state.watcher_thread_started = True
+# Oturum kapanınca bekleyen kayıtlar yazılır; masaüstü modunda son oturumla uygulama da kapanır
+st.session_state.session_handle = session_handle(st.session_state.session_token)
 
 # ---------------------------------------------------------
 # SIDEBAR
@@ -218,41 +257,111 @@ with st.sidebar:
         st.rerun()
 
     st.markdown("---")
-    st.subheader("📋 Kayıtlı Liste")
+    search_query = st.text_input("🔎 Ödev ve analizlerde ara", key="search_query",
+                                 placeholder="ör. kesirler, dikkat")
+    if search_query.strip():
+        # Sonuçlar sorgu ve dizin sürümüyle saklanır; sorgu aynıyken diğer
+        # etkileşimlerin tetiklediği rerun'lar aramayı tekrarlamaz
+        search_index.sync()
+        search_key = (search_query, search_index.generation)
+        if st.session_state.get("search_key") != search_key:
+            st.session_state.search_key = search_key
+            st.session_state.search_hits = search_index.search(search_query)
+        search_hits = st.session_state.search_hits
+        if not search_hits:
+            st.caption("Sonuç bulunamadı.")
+        for hit in search_hits:
+            if st.button(f"{hit.student.display_name} · {hit.kind}", key=f"search_hit_{hit.student.id}"):
+                student = manager.load_student(hit.student.id)
+                if student:
+                    load_student_to_form(student)
+                    st.session_state.pending_student_selector = hit.student.id
+                    st.rerun()
+            st.caption(hit.label)
 
-    saved_students = manager.get_all_students()
+    st.markdown("---")
+    st.subheader("📋 Kayıtlı Liste")
 
-    if not saved_students:
-        st.info("Henüz kayıtlı öğrenci yok.")
+    # Liste sınıf ve isim başına göre süzülür, her seferinde tek bir sayfa çizilir
+    f_class, f_prefix = st.columns(2)
+    list_class = f_class.selectbox("Sınıf", ["Tümü"] + manager.list_classes(), key="sidebar_class")
+    list_prefix = f_prefix.text_input("İsim başı", key="sidebar_prefix").strip()
+    class_filter = None if list_class == "Tümü" else list_class
+
+    # Süzgeç değişince ilk sayfaya dönülür; radyo düğmesi yeni seçeneklerle sıfırdan kurulur
+    if st.session_state.get("sidebar_filter") != (class_filter, list_prefix):
+        st.session_state.sidebar_filter = (class_filter, list_prefix)
+        st.session_state.sidebar_page = 0
+        st.session_state.pop("student_selector_widget", None)
+
+    total_students = manager.count_summaries(class_name=class_filter, name_prefix=list_prefix or None)
+    page_count = max((total_students - 1) // Config.SIDEBAR_PAGE_SIZE + 1, 1)
+    # Kayıt silinince sayfa aralık dışında kalabilir
+    page = min(st.session_state.get("sidebar_page", 0), page_count - 1)
+    page_students = manager.list_summaries(class_name=class_filter, name_prefix=list_prefix or None,
+                                           offset=page * Config.SIDEBAR_PAGE_SIZE, limit=Config.SIDEBAR_PAGE_SIZE)
+
+    if not page_students:
+        st.info("Henüz kayıtlı öğrenci yok." if not (class_filter or list_prefix) else "Eşleşen öğrenci yok.")
     else:
-        student_names = [f"{s.name} ({s.class_name})" for s in saved_students]
+        # Seçim öğrenci kimliğiyle tutulur; aynı ad ve sınıftaki öğrenciler de ayrışır
+        page_index = {s.id: s for s in page_students}
+        page_ids = list(page_index)
 
-        # Pending selection varsa uygula
+        # Pending selection varsa uygula (kayıt ya da arama sonucu açılan öğrenci)
         if st.session_state.pending_student_selector:
             st.session_state.student_selector = st.session_state.pending_student_selector
             st.session_state.pending_student_selector = None
-
-        selected_name = st.radio(
+            # Radyo düğmesi eski seçimde kalırsa bir sonraki çalıştırmada o öğrenciyi geri yüklerdi
+            st.session_state.pop("student_selector_widget", None)
+
+        radio_args = {}
+        if "student_selector_widget" not in st.session_state:
+            radio_args["index"] = (page_ids.index(st.session_state.student_selector)
+                                   if st.session_state.student_selector in page_index else None)
+        selected_id = st.radio(
             "Düzenlemek için seçin:",
-            student_names,
-            index=student_names.index(
-                st.session_state.student_selector) if st.session_state.student_selector in student_names else None,
-            key="student_selector_widget"
+            page_ids,
+            format_func=lambda sid: page_index[sid].display_name,
+            key="student_selector_widget",
+            **radio_args
         )
 
-        if selected_name and selected_name != st.session_state.student_selector:
-            target = next((s for s in saved_students if f"{s.name} ({s.class_name})" == selected_name), None)
-            if target and st.session_state.form_data["id"] != target.id:
-                load_student_to_form(target)
+        if selected_id and selected_id != st.session_state.form_data["id"]:
+            # Tam kayıt sadece seçildiğinde diskten okunur
+            student = manager.load_student(selected_id)
+            if student:
+                load_student_to_form(student)
+                st.session_state.student_selector = selected_id
+                st.rerun()
+            else:
+                st.error("Öğrenci kaydı okunamadı.")
+
+        if page_count > 1:
+            p_prev, p_info, p_next = st.columns([1, 2, 1])
+            if p_prev.button("◀", disabled=page == 0, key="sidebar_prev"):
+                st.session_state.sidebar_page = page - 1
+                st.session_state.pop("student_selector_widget", None)
+                st.rerun()
+            p_info.caption(f"Sayfa {page + 1}/{page_count} · {total_students} öğrenci")
+            if p_next.button("▶", disabled=page >= page_count - 1, key="sidebar_next"):
+                st.session_state.sidebar_page = page + 1
+                st.session_state.pop("student_selector_widget", None)
                 st.rerun()
 
     st.markdown("---")
-    if st.button("🚪 KAYDET VE ÇIK", use_container_width=True):
-        if st.session_state.form_data["name"]:
-            save_current_form(update_ui=False)
-        st.success("Kapatılıyor...")
-        time.sleep(1)
-        os._exit(0)
+    if session_tracker.exit_when_idle:
+        if st.button("🚪 KAYDET VE ÇIK", use_container_width=True):
+            if st.session_state.form_data["name"]:
+                save_current_form(update_ui=False)
+            autosaver.flush()
+            st.success("Kapatılıyor...")
+            time.sleep(1)
+            os._exit(0)
+    else:
+        # Sunucu modunda uygulama diğer öğretmenler için açık kalır
+        st.caption(f"🖥️ Sunucu modu · {session_tracker.active_sessions} açık oturum. "
+                   "Sekmeyi kapatabilirsiniz; değişiklikler otomatik kaydedilir.")
 
 # ---------------------------------------------------------
 # ANA EKRAN
@@ -273,9 +382,26 @@ with col_info:
     else:
         st.warning("Yeni Öğrenci Girişi")
 
+# Sürüm çakışması: kayıt bu form açıldıktan sonra başka bir oturumda değişti
+if autosaver.has_conflict(form_key(st.session_state.form_data)):
+    st.error("⚠️ Bu öğrenci siz düzenlerken başka bir oturumda değiştirildi. Değişiklikleriniz kaydedilmedi; "
+             "otomatik kayıt siz seçim yapana kadar durduruldu.")
+    c_reload, c_force = st.columns(2)
+    if c_reload.button("🔄 Güncel hali yükle (değişikliklerim silinir)", key="conflict_reload"):
+        current = manager.load_student(st.session_state.form_data["id"])
+        if current is not None:
+            load_student_to_form(current)
+            st.rerun()
+        st.warning("Kayıt silinmiş; formdaki hali kaydederek yeniden oluşturabilirsiniz.")
+    if c_force.button("💾 Benim halimle üzerine yaz", key="conflict_force"):
+        if save_current_form(update_ui=True, force=True):
+            st.toast(f"✅ {st.session_state.form_data['name']} kaydedildi!", icon="🎉")
+            st.rerun()
+
 st.markdown("---")
 
-tab1, tab2, tab3 = st.tabs(["📝 KİMLİK & NOTLAR", "📄 ÖDEV DOSYASI", "🤖 YAPAY ZEKA"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📝 KİMLİK & NOTLAR", "📄 ÖDEV DOSYASI", "🤖 YAPAY ZEKA", "📊 PERFORMANS",
+                                        "📈 SINIF ANALİZİ"])
 
 with tab1:
     col1, col2 = st.columns(2)
@@ -306,6 +432,35 @@ with tab1:
                 st.session_state.pop(f"grade_{del_c}", None)
                 st.rerun()
 
+    # Not alanları bu bölümden sonra çizildiği için içe aktarılan notlar forma hemen yansıtılabilir
+    with st.expander("📑 Toplu Not Yükle (CSV / Excel)"):
+        st.caption("e-Okul not çizelgesi: 'Adı Soyadı' (isteğe bağlı 'Sınıf') ve her ders için bir sütun.")
+        grade_sheet = st.file_uploader("Not çizelgesi", type=['csv', 'xlsx'], key="grade_sheet")
+        allow_new = st.checkbox("Listede olmayan dersleri ekle", key="grade_allow_new")
+
+        if st.button("📥 Notları İçe Aktar", disabled=grade_sheet is None):
+            from grade_import import read_grade_sheet, import_grades
+            try:
+                sheet = read_grade_sheet(grade_sheet.getvalue(), grade_sheet.name)
+                report = import_grades(manager, sheet, st.session_state.course_list, allow_new_subjects=allow_new)
+            except Exception as e:
+                st.error(f"Çizelge okunamadı: {e}")
+            else:
+                for subject in report.new_subjects:
+                    if subject not in st.session_state.course_list:
+                        st.session_state.course_list.append(subject)
+                if st.session_state.form_data["id"] in report.student_ids:
+                    current = manager.load_student(st.session_state.form_data["id"])
+                    if current is not None:
+                        load_student_to_form(current)
+
+                st.success(f"{report.students} öğrenci için {report.grades} not kaydedildi.")
+                if not report.errors.empty:
+                    st.warning(f"{len(report.errors)} hücre aktarılamadı:")
+                    st.dataframe(report.errors.rename(columns={
+                        "row": "Satır", "name": "Öğrenci", "subject": "Ders", "value": "Değer", "reason": "Sebep"
+                    }), use_container_width=True, hide_index=True)
+
     cols = st.columns(3)
     for i, course in enumerate(st.session_state.course_list):
         with cols[i % 3]:
@@ -344,6 +499,46 @@ with tab2:
             st.session_state.form_data["file_content"] = text
             st.success("Aktarıldı.")
 
+    with st.expander("📦 Toplu Ödev Yükle (klasör / ZIP)"):
+        st.caption("Dosyalar, adlarında geçen öğrenci adı ya da öğrenci kimliğiyle eşleştirilir.")
+        bulk_uploads = st.file_uploader("ZIP veya birden fazla dosya", type=['zip', 'pdf', 'docx', 'txt'],
+                                        accept_multiple_files=True, key="bulk_uploads")
+        bulk_folder = st.text_input("veya klasör yolu", key="bulk_folder") if LOCAL_PATHS_ALLOWED else ""
+
+        if st.button("📥 Toplu İçe Aktar", disabled=not (bulk_uploads or bulk_folder)):
+            bulk_files = []
+            for upload in bulk_uploads or []:
+                if upload.name.lower().endswith(".zip"):
+                    bulk_files.extend(files_from_zip(upload.getvalue()))
+                else:
+                    bulk_files.append((upload.name, upload.getvalue()))
+            if bulk_folder:
+                if os.path.isdir(bulk_folder):
+                    bulk_files.extend(files_from_folder(bulk_folder))
+                else:
+                    st.error(f"Klasör bulunamadı: {bulk_folder}")
+
+            if bulk_files:
+                with st.spinner(f"{len(bulk_files)} dosya okunuyor..."):
+                    started = time.perf_counter()
+                    results = ingest_files(manager, bulk_files)
+                    elapsed = time.perf_counter() - started
+
+                ok = [r for r in results if r.error is None]
+                st.success(f"{len(ok)}/{len(results)} dosya aktarıldı ({elapsed:.1f} sn).")
+                st.dataframe([
+                    {"Dosya": r.filename, "Öğrenci": r.student_name, "Karakter": r.chars,
+                     "Süre (sn)": round(r.seconds, 2), "Durum": r.error or "✅"}
+                    for r in results
+                ], use_container_width=True, hide_index=True)
+
+                # Açık formdaki öğrenciye dosya geldiyse otomatik kayıt eski metni geri yazmasın
+                if any(r.student_id == st.session_state.form_data["id"] for r in ok):
+                    current = manager.load_student(st.session_state.form_data["id"])
+                    if current is not None:
+                        st.session_state.form_data["file_content"] = current.file_content
+                        st.session_state.form_data["version"] = current.version
+
     if st.session_state.form_data["file_content"]:
         st.text_area("İçerik", value=st.session_state.form_data["file_content"][:2000] + "...", height=200,
                      disabled=True)
@@ -367,42 +562,74 @@ with tab3:
         model = st.selectbox("Model", models or ["llama3.2"])
         ai_service.configure("Ollama", model)
 
+        # Seçilen model arka planda belleğe alınır; ilk analiz soğuk yüklemeyi beklemez
+        ai_service.client.warm_up(model)
+        model_state = ai_service.client.model_state(model)
+        if model_state == "loaded":
+            st.caption(f"🟢 Model bellekte hazır (keep_alive: {Config.KEEP_ALIVE})")
+        elif model_state == "loading":
+            st.caption("⏳ Model belleğe yükleniyor... İlk analiz yükleme bitince hızlanır.")
+        elif model_state == "error":
+            st.caption("⚠️ Model ön yüklemesi başarısız oldu, ilk analizde yüklenecek.")
+
+        force_regenerate = st.checkbox("🔁 Yeniden üret (önbelleği kullanma)", value=False,
+                                       help="Aynı veriyle yapılmış önceki analiz varsa normalde anında getirilir.")
+
         if st.button("✨ Analizi Başlat", type="primary"):
             if not st.session_state.form_data["name"]:
                 st.error("İsim giriniz.")
             else:
                 data = st.session_state.form_data
-                prompt = f"""
-                ÖĞRENCİ: {data['name']} ({data['class_name']})
-                NOTLAR: {json.dumps(data['notes'], ensure_ascii=False)}
-                DAVRANIŞLAR: {', '.join(data['behavior'])}
-                ÖDEV: {data['file_content'][:2000]}
-                GÖREV: Detaylı analiz et, güçlü yönleri ve gelişim alanlarını belirle.
-                """
-                box = st.empty()
-                full_text = ""
-                for chunk in ai_service.generate_stream(prompt, "Eğitim koçusun."):
-                    full_text += chunk
-                    box.markdown(full_text + "▌")
-                box.markdown(full_text)
+                # Uzun ödevler bağlam penceresine sığacak parçalar halinde önce özetlenir
+                doc_progress = st.empty()
+                document = prepare_document(
+                    ai_service, data['file_content'], force=force_regenerate,
+                    progress=lambda done, total: doc_progress.progress(
+                        done / total, text=f"Ödev bölümleri özetleniyor: {done}/{total}")
+                )
+                doc_progress.empty()
+                prompt = build_analysis_prompt(data['name'], data['class_name'], data['notes'],
+                                               data['behavior'], document)
+                renderer = StreamRenderer(st.empty(), status=st.empty())
+                for chunk in ai_service.generate_stream(prompt, SYSTEM_PROMPT, force=force_regenerate):
+                    renderer.feed(chunk)
+                full_text = renderer.finish()
+                if ai_service.last_from_cache:
+                    st.caption("⚡ Bu analiz önbellekten getirildi. Yeni bir yanıt için 'Yeniden üret' seçin.")
 
                 # Sonucu geçici hafızaya al
                 st.session_state.last_ai_response = full_text
+                st.session_state.last_ai_stats = asdict(ai_service.last_stats) if ai_service.last_stats else {}
 
         # 3. ANALİZİ KAYDETME BUTONU
         if st.session_state.last_ai_response:
             st.divider()
             st.caption("Son üretilen analiz henüz kaydedilmedi.")
             if st.button("💾 Bu Analizi Kaydet"):
+                data = st.session_state.form_data
                 new_insight = {
                     "analysis": st.session_state.last_ai_response,
                     "model": model,
-                    "date": datetime.now().strftime("%Y-%m-%d %H:%M")
+                    "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                    "stats": st.session_state.last_ai_stats
                 }
+                # Form diskteki kayıtla aynıysa sadece analiz günlüğe eklenir
+                was_saved = autosaver.is_saved(form_key(data), data)
                 # Listeye ekle
-                st.session_state.form_data["ai_insights"].append(new_insight)
+                data["ai_insights"].append(new_insight)
                 # Anında diske yaz
-                if save_current_form(update_ui=False):
+                if was_saved:
+                    try:
+                        manager.append_insight(data["id"], AIInsight(**new_insight))
+                        autosaver.mark_saved(form_key(data), data)
+                        saved = True
+                    except Exception as e:
+                        print(f"Analiz eklenemedi, tam kayıt yapılıyor: {e}")
+                        saved = save_current_form(update_ui=False)
+                else:
+                    saved = save_current_form(update_ui=False)
+
+                if saved:
                     st.success("Rapor başarıyla kaydedildi!")
                 else:
                     st.error("Rapor kaydedilemedi!")
@@ -410,9 +637,155 @@ with tab3:
                 time.sleep(1)
                 st.rerun()
 
+        # 4. TOPLU SINIF ANALİZİ
+        st.divider()
+        with st.expander("📦 Toplu Sınıf Analizi"):
+            classes = manager.list_classes()
+            if not classes:
+                st.info("Önce öğrenci kaydedin.")
+            else:
+                batch_class = st.selectbox("Sınıf", classes, key="batch_class")
+                class_students = manager.list_summaries(class_name=batch_class)
+                batch_labels = {s.id: s.display_name for s in class_students}
+                batch_ids = st.multiselect("Öğrenciler", list(batch_labels), default=list(batch_labels),
+                                           format_func=lambda sid: batch_labels[sid], key="batch_students")
+                if st.button(f"🚀 {len(batch_ids)} Öğrenciyi Kuyruğa Al", disabled=not batch_ids):
+                    batch_runner.start(batch_ids, model, title=f"{batch_class} ({model})")
+                    st.toast("Toplu analiz başladı.", icon="📦")
+
+            jobs = batch_runner.list_jobs()
+            if jobs:
+                if st.button("🔄 Durumu Yenile"):
+                    st.rerun()
+            for job in jobs[:5]:
+                progress = batch_runner.progress(job.id)
+                finished = progress.done + progress.failed
+                st.markdown(f"**{job.title or job.id}** — {job.created} — `{progress.status}`")
+                st.progress(finished / progress.total if progress.total else 1.0,
+                            text=f"{finished}/{progress.total} öğrenci")
+                m1, m2, m3 = st.columns(3)
+                m1.metric("Hatalı", progress.failed)
+                m2.metric("Hız", f"{progress.throughput:.1f} öğr/dk")
+                m3.metric("Kalan Süre", f"{progress.eta / 60:.1f} dk" if progress.eta is not None else "—")
+
+                if batch_runner.is_running(job.id):
+                    if st.button("⏹ Durdur", key=f"batch_cancel_{job.id}"):
+                        batch_runner.cancel(job.id)
+                elif job.remaining or job.failed:
+                    if st.button("▶️ Devam Et", key=f"batch_resume_{job.id}"):
+                        batch_runner.resume(job.id)
+                        st.rerun()
+                for sid, err in list(job.failed.items())[:5]:
+                    st.caption(f"⚠️ {sid}: {err}")
+
     else:
         st.error("🔴 Ollama kapalı. Terminalde 'ollama serve' yazın.")
 
-# Anlık Veri Yedekleme
+with tab4:
+    st.subheader("📊 Model Performansı")
+    st.caption("Kayıtlı analizlerin Ollama ölçümlerinden hesaplanır; önbellekten gelen yanıtlar hariçtir.")
+
+    # Tüm kayıtları taramak maliyetli olduğu için sadece istenince hesaplanır
+    if st.checkbox("Panoyu göster", key="show_perf_dashboard"):
+        from generation_metrics import collect_generation_stats, summarize_by_model, daily_series
+        perf_df = collect_generation_stats(manager.get_all_students())
+        if perf_df.empty:
+            st.info("Henüz ölçüm içeren analiz yok.")
+        else:
+            p1, p2, p3 = st.columns(3)
+            p1.metric("Ölçülen Analiz", len(perf_df))
+            p2.metric("Ortalama Hız", f"{perf_df['tokens_per_second'].mean():.1f} token/sn")
+            p3.metric("Soğuk Yükleme", f"%{perf_df['cold_load'].mean() * 100:.0f}")
+
+            st.markdown("**Model Özeti**")
+            st.dataframe(summarize_by_model(perf_df), use_container_width=True)
+
+            st.markdown("**Üretim Hızı (token/sn, günlük ortalama)**")
+            st.line_chart(daily_series(perf_df, "tokens_per_second"))
+
+            st.markdown("**İstem İşleme Süresi (sn, günlük ortalama)**")
+            st.line_chart(daily_series(perf_df, "prompt_eval_seconds"))
+
+            st.markdown("**Soğuk Yükleme Oranı (günlük)**")
+            st.bar_chart(daily_series(perf_df, "cold_load"))
+
+with tab5:
+    st.subheader("📈 Sınıf ve Ders Analizi")
+    st.caption("Kayıtlı tüm notlardan hesaplanır; kaydedilen değişiklikler anında yansır.")
+
+    if st.checkbox("Panoyu göster", key="show_grade_dashboard"):
+        from grade_analytics import get_grade_analytics
+        grade_analytics = get_grade_analytics(manager)
+        grades_df = grade_analytics.table()
+        if grades_df.empty:
+            st.info("Henüz not girilmiş öğrenci yok.")
+        else:
+            f1, f2 = st.columns(2)
+            class_options = ["Tümü"] + sorted(grades_df["class_name"].unique().tolist())
+            selected_class = f1.selectbox("Sınıf", class_options, key="analytics_class")
+            class_filter = None if selected_class == "Tümü" else selected_class
+            selected_subject = f2.selectbox("Ders (dağılım)", sorted(grades_df["subject"].unique().tolist()),
+                                            key="analytics_subject")
+
+            scope = grades_df if class_filter is None else grades_df[grades_df["class_name"] == class_filter]
+            a1, a2, a3 = st.columns(3)
+            a1.metric("Öğrenci", scope["student_id"].nunique())
+            a2.metric("Not Sayısı", len(scope))
+            a3.metric("Genel Ortalama", f"{scope['score'].mean():.1f}")
+
+            st.markdown("**Ders Ortalamaları**")
+            st.bar_chart(grade_analytics.subject_means(class_filter))
+
+            st.markdown(f"**{selected_subject} Not Dağılımı**")
+            st.bar_chart(grade_analytics.distribution(selected_subject, class_filter))
+
+            st.markdown("**Sınıf / Ders İstatistikleri**")
+            st.dataframe(grade_analytics.class_subject_stats(class_filter), use_container_width=True)
+
+            st.markdown(f"**⚠️ Risk Altındaki Öğrenciler** (ortalama < {Config.AT_RISK_THRESHOLD} "
+                        f"ya da en az {Config.AT_RISK_MIN_FAILED} dersten kalan)")
+            st.dataframe(grade_analytics.at_risk(class_filter), use_container_width=True, hide_index=True)
+
+            st.markdown("**Aykırı Notlar** (sınıf/ders grubuna göre 1.5×IQR dışında)")
+            st.dataframe(grade_analytics.outliers(class_filter), use_container_width=True, hide_index=True)
+
+    with st.expander("📤 Dışa Aktar (Parquet / CSV)"):
+        export_dir = os.path.join(Config.DATA_DIR, Config.EXPORT_DIR)
+        if LOCAL_PATHS_ALLOWED:
+            export_dir = st.text_input("Çıktı klasörü", value=export_dir, key="export_dir")
+        else:
+            st.caption(f"Dosyalar sunucuda şu klasöre yazılır: {os.path.abspath(export_dir)}")
+        e1, e2 = st.columns(2)
+        if e1.button("Parquet (sınıf bazlı)"):
+            from data_export import export_parquet
+            try:
+                with st.spinner("Değişen sınıflar yazılıyor..."):
+                    export_report = export_parquet(manager, export_dir)
+                st.success(f"{len(export_report.written)} sınıf yazıldı, {len(export_report.unchanged)} sınıf "
+                           f"değişmediği için atlandı ({export_report.seconds:.1f} sn).")
+            except Exception as e:
+                st.error(f"Dışa aktarma başarısız: {e}")
+        if e2.button("CSV"):
+            from data_export import export_csv
+            try:
+                with st.spinner("CSV yazılıyor..."):
+                    export_report = export_csv(manager, export_dir)
+                st.success(f"{export_report.students} öğrenci yazıldı: {', '.join(export_report.written)} "
+                           f"({export_report.seconds:.1f} sn).")
+            except Exception as e:
+                st.error(f"Dışa aktarma başarısız: {e}")
+
+# Toplu analizin açık öğrenci için ürettiği sonuçlar forma eklenir; aksi halde
+# formun bir sonraki tam kaydı bu analizleri ezerdi
+for batch_insight in batch_runner.results_for(st.session_state.form_data["id"]):
+    batch_dict = {"analysis": batch_insight.analysis, "model": batch_insight.model, "date": batch_insight.date,
+                  "stats": batch_insight.stats}
+    if batch_dict not in st.session_state.form_data["ai_insights"]:
+        st.session_state.form_data["ai_insights"].append(batch_dict)
+
+# Anlık Veri Yedekleme: değişiklik varsa arka planda, kısa bir beklemeden sonra kaydedilir
 if st.session_state.form_data["name"]:
-    save_current_form(update_ui=False)
+    autosaver.submit(form_key(st.session_state.form_data), st.session_state.form_data, form_to_student)
+
+startup_profile.mark("İlk sayfa çizimi")
+startup_profile.report()
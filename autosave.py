@@ -0,0 +1,227 @@
+import atexit
+import copy
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from student_streamable import (AIInsight, Config, Grade, StudentManager, Student, VersionConflictError,
+                                insight_key)
+
+
+def state_hash(state: Dict) -> str:
+    """Form durumunun kararlı (anahtar sırasından bağımsız) özetini döndürür."""
+    raw = json.dumps(state, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class _PendingSave:
+    state: Dict
+    # Oturumdaki canlı form; kayıttan sonra yeni sürüm buraya yazılır
+    target: Dict
+    build: Callable[[Dict], Student]
+    digest: str
+    first_change: float
+    due: float
+
+
+class AutoSaver:
+    """Değişen formları biriktirip sessiz süre dolunca arka planda tek seferde kaydeder.
+
+    - Aynı içerik (hash) tekrar gönderilirse hiçbir şey yapılmaz.
+    - Arka arkaya gelen değişiklikler Config.AUTOSAVE_DELAY saniye boyunca
+      birleştirilir; sürekli yazım durumunda en geç AUTOSAVE_MAX_DELAY sonra kaydedilir.
+    - flush() bekleyen tüm kayıtları çağıran thread'de hemen diske yazar.
+    - Anahtar oturuma özgüdür; kayıt sürüm kontrollü yapılır. Formun sürümü
+      yalnızca kendi kayıtlarıyla ilerler; başka bir oturum kaydı değiştirdiyse
+      anahtar "çakışmalı" işaretlenir ve çözülene kadar otomatik kayıt durur.
+    - Kayıt sırasında formda olmayan, başka oturumlarca eklenmiş analiz/notlar
+      kayda katılır. Bunlar take_merged() ile forma alınana kadar sonraki
+      kayıtlara da eklenir; böylece form bir sonraki kayıtta onları silmez.
+    """
+
+    def __init__(self, manager: StudentManager, delay: float = Config.AUTOSAVE_DELAY,
+                 max_delay: float = Config.AUTOSAVE_MAX_DELAY):
+        self.manager = manager
+        self.delay = delay
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending: Dict[str, _PendingSave] = {}
+        self._saved: Dict[str, str] = {}
+        self._conflicts: Set[str] = set()
+        # Anahtar -> kayda katılmış ama henüz forma alınmamış (analizler, notlar)
+        self._merged: Dict[str, Tuple[List[AIInsight], List[Grade]]] = {}
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="autosave-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: str, state: Dict, build: Callable[[Dict], Student]) -> bool:
+        """Formu kayıt kuyruğuna alır. Değişiklik yoksa False döner."""
+        digest = state_hash(state)
+        now = time.monotonic()
+        with self._cond:
+            if key in self._conflicts:
+                return False
+            pending = self._pending.get(key)
+            if self._saved.get(key) == digest:
+                # Form diskteki haline geri döndüyse bekleyen kayda gerek yok
+                self._pending.pop(key, None)
+                return False
+            if pending is not None and pending.digest == digest:
+                return False
+
+            first_change = pending.first_change if pending else now
+            due = min(now + self.delay, first_change + self.max_delay)
+            self._pending[key] = _PendingSave(copy.deepcopy(state), state, build, digest, first_change, due)
+            self._cond.notify()
+        return True
+
+    def mark_saved(self, key: str, state: Dict) -> None:
+        """Başka bir yoldan (ör. manuel kayıt/yükleme) diskle eşitlenen formu işaretler."""
+        with self._cond:
+            self._saved[key] = state_hash(state)
+            self._pending.pop(key, None)
+            self._conflicts.discard(key)
+            self._merged.pop(key, None)
+
+    def take_merged(self, key: str) -> Tuple[List[AIInsight], List[Grade]]:
+        """Kayıt sırasında başka oturumlardan katılan analiz ve notları bir kez döndürür.
+
+        Çağıran bunları forma eklemelidir; aksi halde sonraki kayıtta kaybolurlar.
+        """
+        with self._cond:
+            return self._merged.pop(key, ([], []))
+
+    def has_conflict(self, key: str) -> bool:
+        """Son kayıt denemesi sürüm çakışmasıyla mı sonuçlandı?"""
+        with self._cond:
+            return key in self._conflicts
+
+    def save_now(self, key: str, state: Dict, build: Callable[[Dict], Student], force: bool = False) -> Student:
+        """Formu bekleyen otomatik kaydı beklemeden, çağıran thread'de kaydeder.
+
+        Çakışmada VersionConflictError fırlatılır; force=True diskteki kaydın
+        üzerine yazar.
+        """
+        with self._write_lock:
+            with self._cond:
+                self._pending.pop(key, None)
+            return self._save(key, state, state, build, force)
+
+    def is_saved(self, key: str, state: Dict) -> bool:
+        """Form diskteki kayıtla birebir aynı mı (bekleyen değişiklik yok mu)?"""
+        digest = state_hash(state)
+        with self._cond:
+            return key not in self._pending and self._saved.get(key) == digest
+
+    def has_pending(self, key: Optional[str] = None) -> bool:
+        with self._cond:
+            return bool(self._pending) if key is None else key in self._pending
+
+    def flush(self) -> int:
+        """Bekleyen tüm kayıtları hemen yazar; yazılan kayıt sayısını döndürür."""
+        return self._write()
+
+    def end_session(self, prefix: str) -> int:
+        """Oturumu biten anahtarların bekleyen kayıtlarını yazar ve durumlarını siler."""
+        with self._cond:
+            keys = [k for k in self._pending if k.startswith(prefix)]
+        written = self._write(keys)
+        with self._cond:
+            for key in [k for k in self._saved if k.startswith(prefix)]:
+                del self._saved[key]
+            self._conflicts = {k for k in self._conflicts if not k.startswith(prefix)}
+            for key in [k for k in self._merged if k.startswith(prefix)]:
+                del self._merged[key]
+        return written
+
+    def stop(self) -> None:
+        self.flush()
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _save(self, key: str, state: Dict, target: Dict, build: Callable[[Dict], Student],
+              force: bool = False) -> Student:
+        # Bu oturumun bir önceki kaydı sürümü ilerletmiş olabilir; kayıt onun üzerine yapılır
+        state["version"] = target.get("version", 0)
+        student = build(state)
+        form_insights = {insight_key(i) for i in student.ai_insights}
+        form_subjects = {g.subject for g in student.grades}
+        with self._cond:
+            carried = self._merged.get(key)
+        if carried:
+            # Önceki kayıtta katılıp forma henüz alınmamış olanlar bu kayıtta da korunur
+            student.merge_appended(*carried)
+        try:
+            self.manager.save_student(student, force=force)
+        except VersionConflictError:
+            with self._cond:
+                self._conflicts.add(key)
+                self._pending.pop(key, None)
+            raise
+        state["version"] = target["version"] = student.version
+        merged = ([i for i in student.ai_insights if insight_key(i) not in form_insights],
+                  [g for g in student.grades if g.subject not in form_subjects])
+        with self._cond:
+            self._saved[key] = state_hash(state)
+            self._conflicts.discard(key)
+            if merged[0] or merged[1]:
+                self._merged[key] = merged
+            else:
+                self._merged.pop(key, None)
+        return student
+
+    def _write(self, keys: Optional[List[str]] = None) -> int:
+        written = 0
+        with self._write_lock:
+            # Bekleyenler kilit altında alınır; save_now ile yarışan eski bir kopya yazılmaz
+            with self._cond:
+                batch = [(k, self._pending.pop(k)) for k in (list(self._pending) if keys is None else keys)
+                         if k in self._pending]
+            for key, item in batch:
+                try:
+                    self._save(key, item.state, item.target, item.build)
+                except VersionConflictError:
+                    continue
+                except Exception as e:
+                    print(f"Otomatik kayıt hatası ({key}): {e}")
+                    continue
+                written += 1
+        return written
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    if not self._pending:
+                        self._cond.wait()
+                        continue
+                    now = time.monotonic()
+                    next_due = min(p.due for p in self._pending.values())
+                    if next_due <= now:
+                        break
+                    self._cond.wait(next_due - now)
+
+                due_keys = [k for k, p in self._pending.items() if p.due <= now]
+            self._write(due_keys)
+
+
+_autosaver: Optional[AutoSaver] = None
+_autosaver_lock = threading.Lock()
+
+
+def get_autosaver(manager: Optional[StudentManager] = None) -> AutoSaver:
+    """Process genelinde tek bir AutoSaver (ve yazıcı thread) döndürür."""
+    global _autosaver
+    with _autosaver_lock:
+        if _autosaver is None:
+            _autosaver = AutoSaver(manager or StudentManager())
+            atexit.register(_autosaver.flush)
+        return _autosaver
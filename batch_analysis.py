@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import List, Optional, Dict
+
+from document_analysis import prepare_document
+from student_streamable import (Config, AIService, AIInsight, StudentManager, SYSTEM_PROMPT,
+                                build_analysis_prompt)
+
+
+@dataclass
+class BatchJob:
+    """Diskte saklanan toplu analiz işi; uygulama yeniden başlarsa kaldığı yerden sürer."""
+    id: str
+    model: str
+    student_ids: List[str]
+    title: str = ""
+    status: str = "pending"  # pending | running | interrupted | cancelled | done
+    created: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    done: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    # student_id -> kaydedilen analiz (açık formlara eklemek için)
+    results: Dict[str, Dict] = field(default_factory=dict)
+
+    @property
+    def remaining(self) -> List[str]:
+        finished = set(self.done) | set(self.failed)
+        return [s for s in self.student_ids if s not in finished]
+
+
+@dataclass
+class BatchProgress:
+    total: int
+    done: int
+    failed: int
+    elapsed: float
+    throughput: float  # öğrenci / dakika
+    eta: Optional[float]  # saniye
+    status: str
+
+
+class _RunState:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.finished_this_run = 0
+        self.cancelled = threading.Event()
+
+
+class BatchAnalysisRunner:
+    """Toplu analiz işlerini sınırlı bir thread havuzunda arka planda çalıştırır.
+
+    Her öğrenci bitince sonuç AIInsight olarak günlüğe eklenir ve iş dosyası
+    güncellenir; böylece süreç yarıda kesilse bile biten öğrenciler tekrar
+    analiz edilmez.
+    """
+
+    def __init__(self, manager: StudentManager, workers: int = Config.BATCH_WORKERS):
+        self.manager = manager
+        self.workers = workers
+        self.jobs_dir = os.path.join(Config.DATA_DIR, Config.BATCH_DIR)
+        if not os.path.exists(self.jobs_dir):
+            os.makedirs(self.jobs_dir)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, BatchJob] = {}
+        self._runs: Dict[str, _RunState] = {}
+        self._load_jobs()
+
+    # --- İş dosyaları ---
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _load_jobs(self) -> None:
+        for filename in os.listdir(self.jobs_dir):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.jobs_dir, filename), "r", encoding="utf-8") as f:
+                    job = BatchJob(**json.load(f))
+            except Exception as e:
+                print(f"Toplu analiz işi okunamadı ({filename}): {e}")
+                continue
+            # Önceki süreçte yarıda kalan işler
+            if job.status in ("pending", "running"):
+                job.status = "interrupted"
+            self._jobs[job.id] = job
+
+    def _persist(self, job: BatchJob) -> None:
+        path = self._job_path(job.id)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(job), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    # --- Dış arayüz ---
+    def start(self, student_ids: List[str], model: str, title: str = "") -> str:
+        job = BatchJob(id=uuid.uuid4().hex[:12], model=model, student_ids=list(student_ids), title=title)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._persist(job)
+        self._launch(job)
+        return job.id
+
+    def resume(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job_id in self._runs:
+                return False
+            # Hatalı olanlar da yeniden denenir
+            job.failed.clear()
+            if not job.remaining:
+                return False
+        self._launch(job)
+        return True
+
+    def cancel(self, job_id: str) -> None:
+        with self._lock:
+            run = self._runs.get(job_id)
+        if run is not None:
+            run.cancelled.set()
+
+    def list_jobs(self) -> List[BatchJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created, reverse=True)
+
+    def is_running(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._runs
+
+    def results_for(self, student_id: str) -> List[AIInsight]:
+        """Toplu işlerin bu öğrenci için kaydettiği analizler."""
+        with self._lock:
+            return [AIInsight(**job.results[student_id]) for job in self._jobs.values()
+                    if student_id in job.results]
+
+    def progress(self, job_id: str) -> Optional[BatchProgress]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            run = self._runs.get(job_id)
+            total, done, failed = len(job.student_ids), len(job.done), len(job.failed)
+            remaining = len(job.remaining)
+
+            elapsed, throughput, eta = 0.0, 0.0, None
+            if run is not None:
+                elapsed = time.monotonic() - run.started
+                if run.finished_this_run and elapsed > 0:
+                    per_second = run.finished_this_run / elapsed
+                    throughput = per_second * 60
+                    eta = remaining / per_second
+            return BatchProgress(total, done, failed, elapsed, throughput, eta, job.status)
+
+    # --- Çalıştırma ---
+    def _launch(self, job: BatchJob) -> None:
+        run = _RunState()
+        with self._lock:
+            self._runs[job.id] = run
+            job.status = "running"
+            self._persist(job)
+        threading.Thread(target=self._run_job, args=(job, run), name=f"batch-{job.id}", daemon=True).start()
+
+    def _run_job(self, job: BatchJob, run: _RunState) -> None:
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"batch-{job.id}") as pool:
+            for student_id in job.remaining:
+                pool.submit(self._analyze_one, job, run, student_id)
+
+        with self._lock:
+            self._runs.pop(job.id, None)
+            if run.cancelled.is_set():
+                job.status = "cancelled"
+            else:
+                job.status = "done" if not job.remaining else "interrupted"
+            self._persist(job)
+        print(f"Toplu analiz bitti ({job.id}): {len(job.done)} başarılı, {len(job.failed)} hatalı")
+
+    def _analyze_one(self, job: BatchJob, run: _RunState, student_id: str) -> None:
+        if run.cancelled.is_set():
+            return
+
+        error = None
+        insight = None
+        try:
+            student = self.manager.load_student(student_id)
+            if student is None:
+                raise KeyError("Öğrenci kaydı bulunamadı")
+
+            notes = {g.subject: g.score for g in student.grades}
+            behaviors = [n.note for n in student.behavior_notes]
+            service = AIService()
+            service.configure("Ollama", job.model)
+
+            document = prepare_document(service, student.file_content)
+            prompt = build_analysis_prompt(student.name, student.class_name, notes, behaviors, document)
+            text = "".join(service.generate_stream(prompt, SYSTEM_PROMPT))
+            # Yarıda kopan akış, hatası sonda olan "başarılı" bir analiz gibi kaydedilmesin
+            failure = service.generation_error(text)
+            if failure is not None:
+                raise RuntimeError(failure)
+
+            insight = AIInsight(analysis=text, model=job.model,
+                                date=datetime.now().strftime("%Y-%m-%d %H:%M"),
+                                stats=asdict(service.last_stats) if service.last_stats else {})
+            self.manager.append_insight(student_id, insight)
+        except Exception as e:
+            error = str(e)
+            print(f"Toplu analiz hatası ({student_id}): {error}")
+
+        with self._lock:
+            if error is None:
+                job.done.append(student_id)
+                job.results[student_id] = asdict(insight)
+            else:
+                job.failed[student_id] = error
+            run.finished_this_run += 1
+            self._persist(job)
+
+
+_runner: Optional[BatchAnalysisRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_batch_runner(manager: Optional[StudentManager] = None) -> BatchAnalysisRunner:
+    """Process genelinde tek bir toplu analiz yöneticisi döndürür."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = BatchAnalysisRunner(manager or StudentManager())
+        return _runner
@@ -0,0 +1,81 @@
+import sys
+import shutil
+import tempfile
+import time
+import uuid
+
+from storage import DIR_MTIME_SETTLE_NS
+from student_streamable import Config, StudentManager, Student, Grade, AIInsight
+
+
+def create_fake_students(data_dir: str, count: int) -> None:
+    """Gerçekçi boyutta (dosya içeriği + analizler) sahte öğrenci kayıtları üretir."""
+    Config.DATA_DIR = data_dir
+    manager = StudentManager()
+    for i in range(count):
+        student = Student(
+            id=str(uuid.uuid4()),
+            name=f"Öğrenci {i:05d}",
+            class_name=f"{5 + i % 4}-{'ABCD'[i % 4]}",
+            grades=[Grade(subject=s, score=50 + i % 50) for s in ["Matematik", "Türkçe", "Fen Bilimleri"]],
+            ai_insights=[AIInsight(analysis="Analiz metni. " * 200, model="gemma3") for _ in range(3)],
+            file_content="Ödev içeriği " * 1200,
+        )
+        manager.save_student(student)
+
+
+def time_call(func, repeat: int = 5) -> float:
+    """En iyi çalışma süresini milisaniye olarak döndürür."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_benchmark(sizes=(100, 500, 1000, 2000)):
+    print(f"{'Öğrenci':>8} | {'İlk tarama (ms)':>16} | {'Rerun (ms)':>11} | {'Tek değişiklik (ms)':>20} | "
+          f"{'Özet listesi (ms)':>18} | {'Kenar çubuğu (ms)':>18}")
+    print("-" * 108)
+
+    for size in sizes:
+        data_dir = tempfile.mkdtemp(prefix="uft_bench_")
+        try:
+            create_fake_students(data_dir, size)
+            manager = StudentManager()
+
+            # Soğuk tarama: tüm dosyalar ayrıştırılır
+            cold = time_call(manager.get_all_students, repeat=1)
+            # Sıcak tarama: Streamlit rerun'ındaki durum, hiçbir dosya değişmedi
+            warm = time_call(manager.get_all_students)
+
+            # Tek bir öğrenci kaydedildikten sonraki tarama
+            student = manager.get_all_students()[0]
+            manager.save_student(Student.from_dict(student.to_dict()))
+            one_changed = time_call(manager.get_all_students, repeat=1)
+
+            # Kenar çubuğunun kullandığı özet listesi (manifestten)
+            summaries = time_call(manager.list_summaries)
+
+            # Kenar çubuğunun bir rerun'da yaptığı üç çağrı; klasör damgası oturduktan sonra
+            # tarama yapılmamalı, süre öğrenci sayısıyla büyümemeli
+            time.sleep(DIR_MTIME_SETTLE_NS / 1e9)
+            manager.list_summaries()
+
+            def sidebar():
+                classes = manager.list_classes()
+                manager.count_summaries(class_name=classes[0])
+                manager.list_summaries(class_name=classes[0], offset=0, limit=50)
+
+            sidebar_ms = time_call(sidebar)
+
+            print(f"{size:>8} | {cold:>16.1f} | {warm:>11.2f} | {one_changed:>20.2f} | {summaries:>18.2f} | "
+                  f"{sidebar_ms:>18.2f}")
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sizes = tuple(int(a) for a in sys.argv[1:]) or (100, 500, 1000, 2000)
+    run_benchmark(sizes)
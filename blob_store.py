@@ -0,0 +1,136 @@
+import gzip
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Set
+
+try:
+    import zstandard
+except ImportError:  # zstd opsiyonel; yoksa gzip kullanılır
+    zstandard = None
+
+
+class BlobStore:
+    """Uzun metinler için içerik adresli, sıkıştırılmış depo.
+
+    Anahtar, metnin UTF-8 halinin SHA-256 özetidir; aynı metin (ör. birden
+    fazla öğrenciye yüklenen aynı ödev) diskte tek kez saklanır. Dosyalar
+    blobs/<ilk 2 karakter>/<özet>.zst (veya .gz) olarak yazılır.
+
+    Depo referans saymaz; hangi blob'ların kullanımda olduğunu çağıran bilir
+    ve gc() ile geri kalanları sildirir.
+    """
+
+    def __init__(self, root: str, cache_size: int = 64):
+        self.root = root
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    @staticmethod
+    def key_for(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}{ext}")
+
+    def _find(self, key: str) -> Optional[str]:
+        for ext in (".zst", ".gz"):
+            path = self._path(key, ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, text: str) -> str:
+        """Metni saklar (zaten varsa dokunmaz) ve anahtarını döndürür."""
+        key = self.key_for(text)
+        existing = self._find(key)
+        if existing is not None:
+            # Yeniden kullanılan blob'un zamanı tazelenir; eşzamanlı bir gc(),
+            # referansı henüz diske yazılmamış blob'u silmesin
+            try:
+                os.utime(existing)
+            except OSError:
+                existing = None
+        if existing is None:
+            raw = text.encode("utf-8")
+            if zstandard is not None:
+                path, payload = self._path(key, ".zst"), zstandard.ZstdCompressor(level=10).compress(raw)
+            else:
+                path, payload = self._path(key, ".gz"), gzip.compress(raw, compresslevel=6)
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+        self._remember(key, text)
+        return key
+
+    def get(self, key: str) -> str:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        path = self._find(key)
+        if path is None:
+            raise KeyError(f"Blob bulunamadı: {key}")
+        with open(path, "rb") as f:
+            payload = f.read()
+        if path.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError("Bu blob zstd ile sıkıştırılmış, 'zstandard' paketi gerekli.")
+            raw = zstandard.ZstdDecompressor().decompress(payload)
+        else:
+            raw = gzip.decompress(payload)
+
+        text = raw.decode("utf-8")
+        self._remember(key, text)
+        return text
+
+    def _remember(self, key: str, text: str) -> None:
+        with self._lock:
+            self._cache[key] = text
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _keys_on_disk(self) -> Iterable[str]:
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                name = entry.name
+                if name.endswith(".zst") or name.endswith(".gz"):
+                    yield name.rsplit(".", 1)[0]
+
+    def gc(self, live: Set[str], keys: Optional[Iterable[str]] = None, grace: float = 0.0) -> int:
+        """live içinde olmayan blob'ları siler, silinen dosya sayısını döndürür.
+
+        keys verilirse yalnızca o anahtarlara bakılır, verilmezse tüm depo taranır.
+        Son grace saniyede yazılan ya da yeniden kullanılan blob'lar silinmez.
+        """
+        candidates = list(self._keys_on_disk() if keys is None else keys)
+        cutoff = time.time() - grace
+        removed = 0
+        for key in candidates:
+            if key in live:
+                continue
+            for ext in (".zst", ".gz"):
+                path = self._path(key, ext)
+                try:
+                    if os.path.getmtime(path) > cutoff:
+                        continue
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    continue
+            with self._lock:
+                self._cache.pop(key, None)
+        return removed
@@ -61,6 +61,24 @@ def build_executable():
         # Ana uygulama dosyalarını ekle
         f'--add-data={project_dir}/app.py{sep}.',
         f'--add-data={project_dir}/student_streamable.py{sep}.',
+        f'--add-data={project_dir}/storage.py{sep}.',
+        f'--add-data={project_dir}/autosave.py{sep}.',
+        f'--add-data={project_dir}/blob_store.py{sep}.',
+        f'--add-data={project_dir}/batch_analysis.py{sep}.',
+        f'--add-data={project_dir}/response_cache.py{sep}.',
+        f'--add-data={project_dir}/sqlite_lru.py{sep}.',
+        f'--add-data={project_dir}/stream_renderer.py{sep}.',
+        f'--add-data={project_dir}/generation_metrics.py{sep}.',
+        f'--add-data={project_dir}/document_analysis.py{sep}.',
+        f'--add-data={project_dir}/extraction_cache.py{sep}.',
+        f'--add-data={project_dir}/pdf_extraction.py{sep}.',
+        f'--add-data={project_dir}/bulk_ingest.py{sep}.',
+        f'--add-data={project_dir}/grade_import.py{sep}.',
+        f'--add-data={project_dir}/grade_analytics.py{sep}.',
+        f'--add-data={project_dir}/data_export.py{sep}.',
+        f'--add-data={project_dir}/search_index.py{sep}.',
+        f'--add-data={project_dir}/session_lifecycle.py{sep}.',
+        f'--add-data={project_dir}/startup_profile.py{sep}.',
 
         # --- 2. ARAYÜZ DOSYALARI ---
         # Streamlit static dosyalarını ekliyoruz
@@ -91,6 +109,7 @@ def build_executable():
         '--hidden-import=docx',
         '--hidden-import=python-docx',
         '--hidden-import=pandas',
+        '--hidden-import=openpyxl',
         '--hidden-import=numpy',
         '--hidden-import=numpy.core._methods',
         '--hidden-import=numpy.lib.format',
@@ -105,6 +124,7 @@ def build_executable():
         '--hidden-import=os',
         '--hidden-import=sys',
         '--hidden-import=pathlib',
+        '--hidden-import=sqlite3',
 
         # --- EXCLUDES (Boyut küçültme için) ---
         '--exclude-module=matplotlib',
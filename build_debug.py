@@ -55,6 +55,24 @@ def build_debug_executable():
         # Gerekli dosyalar
         f'--add-data={project_dir}/app.py{sep}.',
         f'--add-data={project_dir}/student_streamable.py{sep}.',
+        f'--add-data={project_dir}/storage.py{sep}.',
+        f'--add-data={project_dir}/autosave.py{sep}.',
+        f'--add-data={project_dir}/blob_store.py{sep}.',
+        f'--add-data={project_dir}/batch_analysis.py{sep}.',
+        f'--add-data={project_dir}/response_cache.py{sep}.',
+        f'--add-data={project_dir}/sqlite_lru.py{sep}.',
+        f'--add-data={project_dir}/stream_renderer.py{sep}.',
+        f'--add-data={project_dir}/generation_metrics.py{sep}.',
+        f'--add-data={project_dir}/document_analysis.py{sep}.',
+        f'--add-data={project_dir}/extraction_cache.py{sep}.',
+        f'--add-data={project_dir}/pdf_extraction.py{sep}.',
+        f'--add-data={project_dir}/bulk_ingest.py{sep}.',
+        f'--add-data={project_dir}/grade_import.py{sep}.',
+        f'--add-data={project_dir}/grade_analytics.py{sep}.',
+        f'--add-data={project_dir}/data_export.py{sep}.',
+        f'--add-data={project_dir}/search_index.py{sep}.',
+        f'--add-data={project_dir}/session_lifecycle.py{sep}.',
+        f'--add-data={project_dir}/startup_profile.py{sep}.',
 
         # Streamlit dosyaları
         f'--add-data={static_path}{sep}streamlit/static',
@@ -72,10 +90,12 @@ def build_debug_executable():
         '--hidden-import=PyPDF2',
         '--hidden-import=docx',
         '--hidden-import=pandas',
+        '--hidden-import=openpyxl',
         '--hidden-import=numpy',
         '--hidden-import=json',
         '--hidden-import=uuid',
         '--hidden-import=dataclasses',
+        '--hidden-import=sqlite3',
 
         # Metadata
         '--copy-metadata=streamlit',
@@ -0,0 +1,184 @@
+import io
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from student_streamable import (Config, FileHandler, StudentManager, StudentSummary, VersionConflictError,
+                                fold_turkish, is_error_response)
+
+SUPPORTED_EXTENSIONS = ("pdf", "docx", "txt")
+
+
+@dataclass
+class IngestResult:
+    """Toplu yüklemede tek bir dosyanın sonucu; filename arşiv/klasör içindeki göreli yoldur."""
+    filename: str
+    student_id: Optional[str] = None
+    student_name: str = ""
+    chars: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+class _NamedBytes(io.BytesIO):
+    """FileHandler'ın beklediği yüklenen dosya arayüzü (name + getvalue)."""
+
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def name_tokens(text: str) -> List[str]:
+    """Adı büyük/küçük harf ve Türkçe karakter farkı gözetmeksizin kelimelere ayırır."""
+    return [t for t in re.split(r"[^a-z0-9]+", fold_turkish(text)) if t]
+
+
+def _is_supported(filename: str) -> bool:
+    base = os.path.basename(filename)
+    return not base.startswith(".") and base.rsplit(".", 1)[-1].lower() in SUPPORTED_EXTENSIONS
+
+
+def files_from_zip(data: bytes) -> List[Tuple[str, bytes]]:
+    files = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or "__MACOSX" in info.filename or not _is_supported(info.filename):
+                continue
+            if info.file_size > Config.INGEST_MAX_FILE_BYTES:
+                print(f"Dosya çok büyük, atlandı: {info.filename}")
+                continue
+            files.append((info.filename, archive.read(info)))
+    return files
+
+
+def files_from_folder(folder: str) -> List[Tuple[str, bytes]]:
+    files = []
+    for root, _, names in os.walk(folder):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if not _is_supported(name) or os.path.getsize(path) > Config.INGEST_MAX_FILE_BYTES:
+                continue
+            with open(path, "rb") as f:
+                files.append((os.path.relpath(path, folder).replace(os.sep, "/"), f.read()))
+    return files
+
+
+def match_student(filename: str, summaries: List[StudentSummary]) -> Tuple[Optional[StudentSummary], Optional[str]]:
+    """Dosyayı öğrenci kimliği ya da adıyla eşleştirir.
+
+    Dosya adı (uzantısız) bir öğrenci kimliğiyle aynıysa doğrudan eşleşir.
+    Aksi halde adının tüm kelimeleri dosya adında geçen öğrenciler aday olur;
+    en çok kelimesi tutan seçilir, eşitlikte sınıf adı dosya adında ya da
+    bulunduğu klasörlerin adında (ör. "9A/ali.pdf") geçen tercih edilir. Yine
+    de birden fazla aday kalırsa dosya eşleştirilmez.
+    """
+    folder, base = os.path.split(filename.replace("\\", "/"))
+    stem = os.path.splitext(base)[0]
+    for summary in summaries:
+        if summary.id == stem:
+            return summary, None
+
+    tokens = set(name_tokens(stem))
+    class_tokens = tokens | set(name_tokens(folder))
+    candidates = []
+    for summary in summaries:
+        student_tokens = name_tokens(summary.name)
+        if student_tokens and tokens.issuperset(student_tokens):
+            class_match = bool(summary.class_name) and set(name_tokens(summary.class_name)) <= class_tokens
+            candidates.append(((len(student_tokens), class_match), summary))
+
+    if not candidates:
+        return None, "Eşleşen öğrenci bulunamadı"
+    candidates.sort(key=lambda c: c[0], reverse=True)
+    if len(candidates) > 1 and candidates[0][0] == candidates[1][0]:
+        names = ", ".join(sorted(s.display_name for score, s in candidates if score == candidates[0][0]))
+        return None, f"Birden fazla öğrenciyle eşleşti: {names}"
+    return candidates[0][1], None
+
+
+def _init_worker(data_dir: str) -> None:
+    # Metin önbelleği ana süreçle aynı veri klasöründe kalsın
+    Config.DATA_DIR = data_dir
+    # İşçi süreç zaten paralel çalışıyor; PDF okuma kendi süreç havuzunu açmasın.
+    # extract_pdf_text Config'i çağrı anında okuduğu için import sırası önemli değil.
+    Config.PDF_WORKERS = 1
+
+
+def _extract(filename: str, data: bytes) -> Tuple[str, float]:
+    started = time.perf_counter()
+    text = FileHandler.extract_text_from_file(_NamedBytes(data, filename))
+    return text, time.perf_counter() - started
+
+
+def ingest_files(manager: StudentManager, files: List[Tuple[str, bytes]],
+                 workers: int = Config.INGEST_WORKERS) -> List[IngestResult]:
+    """Dosyaları öğrencilere eşleştirir, metinleri süreç havuzunda çıkarır ve
+    eşleşen öğrencilerin ödev metnini tek bir toplu kayıtla günceller.
+
+    Aynı öğrenciye ait birden fazla dosya göreli yol sırasıyla birleştirilir.
+    Dosyalar sıralarıyla izlenir; farklı klasörlerdeki aynı adlı dosyalar
+    birbirinin yerine geçmez.
+    """
+    summaries = manager.list_summaries()
+    results: List[IngestResult] = []
+    pending: Dict[int, bytes] = {}
+
+    for position, (filename, data) in enumerate(files):
+        summary, error = match_student(filename, summaries)
+        result = IngestResult(filename=filename, error=error)
+        if summary is not None:
+            result.student_id, result.student_name = summary.id, summary.display_name
+            pending[position] = data
+        results.append(result)
+
+    if pending:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context,
+                                 initializer=_init_worker, initargs=(Config.DATA_DIR,)) as pool:
+            futures = {pool.submit(_extract, results[position].filename, data): position
+                       for position, data in pending.items()}
+            texts: Dict[int, str] = {}
+            for future in as_completed(futures):
+                position = futures[future]
+                result = results[position]
+                try:
+                    text, result.seconds = future.result()
+                except Exception as e:
+                    result.error = f"Okuma hatası: {e}"
+                    continue
+                if is_error_response(text) or text == "Desteklenmeyen dosya formatı":
+                    result.error = text
+                    continue
+                result.chars = len(text)
+                texts[position] = text
+
+        by_student: Dict[str, List[str]] = {}
+        for position in sorted(texts, key=lambda p: results[p].filename):
+            by_student.setdefault(results[position].student_id, []).append(texts[position])
+
+        students = []
+        for student_id, parts in by_student.items():
+            student = manager.load_student(student_id)
+            if student is None:
+                for result in results:
+                    if result.student_id == student_id:
+                        result.error = "Öğrenci kaydı bulunamadı"
+                continue
+            student.file_content = "\n\n".join(parts)[:Config.MAX_DOCUMENT_CHARS]
+            students.append(student)
+        if students:
+            try:
+                manager.save_students(students)
+            except VersionConflictError as e:
+                for result in results:
+                    if result.student_id in e.student_ids and result.error is None:
+                        result.error = "Kayıt bu sırada başka bir oturumda değişti, tekrar deneyin"
+
+    ok = sum(1 for r in results if r.error is None)
+    print(f"Toplu ödev yükleme bitti: {ok} başarılı, {len(results) - ok} hatalı")
+    return results
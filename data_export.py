@@ -0,0 +1,242 @@
+import csv
+import json
+import os
+import shutil
+import string
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet opsiyonel; yoksa yalnızca CSV dışa aktarılabilir
+    pa = ds = pq = None
+
+from student_streamable import Config, GenerationStats, Student, StudentManager
+
+STATE_FILE = "_export_state.json"
+# Parquet düzeni değişince artırılır; eski düzendeki çıktı tamamen yeniden yazılır
+STATE_FORMAT = 3
+PARTITION_KEY = "class_name"
+# Sınıfı boş öğrenciler Hive kuralındaki varsayılan bölüme yazılır (okuyunca null gelir)
+DEFAULT_PARTITION = f"{PARTITION_KEY}=__HIVE_DEFAULT_PARTITION__"
+# Bölüm adında kodlanmadan kalan karakterler
+_PLAIN_CHARS = frozenset(string.ascii_lowercase + string.digits + "_.-")
+
+STUDENT_FIELDS = ["id", "name", "class_name", "enrollment_date", "last_updated", "file_content"]
+GRADE_FIELDS = ["student_id", "class_name", "subject", "score", "date"]
+INSIGHT_FIELDS = ["student_id", "class_name", "model", "date", "analysis", "eval_count", "tokens_per_second"]
+
+
+@dataclass
+class ExportReport:
+    written: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    students: int = 0
+    seconds: float = 0.0
+
+
+def _student_row(student: Student) -> Dict:
+    return {f: getattr(student, f) for f in STUDENT_FIELDS}
+
+
+def _grade_rows(student: Student) -> Iterator[Dict]:
+    for g in student.grades:
+        yield {"student_id": student.id, "class_name": student.class_name,
+               "subject": g.subject, "score": float(g.score), "date": g.date}
+
+
+def _insight_rows(student: Student) -> Iterator[Dict]:
+    for i in student.ai_insights:
+        stats = GenerationStats.from_dict(i.stats) if i.stats else None
+        yield {"student_id": student.id, "class_name": student.class_name, "model": i.model, "date": i.date,
+               "analysis": i.analysis,
+               "eval_count": stats.eval_count if stats else None,
+               "tokens_per_second": stats.tokens_per_second if stats else None}
+
+
+def _schemas() -> Dict[str, "pa.Schema"]:
+    # Sınıf adı dosyalarda tutulmaz; okuyucular onu bölüm yolundan (class_name=...) alır.
+    # Aynı ad hem sütun hem bölüm anahtarı olursa veri seti "incompatible types" hatasıyla okunamaz.
+    text = pa.string()
+    return {
+        "students": pa.schema([(f, text) for f in STUDENT_FIELDS if f != PARTITION_KEY]),
+        "grades": pa.schema([("student_id", text), ("subject", text), ("score", pa.float64()), ("date", text)]),
+        "ai_insights": pa.schema([("student_id", text), ("model", text), ("date", text), ("analysis", text),
+                                  ("eval_count", pa.int64()), ("tokens_per_second", pa.float64())]),
+    }
+
+
+def _partition_name(class_name: str) -> str:
+    """Sınıf adından bölüm klasörü adı üretir.
+
+    Küçük ASCII harf, rakam ve "_.-" dışındaki her karakter (büyük harfler
+    dahil) UTF-8 baytlarıyla %XX olarak yazılır. Böylece farklı sınıf adları
+    (ör. "9/A" ile "9_A", büyük/küçük harf duyarsız dosya sistemlerinde "9A" ile
+    "9a") hiçbir zaman aynı klasöre düşmez; Hive okuyucuları (pyarrow, Spark)
+    %XX kodlamasını çözdüğü için sınıf adı aynen geri okunur.
+    """
+    if not class_name.strip():
+        return DEFAULT_PARTITION
+    encoded = "".join(ch if ch in _PLAIN_CHARS else "".join(f"%{b:02X}" for b in ch.encode("utf-8"))
+                      for ch in class_name)
+    return f"{PARTITION_KEY}={encoded}"
+
+
+def _load_state(out_dir: str) -> Optional[Dict[str, Dict[str, str]]]:
+    """Önceki çalıştırmanın bölüm imzaları; çıktı eski düzendeyse None."""
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        # Durum dosyası bozuksa tüm bölümler yeniden yazılır
+        print(f"Dışa aktarma durumu okunamadı: {e}")
+        return None
+    if data.get("format") != STATE_FORMAT:
+        return None
+    return data["partitions"]
+
+
+def _write_state(out_dir: str, state: Dict[str, Dict[str, str]]) -> None:
+    path = os.path.join(out_dir, STATE_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"format": STATE_FORMAT, "partitions": state}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _write_partition(out_dir: str, table: str, partition: str, rows: List[Dict], schema: "pa.Schema") -> None:
+    part_dir = os.path.join(out_dir, table, partition)
+    os.makedirs(part_dir, exist_ok=True)
+    path = os.path.join(part_dir, "part-0.parquet")
+    tmp_path = path + ".tmp"
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def export_parquet(manager: StudentManager, out_dir: str) -> ExportReport:
+    """Tüm veriyi sınıfa göre bölümlenmiş Parquet dosyalarına yazar.
+
+    Çıktı <out_dir>/{students,grades,ai_insights}/class_name=<sınıf>/part-0.parquet
+    düzenindedir (BI araçları Hive bölümlemesi olarak okur; sınıf adı sütunu
+    bölüm yolundan gelir, sınıfı boş öğrenciler null olur). Her sınıfın
+    öğrenci kimlikleri ve revision değerleri saklanır; bir sonraki
+    çalıştırmada yalnızca öğrencisi eklenen, silinen ya da güncellenen
+    sınıfların bölümleri yeniden yazılır.
+    """
+    if pq is None:
+        raise RuntimeError("Parquet için pyarrow kurulu olmalı: pip install pyarrow")
+
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    schemas = _schemas()
+    previous = _load_state(out_dir)
+    if previous is None:
+        # Eski düzendeki ya da durumu bilinmeyen bölümler yeni dosyalarla karışmasın
+        for table in schemas:
+            shutil.rmtree(os.path.join(out_dir, table), ignore_errors=True)
+        previous = {}
+
+    current: Dict[str, Dict[str, str]] = {}
+    for summary in manager.list_summaries():
+        current.setdefault(_partition_name(summary.class_name), {})[summary.id] = summary.revision
+
+    report = ExportReport(students=sum(len(ids) for ids in current.values()))
+    state = dict(previous)
+    for partition, signature in sorted(current.items()):
+        if previous.get(partition) == signature:
+            report.unchanged.append(partition)
+            continue
+
+        rows: Dict[str, List[Dict]] = {table: [] for table in schemas}
+        # Öğrenciler tek tek okunur; bellekte yalnızca bu sınıfın satırları tutulur
+        for student_id in signature:
+            student = manager.load_student(student_id)
+            if student is None:
+                continue
+            rows["students"].append(_student_row(student))
+            rows["grades"].extend(_grade_rows(student))
+            rows["ai_insights"].extend(_insight_rows(student))
+        for table, schema in schemas.items():
+            _write_partition(out_dir, table, partition, rows[table], schema)
+
+        state[partition] = signature
+        # Yarıda kesilirse biten bölümler tekrar yazılmasın
+        _write_state(out_dir, state)
+        report.written.append(partition)
+
+    for partition in sorted(set(previous) - set(current)):
+        for table in schemas:
+            shutil.rmtree(os.path.join(out_dir, table, partition), ignore_errors=True)
+        state.pop(partition, None)
+        report.removed.append(partition)
+    _write_state(out_dir, state)
+
+    report.seconds = time.perf_counter() - started
+    print(f"Parquet dışa aktarma: {len(report.written)} bölüm yazıldı, {len(report.unchanged)} değişmedi, "
+          f"{len(report.removed)} silindi ({report.seconds:.1f} sn)")
+    return report
+
+
+def read_parquet_table(out_dir: str, table: str) -> "pa.Table":
+    """export_parquet çıktısındaki bir tabloyu (students, grades, ai_insights) okur.
+
+    class_name bölüm yolundan düz metin olarak okunur. pyarrow varsayılanda onu
+    sözlük tipinde çıkarır ve sınıfı boş (null) öğrenci varsa tablo pandas'a
+    çevrilemez; pandas ile okurken de aynı partitioning değeri verilmelidir.
+    """
+    return pq.read_table(os.path.join(out_dir, table), partitioning=ds.HivePartitioning.discover())
+
+
+def export_csv(manager: StudentManager, out_dir: str) -> ExportReport:
+    """Öğrenci, not ve analizleri üç CSV dosyasına akış halinde yazar.
+
+    Öğrenciler sırayla tek tek okunup satırları hemen yazılır; veri setinin
+    tamamı hiçbir zaman bellekte tutulmaz. Excel'in Türkçe karakterleri doğru
+    açması için dosyalar BOM'lu UTF-8 yazılır.
+    """
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    specs = {"students": STUDENT_FIELDS, "grades": GRADE_FIELDS, "ai_insights": INSIGHT_FIELDS}
+    files = {table: open(os.path.join(out_dir, f"{table}.csv.tmp"), "w", encoding="utf-8-sig", newline="")
+             for table in specs}
+    report = ExportReport()
+    try:
+        writers = {table: csv.DictWriter(files[table], fieldnames=columns) for table, columns in specs.items()}
+        for writer in writers.values():
+            writer.writeheader()
+
+        for summary in manager.list_summaries():
+            student = manager.load_student(summary.id)
+            if student is None:
+                continue
+            writers["students"].writerow(_student_row(student))
+            writers["grades"].writerows(_grade_rows(student))
+            writers["ai_insights"].writerows(_insight_rows(student))
+            report.students += 1
+    finally:
+        for f in files.values():
+            f.close()
+
+    for table in specs:
+        path = os.path.join(out_dir, f"{table}.csv")
+        os.replace(path + ".tmp", path)
+        report.written.append(f"{table}.csv")
+
+    report.seconds = time.perf_counter() - started
+    print(f"CSV dışa aktarma: {report.students} öğrenci ({report.seconds:.1f} sn)")
+    return report
+
+
+if __name__ == "__main__":
+    # Kullanım: python data_export.py [parquet|csv] [çıktı_klasörü]
+    kind = sys.argv[1] if len(sys.argv) > 1 else "parquet"
+    target = sys.argv[2] if len(sys.argv) > 2 else os.path.join(Config.DATA_DIR, Config.EXPORT_DIR)
+    (export_csv if kind == "csv" else export_parquet)(StudentManager(), target)
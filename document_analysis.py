@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional
+
+from student_streamable import Config, AIService
+
+SUMMARY_SYSTEM_PROMPT = "Öğrenci ödevlerini inceleyen bir eğitim asistanısın."
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def chunk_size_for(service: AIService) -> int:
+    """Modelin bağlam penceresine sığacak parça boyutu (karakter)."""
+    context = service.client.context_length(service.model)
+    tokens = max(context - Config.CHUNK_RESERVE_TOKENS, 256)
+    return int(tokens * Config.CHARS_PER_TOKEN)
+
+
+def split_into_chunks(text: str, max_chars: int) -> List[str]:
+    """Metni paragraf sınırlarından, her biri en fazla max_chars olacak şekilde böler.
+
+    Tek başına sığmayan paragraflar satırlardan, o da yetmezse sabit uzunlukta bölünür.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    def flush():
+        nonlocal current, current_len
+        if current:
+            chunks.append("\n\n".join(current))
+            current, current_len = [], 0
+
+    for paragraph in (p.strip() for p in text.split("\n\n")):
+        if not paragraph:
+            continue
+        pieces = [paragraph]
+        if len(paragraph) > max_chars:
+            pieces = []
+            for line in paragraph.split("\n"):
+                pieces.extend(line[i:i + max_chars] for i in range(0, len(line), max_chars))
+
+        for piece in pieces:
+            # +2: paragrafları birleştiren "\n\n"
+            if current and current_len + len(piece) + 2 > max_chars:
+                flush()
+            current.append(piece)
+            current_len += len(piece) + 2
+    flush()
+    return chunks
+
+
+def _summarize(service: AIService, chunk: str, index: int, total: int, force: bool) -> str:
+    worker = AIService()
+    worker.configure(service.provider, service.model, service.api_key)
+    prompt = (
+        f"ÖDEV BÖLÜMÜ {index}/{total}:\n{chunk}\n"
+        "GÖREV: Bu bölümü öğrencinin konuyu anlama düzeyi, güçlü yönleri ve hataları "
+        "açısından kısa maddelerle özetle."
+    )
+    text = "".join(worker.generate_stream(prompt, SUMMARY_SYSTEM_PROMPT, force=force))
+    error = worker.generation_error(text)
+    if error is not None:
+        # Özet alınamazsa bölümün başı olduğu gibi kullanılır, analiz yine de sürer
+        print(f"Bölüm özeti alınamadı ({index}/{total}): {error}")
+        return chunk[:500]
+    return text.strip()
+
+
+def prepare_document(service: AIService, text: str, progress: Optional[ProgressCallback] = None,
+                     force: bool = False, workers: int = Config.CHUNK_WORKERS) -> str:
+    """Ödev metnini son analize hazırlar (map-reduce).
+
+    Metin tek parçaya sığıyorsa olduğu gibi döner. Sığmıyorsa paragraf
+    sınırlarından bölünür, parçalar eşzamanlı özetlenir ve özetler birleştirilir;
+    birleşik özet de sığmazsa aynı işlem özetler üzerinde tekrarlanır.
+    progress(done, total) çağıran thread'de çağrılır, Streamlit öğelerini
+    güncellemek için güvenlidir.
+    """
+    max_chars = chunk_size_for(service)
+    text = text.strip()
+
+    while len(text) > max_chars:
+        chunks = split_into_chunks(text, max_chars)
+        summaries: List[Optional[str]] = [None] * len(chunks)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="doc-summary") as pool:
+            futures = {
+                pool.submit(_summarize, service, chunk, i + 1, len(chunks), force): i
+                for i, chunk in enumerate(chunks)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                summaries[futures[future]] = future.result()
+                if progress:
+                    progress(done, len(chunks))
+
+        merged = "\n\n".join(f"[Bölüm {i + 1}] {s}" for i, s in enumerate(summaries))
+        if len(merged) >= len(text):
+            # Özetleme metni kısaltmıyorsa sonsuz döngüye girmemek için kes
+            return merged[:max_chars]
+        text = merged
+
+    return text
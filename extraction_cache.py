@@ -0,0 +1,104 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import sqlite_lru
+from student_streamable import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_extractions_last_used ON extractions(last_used);
+"""
+
+
+def extraction_key(data: bytes, file_type: str) -> str:
+    """Dosya içeriğinin SHA-256 özeti, uzantı ve okuma sınırından anahtar üretir."""
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{digest}:{file_type}:{Config.MAX_DOCUMENT_CHARS}"
+
+
+class ExtractionCache:
+    """Yüklenen dosyalardan çıkarılan metinler için iki katmanlı önbellek.
+
+    Son kullanılan birkaç metin bellekte tutulur; hepsi ayrıca diskte (SQLite)
+    saklanır ve toplam boyut max_bytes değerini aşınca en uzun süredir
+    kullanılmayanlar silinir (LRU).
+    """
+
+    def __init__(self, path: str, max_bytes: int = Config.EXTRACTION_CACHE_MAX_BYTES,
+                 memory_entries: int = Config.EXTRACTION_MEMORY_ENTRIES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        sqlite_lru.ensure_dir(path)
+        with sqlite_lru.connect(path) as conn:
+            conn.executescript(SCHEMA)
+
+    def _remember(self, key: str, text: str) -> None:
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            try:
+                with sqlite_lru.connect(self.path) as conn:
+                    row = conn.execute("SELECT text FROM extractions WHERE key = ?", (key,)).fetchone()
+                    if row is None:
+                        return None
+                    sqlite_lru.touch(conn, "extractions", key)
+            except sqlite3.Error as e:
+                print(f"Metin önbelleği okunamadı: {e}")
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, key: str, text: str) -> None:
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            self._remember(key, text)
+            if size > self.max_bytes:
+                return
+            try:
+                with sqlite_lru.connect(self.path) as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO extractions (key, text, size, last_used) VALUES (?, ?, ?, ?)",
+                        (key, text, size, time.time())
+                    )
+                    sqlite_lru.evict(conn, "extractions", self.max_bytes)
+            except sqlite3.Error as e:
+                print(f"Metin önbelleğe yazılamadı: {e}")
+
+    def clear(self) -> None:
+        with self._lock, sqlite_lru.connect(self.path) as conn:
+            self._memory.clear()
+            conn.execute("DELETE FROM extractions")
+
+
+_cache: Optional[ExtractionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Process genelinde tek bir metin çıkarma önbelleği döndürür."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache(os.path.join(Config.DATA_DIR, Config.CACHE_DIR,
+                                                  Config.EXTRACTION_CACHE_FILE))
+        return _cache
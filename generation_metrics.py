@@ -0,0 +1,64 @@
+from typing import Iterable
+
+import pandas as pd
+
+from student_streamable import GenerationStats, Student
+
+
+def collect_generation_stats(students: Iterable[Student]) -> pd.DataFrame:
+    """Kayıtlı analizlerin üretim ölçümlerini tek bir tabloya toplar.
+
+    Ölçümü olmayan eski analizler ve önbellekten gelen yanıtlar dahil edilmez.
+    """
+    rows = []
+    for student in students:
+        for insight in student.ai_insights:
+            if not insight.stats:
+                continue
+            stats = GenerationStats.from_dict(insight.stats)
+            if stats.cached or not stats.eval_count:
+                continue
+            rows.append({
+                "date": insight.date,
+                "model": insight.model,
+                "tokens_per_second": stats.tokens_per_second,
+                "prompt_tokens_per_second": stats.prompt_tokens_per_second,
+                "eval_count": stats.eval_count,
+                "prompt_eval_count": stats.prompt_eval_count,
+                "prompt_eval_seconds": stats.prompt_eval_duration / 1e9,
+                "load_seconds": stats.load_duration / 1e9,
+                "total_seconds": stats.total_duration / 1e9,
+                "prompt_chars": stats.prompt_chars,
+                "cold_load": stats.is_cold_load,
+            })
+
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        df = df.dropna(subset=["date"]).sort_values("date")
+    return df
+
+
+def summarize_by_model(df: pd.DataFrame) -> pd.DataFrame:
+    """Model başına ortalama hız, soğuk yükleme oranı ve istem işleme maliyeti."""
+    if df.empty:
+        return df
+    summary = df.groupby("model").agg(
+        analiz=("tokens_per_second", "size"),
+        token_sn=("tokens_per_second", "mean"),
+        token_sn_medyan=("tokens_per_second", "median"),
+        soguk_yukleme_orani=("cold_load", "mean"),
+        ort_yukleme_sn=("load_seconds", "mean"),
+        ort_istem_token=("prompt_eval_count", "mean"),
+        ort_istem_sn=("prompt_eval_seconds", "mean"),
+        ort_toplam_sn=("total_seconds", "mean"),
+    )
+    return summary.sort_values("token_sn", ascending=False).round(2)
+
+
+def daily_series(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Seçilen ölçümün model başına günlük ortalaması (grafik için geniş tablo)."""
+    if df.empty:
+        return df
+    daily = df.groupby([df["date"].dt.date, "model"])[column].mean()
+    return daily.unstack("model")
@@ -0,0 +1,164 @@
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from student_streamable import Config, Student, StudentListener, StudentManager
+
+COLUMNS = ["student_id", "name", "class_name", "subject", "score"]
+# Tekrarlayan değerler kategorik tutulur; gruplama tamsayı kodlar üzerinden yapılır
+CATEGORIES = {"student_id": "category", "class_name": "category", "subject": "category"}
+
+
+def _grade_rows(student: Student) -> Dict[str, list]:
+    count = len(student.grades)
+    return {
+        "student_id": [student.id] * count,
+        "name": [student.name] * count,
+        "class_name": [student.class_name] * count,
+        "subject": [g.subject for g in student.grades],
+        "score": [float(g.score) for g in student.grades],
+    }
+
+
+class GradeAnalytics(StudentListener):
+    """Tüm Grade kayıtlarının sütunlu (pandas) tablosu ve üzerindeki toplamlar.
+
+    Tablo ilk kullanımda bir kez kurulur. Sonrasında StudentManager bildirimleri
+    yalnızca değişen öğrencileri "kirli" olarak işaretler; bir sonraki sorguda
+    bu öğrencilerin satırları silinip yenileri eklenir. Sınıf ve ders sütunları
+    kategorik tutulur, böylece gruplamalar 10 bin öğrencide de milisaniyeler sürer.
+    """
+
+    def __init__(self, manager: StudentManager):
+        self.manager = manager
+        self._lock = threading.Lock()
+        self._table: Optional[pd.DataFrame] = None
+        # student_id -> yeni Student (kaydedildi) ya da None (silindi / yeniden okunmalı)
+        self._dirty: Dict[str, Optional[Student]] = {}
+        StudentManager.add_listener(self)
+
+    # --- StudentListener ---
+    def student_saved(self, student: Student) -> None:
+        with self._lock:
+            self._dirty[student.id] = student
+
+    def student_changed(self, student_id: str) -> None:
+        with self._lock:
+            self._dirty[student_id] = None
+
+    def student_deleted(self, student_id: str) -> None:
+        self.student_changed(student_id)
+
+    # --- Tablo ---
+    @staticmethod
+    def _build(students: List[Student]) -> pd.DataFrame:
+        columns: Dict[str, list] = {c: [] for c in COLUMNS}
+        for student in students:
+            for column, values in _grade_rows(student).items():
+                columns[column].extend(values)
+        df = pd.DataFrame(columns, columns=COLUMNS)
+        df["score"] = df["score"].astype(np.float64)
+        return df.astype(CATEGORIES)
+
+    def table(self) -> pd.DataFrame:
+        """Güncel not tablosu. Dönen tablo paylaşılır, yerinde değiştirilmemelidir."""
+        with self._lock:
+            if self._table is None:
+                self._dirty.clear()
+                self._table = self._build(self.manager.get_all_students())
+            elif self._dirty:
+                dirty, self._dirty = self._dirty, {}
+                fresh = []
+                for student_id, student in dirty.items():
+                    student = student or self.manager.load_student(student_id)
+                    if student is not None:
+                        fresh.append(student)
+                kept = self._table[~self._table["student_id"].isin(list(dirty))]
+                added = self._build(fresh)
+                # concat'in kategorik tipi koruması için iki tarafın kategorileri eşitlenir
+                categories = {c: kept[c].cat.categories.union(added[c].cat.categories) for c in CATEGORIES}
+                kept = kept.assign(**{c: kept[c].cat.set_categories(categories[c]) for c in CATEGORIES})
+                added = added.assign(**{c: added[c].cat.set_categories(categories[c]) for c in CATEGORIES})
+                self._table = pd.concat([kept, added], ignore_index=True)
+            return self._table
+
+    # --- Toplamlar ---
+    def class_subject_stats(self, class_name: Optional[str] = None) -> pd.DataFrame:
+        """Sınıf ve ders başına öğrenci sayısı, ortalama, standart sapma ve yüzdelikler."""
+        df = self.table()
+        if class_name is not None:
+            df = df[df["class_name"] == class_name]
+        if df.empty:
+            return pd.DataFrame()
+        grouped = df.groupby(["class_name", "subject"], observed=True)["score"]
+        stats = grouped.agg(ogrenci="count", ortalama="mean", std="std", en_dusuk="min", en_yuksek="max")
+        quantiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+        quantiles.columns = ["p25", "medyan", "p75"]
+        return stats.join(quantiles).round(1)
+
+    def subject_means(self, class_name: Optional[str] = None) -> pd.DataFrame:
+        """Grafik için ders × sınıf ortalama tablosu."""
+        df = self.table()
+        if class_name is not None:
+            df = df[df["class_name"] == class_name]
+        if df.empty:
+            return pd.DataFrame()
+        return df.pivot_table(index="subject", columns="class_name", values="score",
+                              aggfunc="mean", observed=True).round(1)
+
+    def distribution(self, subject: str, class_name: Optional[str] = None, bins: int = 10) -> pd.Series:
+        """Bir dersin not dağılımı (0-100 arası eşit aralıklar)."""
+        df = self.table()
+        mask = df["subject"] == subject
+        if class_name is not None:
+            mask &= df["class_name"] == class_name
+        counts, edges = np.histogram(df.loc[mask, "score"].to_numpy(), bins=bins, range=(0, 100))
+        labels = [f"{edges[i]:.0f}-{edges[i + 1]:.0f}" for i in range(bins)]
+        return pd.Series(counts, index=labels, name="öğrenci")
+
+    def outliers(self, class_name: Optional[str] = None) -> pd.DataFrame:
+        """Kendi sınıf/ders grubunun çeyrekler açıklığına (1.5×IQR) göre aykırı notlar."""
+        df = self.table()
+        if class_name is not None:
+            df = df[df["class_name"] == class_name]
+        if df.empty:
+            return pd.DataFrame(columns=COLUMNS + ["grup_medyan"])
+        grouped = df.groupby(["class_name", "subject"], observed=True)["score"]
+        q1, q3 = grouped.transform("quantile", 0.25), grouped.transform("quantile", 0.75)
+        iqr = q3 - q1
+        mask = (df["score"] < q1 - 1.5 * iqr) | (df["score"] > q3 + 1.5 * iqr)
+        result = df[mask].assign(grup_medyan=grouped.transform("median")[mask])
+        return result.sort_values(["class_name", "subject", "score"])
+
+    def at_risk(self, class_name: Optional[str] = None,
+                threshold: float = Config.AT_RISK_THRESHOLD,
+                min_failed: int = Config.AT_RISK_MIN_FAILED) -> pd.DataFrame:
+        """Ortalaması eşiğin altında olan ya da en az min_failed dersten kalan öğrenciler."""
+        df = self.table()
+        if class_name is not None:
+            df = df[df["class_name"] == class_name]
+        if df.empty:
+            return pd.DataFrame()
+        per_student = df.assign(failed=df["score"] < threshold).groupby("student_id", observed=True).agg(
+            ortalama=("score", "mean"), kalan_ders=("failed", "sum"), ders=("score", "size"),
+        )
+        risky = per_student[(per_student["ortalama"] < threshold) | (per_student["kalan_ders"] >= min_failed)]
+        # Ad ve sınıf yalnızca listeye girenler için eklenir
+        names = df[df["student_id"].isin(risky.index)].drop_duplicates("student_id").set_index("student_id")
+        risky = risky.join(names[["name", "class_name"]].rename(columns={"name": "ad", "class_name": "sinif"}))
+        return risky[["ad", "sinif", "ortalama", "kalan_ders", "ders"]].sort_values("ortalama").round(1)
+
+
+_analytics: Optional[GradeAnalytics] = None
+_analytics_lock = threading.Lock()
+
+
+def get_grade_analytics(manager: Optional[StudentManager] = None) -> GradeAnalytics:
+    """Process genelinde tek bir not analiz tablosu döndürür."""
+    global _analytics
+    with _analytics_lock:
+        if _analytics is None:
+            _analytics = GradeAnalytics(manager or StudentManager())
+        return _analytics
@@ -0,0 +1,174 @@
+import io
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bulk_ingest import name_tokens
+from student_streamable import Grade, StudentManager, VersionConflictError
+
+# Başlıklar name_tokens ile sadeleştirilip bu adlarla karşılaştırılır
+ID_COLUMNS = {"id", "ogrenci id", "kimlik"}
+NAME_COLUMNS = {"adi soyadi", "ad soyad", "adi", "ogrenci", "ogrenci adi", "ogrenci adi soyadi", "isim", "name"}
+CLASS_COLUMNS = {"sinif", "sinifi", "sube", "sinif sube", "class"}
+SUBJECT_COLUMNS = {"ders", "ders adi", "subject"}
+SCORE_COLUMNS = {"not", "puan", "score"}
+# e-Okul listelerinde bulunan, ders olmayan sütunlar
+IGNORED_COLUMNS = {"sira", "sira no", "no", "ogrenci no", "okul no", "cinsiyet", "tc kimlik no"}
+
+
+@dataclass
+class GradeImportReport:
+    students: int = 0
+    grades: int = 0
+    new_subjects: List[str] = field(default_factory=list)
+    student_ids: List[str] = field(default_factory=list)
+    # Satır (tablodaki sıra), öğrenci, ders, değer, sebep
+    errors: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+
+def _key(value: str) -> str:
+    return " ".join(name_tokens(str(value)))
+
+
+def _class_key(value: str) -> str:
+    # "9-A", "9 A" ve "9A" aynı sınıf sayılır
+    return "".join(name_tokens(str(value)))
+
+
+def read_grade_sheet(data: bytes, filename: str) -> pd.DataFrame:
+    """CSV/XLSX not çizelgesini tüm hücreleri metin olarak okur."""
+    if filename.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(io.BytesIO(data), dtype=str)
+
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        # Excel'in Türkçe Windows'ta kaydettiği CSV'ler
+        text = data.decode("cp1254")
+    # Ayırıcı (virgül / noktalı virgül / sekme) otomatik bulunur
+    return pd.read_csv(io.StringIO(text), sep=None, engine="python", dtype=str)
+
+
+def _find_column(df: pd.DataFrame, aliases: set) -> Optional[str]:
+    for column in df.columns:
+        if _key(column) in aliases:
+            return column
+    return None
+
+
+def to_long_format(df: pd.DataFrame) -> pd.DataFrame:
+    """Çizelgeyi row, student_id, name, class_name, subject, value sütunlu uzun tabloya çevirir.
+
+    Hem "Ders" / "Not" sütunlu uzun tablolar hem de her dersin ayrı sütun
+    olduğu e-Okul tipi geniş tablolar desteklenir.
+    """
+    columns = {
+        "student_id": _find_column(df, ID_COLUMNS),
+        "name": _find_column(df, NAME_COLUMNS),
+        "class_name": _find_column(df, CLASS_COLUMNS),
+    }
+    if columns["student_id"] is None and columns["name"] is None:
+        raise ValueError("Çizelgede öğrenci adı (ör. 'Adı Soyadı') ya da kimlik sütunu bulunamadı")
+
+    df = df.copy()
+    df["row"] = np.arange(2, len(df) + 2)  # başlık 1. satır
+    for target, source in columns.items():
+        df[target] = df[source] if source is not None else ""
+    identity = ["row"] + list(columns)
+    used = {c for c in columns.values() if c is not None}
+
+    subject_col, score_col = _find_column(df, SUBJECT_COLUMNS), _find_column(df, SCORE_COLUMNS)
+    if subject_col is not None and score_col is not None:
+        long = df[identity + [subject_col, score_col]].rename(columns={subject_col: "subject", score_col: "value"})
+    else:
+        subject_cols = [c for c in df.columns
+                        if c not in used and c not in identity and _key(c) not in IGNORED_COLUMNS]
+        long = df.melt(id_vars=identity, value_vars=subject_cols, var_name="subject", value_name="value")
+
+    long[["student_id", "name", "class_name", "value"]] = \
+        long[["student_id", "name", "class_name", "value"]].fillna("")
+    long["subject"] = long["subject"].astype(str).str.strip()
+    long["value"] = long["value"].astype(str).str.strip()
+    # Boş hücre = o ders için not girilmemiş
+    return long[long["value"] != ""].reset_index(drop=True)
+
+
+def _match_students(long: pd.DataFrame, manager: StudentManager) -> pd.Series:
+    people = pd.DataFrame(
+        [{"sid": s.id, "name_key": _key(s.name), "class_key": _class_key(s.class_name)}
+         for s in manager.list_summaries()],
+        columns=["sid", "name_key", "class_key"]
+    )
+    matched = pd.Series(np.nan, index=long.index, dtype=object)
+
+    by_id = long["student_id"].str.strip()
+    matched = matched.where(~by_id.isin(people["sid"]), by_id)
+
+    long_keys = pd.DataFrame({"name_key": long["name"].map(_key), "class_key": long["class_name"].map(_class_key)})
+    # Aynı adda birden fazla öğrenci varsa yalnızca sınıfla birlikte eşleşir
+    unique_both = people.drop_duplicates(["name_key", "class_key"], keep=False)
+    unique_name = people.drop_duplicates("name_key", keep=False)
+    with_class = long_keys.merge(unique_both, on=["name_key", "class_key"], how="left")["sid"]
+    name_only = long_keys.merge(unique_name[["name_key", "sid"]], on="name_key", how="left")["sid"]
+    has_class = long_keys["class_key"] != ""
+
+    by_name = pd.Series(np.where(has_class, with_class, name_only), index=long.index)
+    return matched.fillna(by_name)
+
+
+def import_grades(manager: StudentManager, df: pd.DataFrame, subjects: Iterable[str],
+                  allow_new_subjects: bool = False) -> GradeImportReport:
+    """Not çizelgesini doğrular ve notları öğrencilere tek bir toplu kayıtla yazar.
+
+    Doğrulama (0-100 aralığı, bilinen ders, öğrenci eşleşmesi) tüm tablo
+    üzerinde vektörel yapılır; hatalı satırlar rapora eklenir, diğerleri
+    yazılır. Aynı öğrenci ve ders birden fazla kez geçerse son satır geçerlidir.
+    Form alanı tam sayı olduğu için notlar en yakın tam sayıya yuvarlanır.
+    """
+    long = to_long_format(df)
+    long["sid"] = _match_students(long, manager)
+    long["score"] = pd.to_numeric(long["value"].str.replace(",", ".", regex=False), errors="coerce")
+
+    known = set(subjects)
+    reasons = pd.Series("", index=long.index)
+    reasons = reasons.mask(~long["score"].between(0, 100), "Not 0-100 arasında bir sayı olmalı")
+    if not allow_new_subjects:
+        reasons = reasons.mask(~long["subject"].isin(known), "Bilinmeyen ders")
+    reasons = reasons.mask(long["sid"].isna(), "Öğrenci bulunamadı ya da birden fazla öğrenciyle eşleşti")
+
+    invalid = reasons != ""
+    errors = long.loc[invalid, ["row", "name", "subject", "value"]].assign(reason=reasons[invalid])
+
+    valid = long[~invalid].drop_duplicates(["sid", "subject"], keep="last")
+    valid = valid.assign(score=np.floor(valid["score"] + 0.5).astype(int))
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    students = []
+    for student_id, rows in valid.groupby("sid", sort=False):
+        student = manager.load_student(student_id)
+        if student is None:
+            continue
+        imported = dict(zip(rows["subject"], rows["score"].tolist()))
+        student.grades = [g for g in student.grades if g.subject not in imported]
+        student.grades.extend(Grade(subject=s, score=score, date=today) for s, score in imported.items())
+        students.append(student)
+
+    if students:
+        try:
+            manager.save_students(students)
+        except VersionConflictError as e:
+            students = [s for s in students if s.id not in e.student_ids]
+            conflicted = valid[valid["sid"].isin(e.student_ids)]
+            errors = pd.concat([errors, conflicted[["row", "name", "subject", "value"]].assign(
+                reason="Kayıt bu sırada başka bir oturumda değişti, tekrar deneyin")])
+
+    return GradeImportReport(
+        students=len(students),
+        grades=int(valid["sid"].isin([s.id for s in students]).sum()),
+        new_subjects=sorted(set(valid["subject"]) - known),
+        student_ids=[s.id for s in students],
+        errors=errors.sort_values("row", kind="stable").reset_index(drop=True),
+    )
@@ -0,0 +1,192 @@
+import io
+import multiprocessing
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+import PyPDF2
+
+from student_streamable import Config
+
+SKIPPED_PAGE = "[Sayfa {} okunamadı: zaman aşımı]"
+SKIPPED_REST = "[Sayfa {} ve sonrası okunamadı: zaman aşımı]"
+
+# İşçi süreçte: aralık sırası -> işçinin aralığa başladığı an (time.time, 0 = başlamadı)
+_range_started = None
+
+
+def _page_text(page) -> str:
+    return page.extract_text() or ""
+
+
+def _init_range_worker(started) -> None:
+    global _range_started
+    _range_started = started
+
+
+def _extract_range(data: bytes, task: int, start: int, stop: int, max_chars: int) -> List[str]:
+    """İşçi süreçte çalışır: [start, stop) sayfalarını okur, sınır dolunca durur.
+
+    Başlama anı, ana süreç süreyi buradan saysın diye paylaşılan diziye yazılır.
+    """
+    _range_started[task] = time.time()
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    parts, total = [], 0
+    for index in range(start, stop):
+        text = _page_text(reader.pages[index])
+        parts.append(text)
+        total += len(text) + 1
+        if total >= max_chars:
+            break
+    return parts
+
+
+def _call_with_timeout(func, timeout: float):
+    """func'ı ayrı bir thread'de çalıştırır; süre dolarsa TimeoutError fırlatır.
+
+    Takılan thread durdurulamaz ama daemon olduğu için arayüzü ve çıkışı
+    bekletmez. func'ın fırlattığı hata aynen yeniden fırlatılır.
+    """
+    outcome: List[Tuple[bool, object]] = []
+
+    def run():
+        try:
+            outcome.append((True, func()))
+        except Exception as e:
+            outcome.append((False, e))
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if not outcome:
+        raise TimeoutError()
+    ok, value = outcome[0]
+    if not ok:
+        raise value
+    return value
+
+
+def _open_reader(data: bytes) -> Tuple["PyPDF2.PdfReader", int]:
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return reader, len(reader.pages)
+
+
+def _extract_serial(reader: "PyPDF2.PdfReader", page_count: int, max_chars: int,
+                    page_timeout: float) -> List[str]:
+    """Sayfaları bu süreçte sırayla okur.
+
+    Süresi dolan sayfanın thread'i okuyucuyu kullanmaya devam eder; PyPDF2
+    okuyucusu thread-safe olmadığı için okuma o sayfada bırakılır. Böylece
+    belge başına en fazla bir thread takılı kalır.
+    """
+    parts, total = [], 0
+    for index in range(page_count):
+        try:
+            text = _call_with_timeout(lambda: _page_text(reader.pages[index]), page_timeout)
+        except TimeoutError:
+            print(f"PDF sayfası zaman aşımına uğradı, okuma durduruldu: {index + 1}")
+            parts.append(SKIPPED_REST.format(index + 1))
+            break
+        parts.append(text)
+        total += len(text) + 1
+        if total >= max_chars:
+            break
+    return parts
+
+
+def _wait_range(result: "multiprocessing.pool.AsyncResult", started, task: int,
+                budget: float) -> Optional[List[str]]:
+    """Aralığın sonucunu bekler; süre dolarsa None döner.
+
+    Süre, işçi aralığa gerçekten başladığında işlemeye başlar; havuzun
+    açılması ya da boş işçi beklemek süreden sayılmaz.
+    """
+    while not started[task]:
+        if result.ready():
+            return result.get()
+        result.wait(0.05)
+    try:
+        return result.get(timeout=max(started[task] + budget - time.time(), 0))
+    except multiprocessing.TimeoutError:
+        return None
+
+
+def _extract_parallel(data: bytes, page_count: int, max_chars: int, page_timeout: float,
+                      workers: int) -> List[str]:
+    """Sayfa aralıklarını süreç havuzunda sırayla okur.
+
+    Aynı anda en fazla `workers` aralık işlenir; sonuçlar sayfa sırasıyla
+    toplanır ve karakter sınırı dolunca kalan aralıklar hiç gönderilmez,
+    çalışanlar sonlandırılır. Süresi dolan aralık atlanır. Takılan işçi
+    durdurulamadığı için havuz o anda kapatılıp yeniden kurulur, bitmemiş
+    diğer aralıklar yeni havuza yeniden gönderilir.
+    """
+    step = Config.PDF_PAGES_PER_TASK
+    tasks = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    context = multiprocessing.get_context("spawn")
+    started = context.Array("d", len(tasks))
+    pending = deque(range(len(tasks)))
+    in_flight: "deque[Tuple[int, multiprocessing.pool.AsyncResult]]" = deque()
+    parts, total = [], 0
+
+    def new_pool() -> "multiprocessing.pool.Pool":
+        return context.Pool(processes=workers, initializer=_init_range_worker, initargs=(started,))
+
+    def submit(task: int) -> "multiprocessing.pool.AsyncResult":
+        started[task] = 0
+        start, stop = tasks[task]
+        return pool.apply_async(_extract_range, (data, task, start, stop, max_chars))
+
+    pool = new_pool()
+    try:
+        while pending or in_flight:
+            while pending and len(in_flight) < workers:
+                task = pending.popleft()
+                in_flight.append((task, submit(task)))
+
+            task, result = in_flight.popleft()
+            start, stop = tasks[task]
+            pages = _wait_range(result, started, task, page_timeout * (stop - start))
+            if pages is None:
+                print(f"PDF sayfaları zaman aşımına uğradı: {start + 1}-{stop}")
+                pages = [SKIPPED_PAGE.format(f"{start + 1}-{stop}")]
+                pool.terminate()
+                pool = new_pool()
+                # Kapatmadan önce biten sonuçlar korunur, yarım kalanlar yeniden gönderilir
+                in_flight = deque((t, r if r.ready() else submit(t)) for t, r in in_flight)
+
+            for text in pages:
+                parts.append(text)
+                total += len(text) + 1
+            if total >= max_chars:
+                break
+    finally:
+        # Takılan ya da artık gereksiz olan işler beklenmeden sonlandırılır
+        pool.terminate()
+    return parts
+
+
+def extract_pdf_text(data: bytes, max_chars: Optional[int] = None, page_timeout: Optional[float] = None,
+                     workers: Optional[int] = None) -> str:
+    """PDF metnini sayfa sayfa çıkarır, max_chars dolunca okumayı bırakır.
+
+    Kısa belgeler bu süreçte okunur. Config.PDF_PARALLEL_MIN_PAGES ve üzeri
+    sayfalı belgeler, birden fazla işçi varsa süreç havuzunda aralıklar
+    halinde okunur. Verilmeyen değerler çağrı anında Config'ten okunur.
+    """
+    max_chars = Config.MAX_DOCUMENT_CHARS if max_chars is None else max_chars
+    page_timeout = Config.PDF_PAGE_TIMEOUT if page_timeout is None else page_timeout
+    workers = Config.PDF_WORKERS if workers is None else workers
+    try:
+        # Bozuk bir xref ya da sayfa ağacı açılışta da takılabilir
+        reader, page_count = _call_with_timeout(lambda: _open_reader(data), page_timeout)
+    except TimeoutError:
+        raise TimeoutError("PDF açılamadı: zaman aşımı") from None
+
+    if workers > 1 and page_count >= Config.PDF_PARALLEL_MIN_PAGES:
+        parts = _extract_parallel(data, page_count, max_chars, page_timeout, workers)
+    else:
+        parts = _extract_serial(reader, page_count, max_chars, page_timeout)
+
+    return "\n".join(parts)[:max_chars]
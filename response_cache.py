@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import sqlite_lru
+from student_streamable import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used);
+"""
+
+
+def cache_key(model: str, system_prompt: str, prompt: str, options: Dict) -> str:
+    """Model, sistem istemi, tam istem ve üretim ayarlarından kararlı bir anahtar üretir."""
+    raw = json.dumps([model, system_prompt, prompt, options], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Disk üzerinde (SQLite) tutulan istem → yanıt önbelleği.
+
+    Toplam boyut max_bytes değerini aşınca en uzun süredir kullanılmayan
+    kayıtlar silinir (LRU).
+    """
+
+    def __init__(self, path: str, max_bytes: int = Config.RESPONSE_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        sqlite_lru.ensure_dir(path)
+        with sqlite_lru.connect(path) as conn:
+            conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with self._lock, sqlite_lru.connect(self.path) as conn:
+                row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                sqlite_lru.touch(conn, "responses", key)
+                return row[0]
+        except sqlite3.Error as e:
+            print(f"Yanıt önbelleği okunamadı: {e}")
+            return None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            with self._lock, sqlite_lru.connect(self.path) as conn:
+                conn.execute(
+                    """INSERT OR REPLACE INTO responses (key, model, response, size, created, last_used)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (key, model, response, size, now, now)
+                )
+                sqlite_lru.evict(conn, "responses", self.max_bytes)
+        except sqlite3.Error as e:
+            print(f"Yanıt önbelleğe yazılamadı: {e}")
+
+    def clear(self) -> None:
+        with self._lock, sqlite_lru.connect(self.path) as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict:
+        with sqlite_lru.connect(self.path) as conn:
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"entries": count, "bytes": total}
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process genelinde tek bir yanıt önbelleği döndürür."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(os.path.join(Config.DATA_DIR, Config.CACHE_DIR, Config.RESPONSE_CACHE_FILE))
+        return _cache
@@ -1,8 +1,11 @@
-import streamlit.web.cli as stcli
+import argparse
+import multiprocessing
 import os
 import sys
 from pathlib import Path
 
+import startup_profile
+
 
 def resolve_path(path):
     """
@@ -18,11 +21,38 @@ def resolve_path(path):
     return application_path / path
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="UFT Öğrenci Performans Sistemi")
+    parser.add_argument("--server", action="store_true",
+                        help="Sunucu modu: son sekme kapanınca kapanmaz, birden çok oturuma hizmet eder")
+    parser.add_argument("--address", default=None,
+                        help="Sunucu modunda dinlenecek adres (varsayılan 127.0.0.1; ağa açmak için ör. 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=8501, help="Dinlenecek port")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Açılış aşamalarının ve importların sürelerini ilk sayfa çiziminden sonra yazdırır")
+    # Paketlenmiş exe'ye Streamlit/PyInstaller'ın eklediği bilinmeyen argümanlar yok sayılır
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
 def main():
     """
     Streamlit uygulamasını başlatır.
+
+    Varsayılan masaüstü modunda son tarayıcı sekmesi kapanınca uygulama
+    kayıtları yazıp kapanır. --server ile süreç açık kalır; her oturum
+    kapandığında yalnızca o oturumun bekleyen kayıtları yazılır.
     """
+    args = parse_args()
+    if args.profile_startup:
+        # app.py aynı süreçte çalışır ve ölçüme kaldığı yerden devam eder
+        os.environ[startup_profile.ENV_VAR] = "1"
+        startup_profile.install()
     try:
+        # Streamlit, profil açıksa ölçülebilsin diye burada yüklenir
+        import streamlit.web.cli as stcli
+        startup_profile.mark("Streamlit CLI importu")
+
         # app.py dosyasının yolunu belirle
         app_path = resolve_path("app.py")
 
@@ -33,7 +63,10 @@ def main():
                 print(f"  - {file}")
             sys.exit(1)
 
-        print(f"🚀 Uygulama başlatılıyor: {app_path}")
+        mode = "server" if args.server else "desktop"
+        # app.py bu değeri Config.APP_MODE olarak okur
+        os.environ["UFT_APP_MODE"] = mode
+        print(f"🚀 Uygulama başlatılıyor ({mode}): {app_path}")
 
         # Streamlit başlatma komutunu hazırla
         sys.argv = [
@@ -43,7 +76,20 @@ def main():
             "--global.developmentMode=false",
             "--browser.gatherUsageStats=false",  # Gizlilik için
             "--logger.level=INFO",  # Log seviyesi
+            f"--server.port={args.port}",
         ]
+        if args.server:
+            # Sunucuda tarayıcı açılmaz. Ağa yalnızca adres açıkça verilirse açılır.
+            address = args.address or "127.0.0.1"
+            sys.argv += [f"--server.address={address}", "--server.headless=true"]
+            print(f"🖥️ Sunucu modu: http://{address}:{args.port}")
+            if args.address is None:
+                print("   Yalnızca bu bilgisayardan erişilebilir; ağa açmak için --address 0.0.0.0 verin.")
+        else:
+            # Yeni Streamlit sürümleri kapanan sekmenin oturumunu bir süre (120 sn) tutar;
+            # masaüstünde uygulama sekme kapanınca hemen kapanabilsin. Eski sürümler bu
+            # değişkeni yok sayar.
+            os.environ.setdefault("STREAMLIT_SERVER_DISCONNECTED_SESSION_TTL", "2")
 
         # Streamlit'i başlat
         sys.exit(stcli.main())
@@ -56,4 +102,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # PDF okuma işçi süreçleri paketlenmiş exe'yi yeniden çalıştırır
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,268 @@
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import sqlite_lru
+from blob_store import BlobStore
+from student_streamable import (BlobRef, Config, Student, StudentListener, StudentManager, StudentSummary,
+                                fold_turkish)
+
+# Silinen satırları doğrudan temizleyebilen içeriksiz FTS5 tabloları SQLite 3.43 ile geldi
+CONTENTLESS_DELETE = sqlite3.sqlite_version_info >= (3, 43, 0)
+# Şema değişince artırılır. Dosyadaki değer (PRAGMA user_version) farklıysa, ör. SQLite
+# sürümü değişip docs tablosunun türü uymuyorsa, dizin silinip kayıtlardan yeniden kurulur.
+SCHEMA_VERSION = 3
+_SCHEMA_ID = SCHEMA_VERSION * 10 + int(CONTENTLESS_DELETE)
+
+# docs içeriksiz (content='') bir FTS5 tablosudur: yalnızca sadeleştirilmiş metnin
+# dizinini tutar, metnin kendisini saklamaz. rowid'si entries.id ile aynıdır.
+# entries metin yerine yalnızca özetini (digest) tutar; sonuç parçası gösterilirken
+# metin hiç okunmaz. Öğrenciye göre silme entries üzerindeki indeksle yapılır. indexed,
+# her öğrencinin dizinlendiği andaki StudentSummary.revision değerini tutar.
+SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(
+    body,
+    content = '',
+    {"contentless_delete = 1," if CONTENTLESS_DELETE else ""}
+    tokenize = "unicode61 remove_diacritics 2"
+);
+CREATE TABLE IF NOT EXISTS entries (
+    -- AUTOINCREMENT: eski SQLite'ta docs'ta kalan satırların rowid'si yeni kayda verilmesin
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    label TEXT NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_student ON entries(student_id);
+CREATE TABLE IF NOT EXISTS indexed (
+    student_id TEXT PRIMARY KEY,
+    revision TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Eski SQLite'ta docs'ta biriken ölü satır sayısı bunu ve canlı satır sayısını aşınca dizin yeniden kurulur
+STALE_REBUILD_MIN = 1000
+
+
+@dataclass
+class SearchHit:
+    student: StudentSummary
+    kind: str  # "ödev" | "analiz"
+    label: str
+
+
+def _match_expression(query: str) -> Optional[str]:
+    """Sorguyu FTS5 ifadesine çevirir: her kelime önek olarak aranır, hepsi geçmeli."""
+    tokens = [t for t in re.split(r"[^\w]+", fold_turkish(query)) if t]
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def _student_texts(student: Student) -> List[Tuple[str, str, str, object]]:
+    """Dizinlenecek metinler: (tür, etiket, SHA-256 özeti, ham değer).
+
+    Ham değer blob deposundaki bir metnin referansı (BlobRef) olabilir; özeti
+    referansın anahtarıdır, böylece değişmeyen metinler okunup açılmaz.
+    """
+    texts = []
+    raw = vars(student)["file_content"]
+    if raw:
+        texts.append(("ödev", "Ödev dosyası", raw))
+    for insight in student.ai_insights:
+        texts.append(("analiz", f"{insight.date} · {insight.model}", vars(insight)["analysis"]))
+    return [(kind, label, raw.key if isinstance(raw, BlobRef) else BlobStore.key_for(raw), raw)
+            for kind, label, raw in texts]
+
+
+def _read(raw) -> str:
+    return raw.read() if isinstance(raw, BlobRef) else raw
+
+
+class SearchIndex(StudentListener):
+    """Ödev metinleri ve yapay zeka analizleri üzerinde SQLite FTS5 tam metin dizini.
+
+    Metinler Türkçe harfler ASCII'ye indirilip küçük harfe çevrilerek
+    dizinlenir (fold_turkish), böylece "DİKKAT", "dikkat" ve "dıkkat" aynı
+    kelime sayılır. StudentManager bildirimleriyle yalnızca değişen öğrenci
+    yeniden dizinlenir; başka süreçlerin yaptığı değişiklikler için her
+    aramadan önce özetlerin revision değerleri dizindekilerle karşılaştırılır.
+    Öğrencinin metinlerinden yalnızca özeti değişenler yeniden dizinlenir;
+    dizin metinlerin kopyasını tutmaz. Dizin her değiştiğinde `generation`
+    artar; arayüz sonuçları bu değerle önbelleğe alabilir.
+    """
+
+    def __init__(self, manager: StudentManager, path: str):
+        self.manager = manager
+        self.path = path
+        self._lock = threading.Lock()
+        # Son eşitlemede görülen öğrenci -> revision; özetler aynıysa veritabanına bakılmaz
+        self._synced_state: Optional[Dict[str, str]] = None
+        self.generation = 0
+        sqlite_lru.ensure_dir(path)
+        self._create_schema()
+        StudentManager.add_listener(self)
+
+    def _create_schema(self) -> None:
+        with sqlite_lru.connect(self.path) as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_ID:
+                # Eski şemadaki dizin (metin kopyalarıyla) silinir; sync() kayıtlardan yeniden kurar
+                for table in ("docs", "entries", "indexed", "meta"):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_ID}")
+
+    # --- Dizinleme ---
+    @staticmethod
+    def _delete_entries(conn: sqlite3.Connection, entry_ids: List[int]) -> None:
+        if not entry_ids:
+            return
+        if CONTENTLESS_DELETE:
+            conn.executemany("DELETE FROM docs WHERE rowid = ?", [(i,) for i in entry_ids])
+        else:
+            # Eski SQLite içeriksiz tablodan satır silemez: satır dizinde kalır ama
+            # entries ile eşleşmediği için sonuçlara girmez; sayısı sync() için tutulur
+            conn.execute("INSERT INTO meta (key, value) VALUES ('stale', ?) "
+                         "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value", (len(entry_ids),))
+        conn.executemany("DELETE FROM entries WHERE id = ?", [(i,) for i in entry_ids])
+
+    def _index_student(self, conn: sqlite3.Connection, student: Student, revision: str = "") -> None:
+        existing = {
+            (kind, label, digest): entry_id
+            for entry_id, kind, label, digest in conn.execute(
+                "SELECT id, kind, label, digest FROM entries WHERE student_id = ?", (student.id,))
+        }
+        current = {(kind, label, digest): raw for kind, label, digest, raw in _student_texts(student)}
+
+        self._delete_entries(conn, [entry_id for key, entry_id in existing.items() if key not in current])
+        for (kind, label, digest), raw in current.items():
+            if (kind, label, digest) in existing:
+                continue
+            cursor = conn.execute("INSERT INTO entries (student_id, kind, label, digest) VALUES (?, ?, ?, ?)",
+                                  (student.id, kind, label, digest))
+            conn.execute("INSERT INTO docs (rowid, body) VALUES (?, ?)",
+                         (cursor.lastrowid, fold_turkish(_read(raw))))
+        conn.execute("INSERT OR REPLACE INTO indexed (student_id, revision) VALUES (?, ?)",
+                     (student.id, revision))
+
+    def _remove(self, conn: sqlite3.Connection, student_id: str) -> None:
+        entry_ids = [r[0] for r in conn.execute("SELECT id FROM entries WHERE student_id = ?", (student_id,))]
+        self._delete_entries(conn, entry_ids)
+        conn.execute("DELETE FROM indexed WHERE student_id = ?", (student_id,))
+
+    @staticmethod
+    def _drop_stale_rows(conn: sqlite3.Connection) -> bool:
+        """Ölü satırlar çoğaldıysa dizini boşaltır (sync() hepsini yeniden dizinler)."""
+        row = conn.execute("SELECT value FROM meta WHERE key = 'stale'").fetchone()
+        stale = row[0] if row else 0
+        live = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if stale <= max(live, STALE_REBUILD_MIN):
+            return False
+        conn.execute("INSERT INTO docs (docs) VALUES ('delete-all')")
+        for table in ("entries", "indexed", "meta"):
+            conn.execute(f"DELETE FROM {table}")
+        return True
+
+    def sync(self) -> int:
+        """Dizini kayıtlarla eşitler; yeniden dizinlenen öğrenci sayısını döndürür.
+
+        Özetler son eşitlemedekiyle aynıysa hiçbir şey yapılmaz; özet listesi
+        kayıt katmanında önbellekli olduğu için bu denetim her aramada yapılabilir.
+        """
+        state = {s.id: s.revision for s in self.manager.list_summaries()}
+        with self._lock:
+            if state == self._synced_state:
+                return 0
+            with sqlite_lru.connect(self.path) as conn:
+                if not CONTENTLESS_DELETE and self._drop_stale_rows(conn):
+                    print("Arama dizini yeniden kuruluyor (silinen satırlar temizleniyor)")
+                indexed = dict(conn.execute("SELECT student_id, revision FROM indexed").fetchall())
+                removed = set(indexed) - set(state)
+                for student_id in removed:
+                    self._remove(conn, student_id)
+                stale = [sid for sid, revision in state.items() if indexed.get(sid) != revision]
+                for student_id in stale:
+                    student = self.manager.load_student(student_id)
+                    if student is not None:
+                        self._index_student(conn, student, state[student_id])
+            self._synced_state = state
+            if stale or removed:
+                self.generation += 1
+        if stale:
+            print(f"Arama dizini güncellendi: {len(stale)} öğrenci")
+        return len(stale)
+
+    # --- StudentListener ---
+    # Bildirimle gelen kaydın revision değeri bilinmez; boş yazılır, bir sonraki
+    # sync() kaydı bir kez daha okuyup (metinleri değişmediyse dizine dokunmadan) işaretler.
+    def student_saved(self, student: Student) -> None:
+        with self._lock:
+            with sqlite_lru.connect(self.path) as conn:
+                self._index_student(conn, student)
+            self._changed()
+
+    def student_changed(self, student_id: str) -> None:
+        student = self.manager.load_student(student_id)
+        if student is not None:
+            self.student_saved(student)
+
+    def student_deleted(self, student_id: str) -> None:
+        with self._lock:
+            with sqlite_lru.connect(self.path) as conn:
+                self._remove(conn, student_id)
+            self._changed()
+
+    def _changed(self) -> None:
+        self._synced_state = None
+        self.generation += 1
+
+    # --- Arama ---
+    def search(self, query: str, limit: int = Config.SEARCH_LIMIT) -> List[SearchHit]:
+        """Öğrenci başına en iyi eşleşmeyi, ilgililiğe (bm25) göre sıralı döndürür.
+
+        Sonuçlar yalnızca dizinden ve özet listesinden kurulur; kayıtlar okunmaz.
+        """
+        expression = _match_expression(query)
+        if expression is None:
+            return []
+        self.sync()
+
+        with sqlite_lru.connect(self.path) as conn:
+            rows = conn.execute(
+                """SELECT e.student_id, e.kind, e.label FROM docs
+                   JOIN entries e ON e.id = docs.rowid
+                   WHERE docs MATCH ? ORDER BY bm25(docs) LIMIT ?""",
+                (expression, limit * 5)
+            ).fetchall()
+        summaries = {s.id: s for s in self.manager.list_summaries()} if rows else {}
+        hits: Dict[str, SearchHit] = {}
+        for student_id, kind, label in rows:
+            summary = summaries.get(student_id)
+            if summary is None or student_id in hits:
+                continue
+            hits[student_id] = SearchHit(summary, kind, label)
+            if len(hits) >= limit:
+                break
+        return list(hits.values())
+
+
+_index: Optional[SearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_search_index(manager: Optional[StudentManager] = None) -> SearchIndex:
+    """Process genelinde tek bir arama dizini döndürür."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            path = os.path.join(Config.DATA_DIR, Config.CACHE_DIR, Config.SEARCH_INDEX_FILE)
+            _index = SearchIndex(manager or StudentManager(), path)
+        return _index
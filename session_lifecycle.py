@@ -0,0 +1,128 @@
+import inspect
+import os
+import queue
+import threading
+import weakref
+from typing import Optional
+
+import streamlit as st
+
+from autosave import AutoSaver, get_autosaver
+from student_streamable import Config
+
+
+class SessionHandle:
+    """Bir oturumu temsil eder; end() ya da nesnenin silinmesi bitiş olayını (bir kez) tetikler."""
+
+    def __init__(self, token: str):
+        self.token = token
+        self.end: Optional[weakref.finalize] = None
+
+
+class SessionTracker:
+    """Açık Streamlit oturumlarını izler, oturum bitince bekleyen kayıtları yazar.
+
+    Oturum bitişi session_handle() ile olaydan gelir: Streamlit destekliyorsa
+    oturum kapsamlı cache_resource'un on_release kancası (bağlantı kopunca
+    çağrılır), desteklemiyorsa session_state ile birlikte silinen nesnenin
+    weakref.finalize geri çağrısı. İkisi aynı finalize nesnesini çağırdığından
+    olay oturum başına bir kez işlenir. Geri çağrı çöp toplama sırasında
+    herhangi bir thread'de çalışabileceği için kilit almadan yalnızca kuyruğa
+    yazar; asıl iş ayrı bir thread'de yapılır. Periyodik yoklama yoktur.
+
+    exit_when_idle (masaüstü modu) açıksa son oturum bittikten sonra grace
+    saniye içinde yeni oturum açılmazsa kayıtlar yazılıp süreç kapatılır.
+    """
+
+    def __init__(self, autosaver: AutoSaver, exit_when_idle: bool, grace: float = Config.DESKTOP_EXIT_GRACE):
+        self.autosaver = autosaver
+        self.exit_when_idle = exit_when_idle
+        self.grace = grace
+        self._lock = threading.Lock()
+        self._active = 0
+        self._exit_timer: Optional[threading.Timer] = None
+        # SimpleQueue.put, finalize geri çağrılarından güvenle çağrılabilir
+        self._events: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="session-lifecycle", daemon=True)
+        self._thread.start()
+
+    def attach(self, token: str) -> SessionHandle:
+        """Yeni oturumu kaydeder; dönen nesne oturumun session_state'inde saklanmalıdır."""
+        handle = SessionHandle(token)
+        handle.end = weakref.finalize(handle, self._events.put, token)
+        with self._lock:
+            self._active += 1
+            if self._exit_timer is not None:
+                self._exit_timer.cancel()
+                self._exit_timer = None
+        return handle
+
+    @property
+    def active_sessions(self) -> int:
+        with self._lock:
+            return self._active
+
+    def _run(self) -> None:
+        while True:
+            self._session_ended(self._events.get())
+
+    def _session_ended(self, token: str) -> None:
+        try:
+            written = self.autosaver.end_session(f"{token}:")
+            if written:
+                print(f"Oturum kapandı, {written} bekleyen kayıt yazıldı")
+        except Exception as e:
+            print(f"Oturum kapanış kaydı hatası: {e}")
+
+        with self._lock:
+            self._active = max(self._active - 1, 0)
+            if self.exit_when_idle and self._active == 0 and self._exit_timer is None:
+                self._exit_timer = threading.Timer(self.grace, self._exit_if_idle)
+                self._exit_timer.daemon = True
+                self._exit_timer.start()
+
+    def _exit_if_idle(self) -> None:
+        with self._lock:
+            self._exit_timer = None
+            if self._active:
+                return
+        print("Tarayıcı kapatıldı, otomatik kayıt yapılıyor...")
+        self.autosaver.flush()
+        os._exit(0)
+
+
+_tracker: Optional[SessionTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_session_tracker(autosaver: Optional[AutoSaver] = None) -> SessionTracker:
+    """Process genelinde tek bir oturum izleyici döndürür (Config.APP_MODE'a göre)."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = SessionTracker(autosaver or get_autosaver(),
+                                      exit_when_idle=Config.APP_MODE != "server")
+        return _tracker
+
+
+def _release(handle: SessionHandle) -> None:
+    handle.end()
+
+
+# Oturum kapsamlı önbellek ve on_release kancası yeni Streamlit sürümlerinde var
+_cache_params = inspect.signature(st.cache_resource).parameters
+if "scope" in _cache_params and "on_release" in _cache_params:
+    @st.cache_resource(scope="session", on_release=_release, show_spinner=False)
+    def _session_resource(token: str) -> SessionHandle:
+        return get_session_tracker().attach(token)
+else:
+    _session_resource = None
+
+
+def session_handle(token: str) -> SessionHandle:
+    """Geçerli oturumun SessionHandle'ı; dönen nesne session_state'te saklanmalıdır."""
+    if _session_resource is not None:
+        return _session_resource(token)
+    if "session_handle" in st.session_state:
+        return st.session_state.session_handle
+    return get_session_tracker().attach(token)
@@ -0,0 +1,42 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+
+def ensure_dir(path: str) -> None:
+    """Veritabanı dosyasının klasörünü yoksa oluşturur."""
+    # Paralel işçi süreçleri aynı klasörü aynı anda oluşturabilir
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+
+@contextmanager
+def connect(path: str):
+    """WAL modunda bir bağlantı açar; blok hatasız biterse commit, hata olursa rollback yapılır."""
+    conn = sqlite3.connect(path, timeout=10)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def touch(conn: sqlite3.Connection, table: str, key: str) -> None:
+    """Kaydın son kullanım zamanını günceller."""
+    conn.execute(f"UPDATE {table} SET last_used = ? WHERE key = ?", (time.time(), key))
+
+
+def evict(conn: sqlite3.Connection, table: str, max_bytes: int) -> None:
+    """Toplam boyut max_bytes altına inene kadar en uzun süredir kullanılmayan kayıtları siler (LRU).
+
+    Tabloda key, size ve last_used sütunları olmalıdır.
+    """
+    total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+    if total <= max_bytes:
+        return
+    for key, size in conn.execute(f"SELECT key, size FROM {table} ORDER BY last_used").fetchall():
+        conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        total -= size
+        if total <= max_bytes:
+            break
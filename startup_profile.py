@@ -0,0 +1,100 @@
+import builtins
+import os
+import sys
+import threading
+import time
+from importlib.util import resolve_name
+from typing import Dict, List, Tuple
+
+# run_app.py --profile-startup bu değişkeni ayarlar; Streamlit betiği de aynı süreçte okur
+ENV_VAR = "UFT_PROFILE_STARTUP"
+TOP_IMPORTS = 25
+
+_lock = threading.Lock()
+_local = threading.local()
+_original_import = None
+_startup_cpu = 0.0
+_last_mark = 0.0
+_phases: List[Tuple[str, float]] = []
+# modül adı -> (toplam süre, kendi süresi); yalnızca ilk (gerçek) yükleme ölçülür
+_imports: Dict[str, Tuple[float, float]] = {}
+_reported = False
+
+
+def enabled() -> bool:
+    return os.environ.get(ENV_VAR) == "1"
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    full_name = name
+    if level:
+        try:
+            full_name = resolve_name("." * level + name, (globals or {}).get("__package__") or "")
+        except (ImportError, ValueError):
+            return _original_import(name, globals, locals, fromlist, level)
+    if full_name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(0.0)  # iç içe importların süresi burada toplanır
+    started = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - started
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        with _lock:
+            _imports.setdefault(full_name, (elapsed, elapsed - children))
+
+
+def install() -> None:
+    """Import süre ölçümünü başlatır (ENV_VAR=1 değilse hiçbir şey yapmaz)."""
+    global _original_import, _startup_cpu, _last_mark
+    if not enabled():
+        return
+    with _lock:
+        if _original_import is not None:
+            return
+        _original_import = builtins.__import__
+        builtins.__import__ = _timed_import
+        # Ölçüm başlamadan önce harcanan süre (yorumlayıcının açılışı)
+        _startup_cpu = time.process_time()
+        _last_mark = time.perf_counter()
+
+
+def mark(phase: str) -> None:
+    """Önceki işaretten bu yana geçen süreyi bir aşama olarak kaydeder."""
+    global _last_mark
+    if _original_import is None or _reported:
+        return
+    now = time.perf_counter()
+    with _lock:
+        _phases.append((phase, now - _last_mark))
+        _last_mark = now
+
+
+def report() -> None:
+    """Aşama ve import sürelerini bir kez yazdırır ve ölçümü durdurur."""
+    global _reported
+    if _original_import is None or _reported:
+        return
+    with _lock:
+        _reported = True
+        builtins.__import__ = _original_import
+        phases, imports = list(_phases), dict(_imports)
+
+    total = sum(seconds for _, seconds in phases)
+    lines = ["", "⏱️ Açılış profili", f"  Ölçüm öncesi Python açılışı (CPU): {_startup_cpu * 1000:.0f} ms",
+             "  Aşamalar:"]
+    lines += [f"    {name:<52} {seconds * 1000:8.0f} ms" for name, seconds in phases]
+    lines.append(f"    {'Toplam':<52} {total * 1000:8.0f} ms")
+    lines.append(f"  En yavaş {TOP_IMPORTS} import (kendi süresi / alt importlarla toplam), "
+                 f"{len(imports)} modül yüklendi:")
+    slowest = sorted(imports.items(), key=lambda item: item[1][1], reverse=True)[:TOP_IMPORTS]
+    lines += [f"    {name:<52} {own * 1000:8.1f} ms / {inclusive * 1000:8.1f} ms"
+              for name, (inclusive, own) in slowest]
+    print("\n".join(lines), flush=True)
@@ -0,0 +1,973 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, fields
+from typing import List, Optional, Generator, Dict, Set, Tuple
+
+from blob_store import BlobStore
+from student_streamable import (Config, Student, StudentSummary, Grade, BehaviorNote, AIInsight, BlobRef,
+                                VersionConflictError)
+
+# Öğrenci dosyası olmayan, veri klasöründe bulunabilecek dosyalar
+MANIFEST_FILE = "_manifest.json"
+JOURNAL_SUFFIX = ".journal.jsonl"
+IGNORED_FILES = {"changelog.json", "settings.json", "config.json", ".ds_store", MANIFEST_FILE}
+# Klasör zaman damgası bu süreden yeniyse ona güvenilmez: aynı zaman dilimi içinde
+# eklenen bir dosya damgayı değiştirmeyebilir (bkz. git'teki "racy" dosyalar)
+DIR_MTIME_SETTLE_NS = 2_000_000_000
+
+
+class StorageBackend(ABC):
+    """StudentManager'ın kullandığı kalıcılık arayüzü.
+
+    Tam kayıtlar sürüm kontrollüdür: diskteki sürüm student.version değilse
+    VersionConflictError fırlatılır, başarılı yazımda student.version artırılır.
+    Analiz/not eklemeleri sürümü değiştirmez; kayıt okunduğundan beri eklenenler
+    sonraki tam kayıtta korunur.
+    """
+
+    @abstractmethod
+    def save_student(self, student: Student, force: bool = False) -> None:
+        ...
+
+    @abstractmethod
+    def load_student(self, student_id: str) -> Optional[Student]:
+        ...
+
+    @abstractmethod
+    def delete_student(self, student_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def list_summaries(self, class_name: Optional[str] = None, name_prefix: Optional[str] = None,
+                       offset: int = 0, limit: Optional[int] = None) -> List[StudentSummary]:
+        ...
+
+    @abstractmethod
+    def count_summaries(self, class_name: Optional[str] = None, name_prefix: Optional[str] = None) -> int:
+        ...
+
+    @abstractmethod
+    def list_classes(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def get_all_students(self) -> List[Student]:
+        ...
+
+    @abstractmethod
+    def append_insight(self, student_id: str, insight: AIInsight, updated_at: str) -> None:
+        """Tek bir analizi, kaydın tamamını yeniden yazmadan ekler."""
+        ...
+
+    @abstractmethod
+    def append_grade(self, student_id: str, grade: Grade, updated_at: str) -> None:
+        """Tek bir notu (aynı ders varsa üzerine yazarak) ekler."""
+        ...
+
+    def save_students(self, students: List[Student]) -> List[str]:
+        """Birden çok kaydı tek seferde yazar; arka uçlar bunu toplu yazımla hızlandırır.
+
+        Sürümü çakışan kayıtlar yazılmaz, kimlikleri döndürülür.
+        """
+        conflicts = []
+        for student in students:
+            try:
+                self.save_student(student)
+            except VersionConflictError:
+                conflicts.append(student.id)
+        return conflicts
+
+    def compact(self, student_id: str) -> None:
+        """Birikmiş ekleme günlüğünü ana kayda katlar (gerekmiyorsa bir şey yapmaz)."""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def _filter_summaries(summaries: List[StudentSummary], class_name: Optional[str],
+                      name_prefix: Optional[str]) -> List[StudentSummary]:
+    if class_name is not None:
+        summaries = [s for s in summaries if s.class_name == class_name]
+    if name_prefix:
+        summaries = [s for s in summaries if s.name.startswith(name_prefix)]
+    return summaries
+
+
+# ---------------------------------------------------------
+# JSON KLASÖRÜ (Her öğrenci için ayrı dosya)
+# ---------------------------------------------------------
+class _StudentIndex:
+    """Process genelinde (tüm oturumlarda) paylaşılan öğrenci önbelleği.
+
+    Her kayıt için (mtime_ns, size, günlük boyutu) imzası tutulur; tarama
+    sırasında yalnızca imzası değişen kayıtlar yeniden okunur. Özetler ayrıca diskteki manifest
+    dosyasında saklanır, böylece soğuk başlangıçta da tüm kayıtlar okunmaz.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Tuple[Tuple[int, int, int], Optional[Student]]] = {}
+        self.sorted_cache: Optional[List[Student]] = None
+        self.summaries: Dict[str, Tuple[Tuple[int, int, int], Optional[StudentSummary]]] = {}
+        self.sorted_summaries: Optional[List[StudentSummary]] = None
+        # sorted_summaries'in dayandığı klasör zaman damgası; değişmedikçe klasör taranmaz
+        self.summaries_dir_mtime: Optional[int] = None
+        self.manifest_loaded = False
+
+
+_INDEXES: Dict[str, _StudentIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def _revision(signature: Tuple[int, int, int]) -> str:
+    return "{}:{}:{}".format(*signature)
+
+
+def _get_index(data_dir: str) -> _StudentIndex:
+    key = os.path.abspath(data_dir)
+    with _INDEXES_LOCK:
+        if key not in _INDEXES:
+            _INDEXES[key] = _StudentIndex()
+        return _INDEXES[key]
+
+
+def _apply_journal_entry(student: Student, entry: Dict) -> None:
+    op, data = entry.get("op"), entry.get("data", {})
+    if op == "insight":
+        insight = AIInsight(**{k: v for k, v in data.items() if k in AIInsight.__annotations__})
+        # Sıkıştırma yarıda kalmışsa aynı analiz hem kayıtta hem günlükte olabilir.
+        # Ham alanlar karşılaştırılır ki blob referansları gereksiz yere okunmasın.
+        if vars(insight) not in [vars(i) for i in student.ai_insights]:
+            student.ai_insights.append(insight)
+    elif op == "grade":
+        grade = Grade(**{k: v for k, v in data.items() if k in Grade.__annotations__})
+        student.grades = [g for g in student.grades if g.subject != grade.subject]
+        student.grades.append(grade)
+    else:
+        raise ValueError(f"Bilinmeyen günlük kaydı: {op}")
+    if entry.get("updated_at"):
+        student.last_updated = entry["updated_at"]
+
+
+_STUDENT_LOCKS: Dict[Tuple[str, str], threading.Lock] = {}
+_STUDENT_LOCKS_LOCK = threading.Lock()
+
+
+def _record_blob_keys(record) -> Set[str]:
+    """Ham JSON kaydındaki {"$blob": ...} referanslarının anahtarları."""
+    if not isinstance(record, dict):
+        return set()
+    values = [record.get("file_content")]
+    values += [i.get("analysis") for i in record.get("ai_insights") or [] if isinstance(i, dict)]
+    return {v["$blob"] for v in values if isinstance(v, dict) and "$blob" in v}
+
+
+def _student_lock(data_dir: str, student_id: str) -> threading.Lock:
+    """Öğrenci başına kilit: farklı öğrencilerin kayıtları birbirini beklemez."""
+    key = (os.path.abspath(data_dir), student_id)
+    with _STUDENT_LOCKS_LOCK:
+        lock = _STUDENT_LOCKS.get(key)
+        if lock is None:
+            lock = _STUDENT_LOCKS[key] = threading.Lock()
+        return lock
+
+
+class JsonStorage(StorageBackend):
+    """Her öğrenci için <id>.json anlık görüntüsü + <id>.journal.jsonl ekleme günlüğü.
+
+    Analiz ve not eklemeleri günlüğe tek satır olarak yazılır; load_student
+    günlüğü anlık görüntünün üzerine uygular. Günlük Config.JOURNAL_MAX_BYTES
+    boyutunu aşınca ya da tam kayıt yapılınca anlık görüntüye katlanır.
+
+    Ödev metni ve analiz gibi uzun alanlar BlobStore'a taşınır; kayıtta yalnızca
+    {"$blob": <sha256>} referansı durur ve metin ilk erişimde okunur. Bir kayıt
+    yeniden yazılınca ya da silinince artık referansı kalmayan blob'lar silinir.
+
+    Anlık görüntü geçici dosyaya yazılıp os.replace ile yerine konur; okuyan
+    taraf hiçbir zaman yarım yazılmış dosya görmez. Yazımlar öğrenci başına
+    kilitle sıralanır.
+    """
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+        self.blobs = BlobStore(os.path.join(self.data_dir, Config.BLOB_DIR))
+
+    def _pack(self, value):
+        """Uzun metni blob deposuna taşır, JSON'a yazılacak değeri döndürür."""
+        if isinstance(value, BlobRef):
+            return {"$blob": value.key}
+        if isinstance(value, str) and len(value) >= Config.BLOB_MIN_CHARS:
+            return {"$blob": self.blobs.put(value)}
+        return value
+
+    def _unpack(self, value):
+        if isinstance(value, dict) and "$blob" in value:
+            return BlobRef(value["$blob"], self.blobs)
+        return value
+
+    def _pack_insight(self, insight: AIInsight) -> Dict:
+        # vars() ham değerleri verir; henüz okunmamış BlobRef'ler okunmadan yazılır
+        data = dict(vars(insight))
+        data["analysis"] = self._pack(data["analysis"])
+        return data
+
+    def _to_record(self, student: Student) -> Dict:
+        raw = vars(student)
+        record = {f.name: raw[f.name] for f in fields(Student)}
+        record["file_content"] = self._pack(record["file_content"])
+        record["grades"] = [asdict(g) for g in student.grades]
+        record["behavior_notes"] = [asdict(n) for n in student.behavior_notes]
+        record["ai_insights"] = [self._pack_insight(i) for i in student.ai_insights]
+        return record
+
+    def _get_path(self, student_id: str) -> str:
+        return os.path.join(self.data_dir, f"{student_id}.json")
+
+    def _get_journal_path(self, student_id: str) -> str:
+        return os.path.join(self.data_dir, f"{student_id}{JOURNAL_SUFFIX}")
+
+    def _signature(self, student_id: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self._get_path(student_id))
+        except OSError:
+            return None
+        try:
+            journal_size = os.path.getsize(self._get_journal_path(student_id))
+        except OSError:
+            journal_size = 0
+        return stat.st_mtime_ns, stat.st_size, journal_size
+
+    def _disk_version(self, student_id: str) -> Optional[int]:
+        """Diskteki kaydın sürümü; kayıt yoksa None."""
+        path = self._get_path(student_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return int(json.load(f).get("version", 0))
+        except Exception as e:
+            print(f"Sürüm okunamadı ({student_id}): {e}")
+            return 0
+
+    def _journal_appends(self, student_id: str) -> Tuple[List[AIInsight], List[Grade]]:
+        """Son tam kayıttan beri günlüğe eklenmiş analiz ve notlar."""
+        carrier = Student(id=student_id, name="", class_name="")
+        self._replay_journal(carrier)
+        return carrier.ai_insights, carrier.grades
+
+    def save_student(self, student: Student, force: bool = False) -> None:
+        with _student_lock(self.data_dir, student.id):
+            self._save_checked(student, force)
+
+    def save_students(self, students: List[Student]) -> List[str]:
+        """Kayıtları sırayla yazar, manifesti yalnızca sonda bir kez günceller."""
+        conflicts = []
+        try:
+            for student in students:
+                with _student_lock(self.data_dir, student.id):
+                    try:
+                        self._save_checked(student, write_manifest=False)
+                    except VersionConflictError:
+                        conflicts.append(student.id)
+        finally:
+            index = _get_index(self.data_dir)
+            with index.lock:
+                self._write_manifest(index)
+        return conflicts
+
+    def _save_checked(self, student: Student, force: bool = False, write_manifest: bool = True) -> None:
+        current = self._disk_version(student.id)
+        if not force and (current or 0) != student.version:
+            raise VersionConflictError([student.id])
+        if current is not None:
+            student.merge_appended(*self._journal_appends(student.id))
+
+        previous = student.version
+        student.version = (current or 0) + 1
+        try:
+            self._write_snapshot(student, write_manifest)
+        except Exception:
+            student.version = previous
+            raise
+
+    def _write_snapshot(self, student: Student, write_manifest: bool = True) -> None:
+        path = self._get_path(student.id)
+        # Başka süreçlerle çakışmaması için geçici dosya adı süreç/thread'e özgü
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        previous_blobs = self._blob_keys(student.id)
+        record = self._to_record(student)
+        try:
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(record, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            # Tam kayıt günlükteki her şeyi zaten içerir
+            journal_path = self._get_journal_path(student.id)
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+        except Exception:
+            self._invalidate(student.id)
+            raise
+
+        index = _get_index(self.data_dir)
+        with index.lock:
+            index.entries.pop(student.id, None)
+            index.sorted_cache = None
+
+            signature = self._signature(student.id)
+            if signature is not None:
+                summary = StudentSummary.from_student(student)
+                summary.revision = _revision(signature)
+                index.summaries[student.id] = (signature, summary)
+                index.sorted_summaries = None
+                if write_manifest:
+                    self._write_manifest(index)
+
+        orphaned = previous_blobs - _record_blob_keys(record)
+        if orphaned:
+            self.collect_blobs(orphaned)
+
+    def _invalidate(self, student_id: str) -> None:
+        """Önbellekteki kaydı düşürür; bir sonraki taramada dosya yeniden okunur."""
+        index = _get_index(self.data_dir)
+        with index.lock:
+            index.entries.pop(student_id, None)
+            index.sorted_cache = None
+            index.summaries.pop(student_id, None)
+            index.sorted_summaries = None
+
+    def load_student(self, student_id: str) -> Optional[Student]:
+        path = self._get_path(student_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data["file_content"] = self._unpack(data.get("file_content", ""))
+                for insight in data.get("ai_insights", []):
+                    if isinstance(insight, dict) and "analysis" in insight:
+                        insight["analysis"] = self._unpack(insight["analysis"])
+            student = Student.from_dict(data)
+        except Exception as e:
+            print(f"Dosya Yüklenemedi ({student_id}): {e}")
+            return None
+
+        self._replay_journal(student)
+        return student
+
+    def _replay_journal(self, student: Student) -> None:
+        journal_path = self._get_journal_path(student.id)
+        if not os.path.exists(journal_path):
+            return
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    if entry.get("op") == "insight":
+                        entry["data"]["analysis"] = self._unpack(entry["data"].get("analysis"))
+                    _apply_journal_entry(student, entry)
+                except Exception as e:
+                    # Yarım yazılmış son satır vb. kayıt tamamını bozmasın
+                    print(f"Günlük satırı atlandı ({student.id}): {e}")
+
+    def _append_journal(self, student_id: str, op: str, data: Dict, updated_at: str) -> None:
+        if not os.path.exists(self._get_path(student_id)):
+            raise KeyError(f"Öğrenci bulunamadı: {student_id}")
+
+        line = json.dumps({"op": op, "data": data, "updated_at": updated_at}, ensure_ascii=False)
+        journal_path = self._get_journal_path(student_id)
+        with _student_lock(self.data_dir, student_id):
+            with open(journal_path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+            index = _get_index(self.data_dir)
+            with index.lock:
+                index.entries.pop(student_id, None)
+                index.sorted_cache = None
+                cached = index.summaries.get(student_id)
+                signature = self._signature(student_id)
+                if cached is not None and cached[1] is not None and signature is not None \
+                        and cached[0][:2] == signature[:2]:
+                    # Manifest burada yazılmaz (her eklemede tüm manifest yeniden yazılırdı).
+                    # Diskteki manifestte günlük boyutu eski kalır; yeniden başlatınca bu
+                    # kayıt bir kez okunur ve doğru zaman damgası manifeste o zaman yazılır.
+                    cached[1].last_updated = updated_at
+                    cached[1].revision = _revision(signature)
+                    index.summaries[student_id] = (signature, cached[1])
+
+            if os.path.getsize(journal_path) > Config.JOURNAL_MAX_BYTES:
+                self._compact_locked(student_id)
+
+    def append_insight(self, student_id: str, insight: AIInsight, updated_at: str) -> None:
+        self._append_journal(student_id, "insight", self._pack_insight(insight), updated_at)
+
+    def append_grade(self, student_id: str, grade: Grade, updated_at: str) -> None:
+        self._append_journal(student_id, "grade", asdict(grade), updated_at)
+
+    def compact(self, student_id: str) -> None:
+        with _student_lock(self.data_dir, student_id):
+            self._compact_locked(student_id)
+
+    def _compact_locked(self, student_id: str) -> None:
+        if not os.path.exists(self._get_journal_path(student_id)):
+            return
+        student = self.load_student(student_id)
+        if student is None:
+            return
+        self._write_snapshot(student)
+
+    def delete_student(self, student_id: str) -> bool:
+        path = self._get_path(student_id)
+        with _student_lock(self.data_dir, student_id):
+            if not os.path.exists(path):
+                return False
+            orphaned = self._blob_keys(student_id)
+            os.remove(path)
+            journal_path = self._get_journal_path(student_id)
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+        self._invalidate(student_id)
+        if orphaned:
+            self.collect_blobs(orphaned)
+        return True
+
+    def _blob_keys(self, student_id: str) -> Set[str]:
+        """Kaydın anlık görüntüsü ve günlüğünde geçen blob anahtarları (ham okuma)."""
+        keys = set()
+        try:
+            with open(self._get_path(student_id), 'r', encoding='utf-8') as f:
+                keys |= _record_blob_keys(json.load(f))
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(self._get_journal_path(student_id), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, dict) and entry.get("op") == "insight":
+                        keys |= _record_blob_keys({"ai_insights": [entry.get("data")]})
+        except OSError:
+            pass
+        return keys
+
+    def collect_blobs(self, candidates: Optional[Set[str]] = None) -> int:
+        """Hiçbir kaydın referans vermediği blob'ları siler, silinen sayısını döndürür.
+
+        candidates verilirse yalnızca bu anahtarlara bakılır (kayıt yazma/silme
+        sonrası), verilmezse tüm blob deposu taranır.
+        """
+        live = set()
+        for student_id, _signature in self._scan_files():
+            live |= self._blob_keys(student_id)
+        return self.blobs.gc(live, candidates, grace=Config.BLOB_GC_GRACE)
+
+    def _scan_files(self) -> Generator[Tuple[str, Tuple[int, int, int]], None, None]:
+        """Veri klasöründeki öğrenci dosyalarını (id, imza) olarak listeler."""
+        snapshots, journals = [], {}
+        for entry in os.scandir(self.data_dir):
+            filename = entry.name
+            if filename.endswith(JOURNAL_SUFFIX):
+                try:
+                    journals[filename[:-len(JOURNAL_SUFFIX)]] = entry.stat().st_size
+                except OSError:
+                    pass
+                continue
+            if filename.lower() in IGNORED_FILES or not filename.endswith('.json'):
+                continue
+            if not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            snapshots.append((filename[:-len('.json')], stat))
+        for student_id, stat in snapshots:
+            yield student_id, (stat.st_mtime_ns, stat.st_size, journals.get(student_id, 0))
+
+    def _load_manifest(self, index: _StudentIndex) -> None:
+        index.manifest_loaded = True
+        path = os.path.join(self.data_dir, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for student_id, item in data.items():
+                signature = (item["mtime_ns"], item["size"], item.get("journal_size", 0))
+                summary = StudentSummary(id=student_id, name=item["name"], class_name=item["class_name"],
+                                         last_updated=item.get("last_updated", ""), revision=_revision(signature))
+                index.summaries[student_id] = (signature, summary)
+        except Exception as e:
+            # Manifest yalnızca bir önbellek; bozuksa dosyalardan yeniden kurulur
+            print(f"Manifest okunamadı, yeniden oluşturulacak: {e}")
+            index.summaries.clear()
+
+    def _write_manifest(self, index: _StudentIndex) -> None:
+        data = {}
+        for student_id, (signature, summary) in index.summaries.items():
+            if summary is None:
+                continue
+            data[student_id] = {
+                "name": summary.name,
+                "class_name": summary.class_name,
+                "last_updated": summary.last_updated,
+                "mtime_ns": signature[0],
+                "size": signature[1],
+                "journal_size": signature[2],
+            }
+        path = os.path.join(self.data_dir, MANIFEST_FILE)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Manifest yazılamadı: {e}")
+
+    def _all_summaries(self) -> List[StudentSummary]:
+        """Tüm özetler, isme göre sıralı.
+
+        Kayıtlar hep geçici dosya + os.replace ile yazıldığı için klasöre dosya
+        eklenmesi, silinmesi ya da bir kaydın değişmesi klasörün zaman damgasını
+        değiştirir. Damga aynı kaldıkça klasör hiç taranmaz; kenar çubuğunun her
+        çalıştırmada yaptığı çağrılar öğrenci sayısından bağımsız kalır.
+        """
+        try:
+            dir_mtime = os.stat(self.data_dir).st_mtime_ns
+        except OSError:
+            return []
+
+        index = _get_index(self.data_dir)
+        with index.lock:
+            if index.sorted_summaries is not None and index.summaries_dir_mtime == dir_mtime:
+                return index.sorted_summaries
+
+            if not index.manifest_loaded:
+                self._load_manifest(index)
+
+            seen = set()
+            changed = False
+            for student_id, signature in self._scan_files():
+                seen.add(student_id)
+                cached = index.summaries.get(student_id)
+                if cached is not None and cached[0] == signature:
+                    continue
+
+                student = self.load_student(student_id)
+                summary = StudentSummary.from_student(student) if student else None
+                if summary is not None:
+                    summary.revision = _revision(signature)
+                index.summaries[student_id] = (signature, summary)
+                changed = True
+
+            for stale_id in set(index.summaries) - seen:
+                del index.summaries[stale_id]
+                changed = True
+
+            if changed:
+                self._write_manifest(index)
+            if changed or index.sorted_summaries is None:
+                summaries = [s for _, s in index.summaries.values() if s is not None]
+                summaries.sort(key=lambda x: x.name)
+                index.sorted_summaries = summaries
+
+            settled = time.time_ns() - dir_mtime > DIR_MTIME_SETTLE_NS
+            index.summaries_dir_mtime = dir_mtime if settled and not changed else None
+            return index.sorted_summaries
+
+    def list_summaries(self, class_name: Optional[str] = None, name_prefix: Optional[str] = None,
+                       offset: int = 0, limit: Optional[int] = None) -> List[StudentSummary]:
+        """Özetler manifest dosyasından gelir; yalnızca manifestte olmayan veya
+        imzası değişen dosyalar açılıp ayrıştırılır.
+        """
+        summaries = _filter_summaries(self._all_summaries(), class_name, name_prefix)
+        return summaries[offset:offset + limit if limit is not None else None]
+
+    def count_summaries(self, class_name: Optional[str] = None, name_prefix: Optional[str] = None) -> int:
+        return len(_filter_summaries(self._all_summaries(), class_name, name_prefix))
+
+    def list_classes(self) -> List[str]:
+        return sorted({s.class_name for s in self._all_summaries()})
+
+    def get_all_students(self) -> List[Student]:
+        """Sonuç process genelindeki önbellekten gelir; yalnızca imzası (mtime, size,
+        günlük boyutu) değişen kayıtlar yeniden ayrıştırılır. Dönen nesneler oturumlar arasında
+        paylaşıldığı için yerinde değiştirilmemelidir.
+        """
+        if not os.path.exists(self.data_dir):
+            return []
+
+        index = _get_index(self.data_dir)
+        with index.lock:
+            seen = set()
+            changed = False
+
+            for student_id, signature in self._scan_files():
+                seen.add(student_id)
+                cached = index.entries.get(student_id)
+                if cached is not None and cached[0] == signature:
+                    continue
+
+                try:
+                    student = self.load_student(student_id)
+                except Exception as e:
+                    print(f"Öğrenci yüklenirken hata: {student_id}, {e}")
+                    student = None
+                # Bozuk dosyalar da imzasıyla saklanır, değişmedikçe tekrar denenmez
+                index.entries[student_id] = (signature, student)
+                changed = True
+
+            for stale_id in set(index.entries) - seen:
+                del index.entries[stale_id]
+                changed = True
+
+            if changed or index.sorted_cache is None:
+                students = [s for _, s in index.entries.values() if s is not None]
+                students.sort(key=lambda x: x.name)
+                index.sorted_cache = students
+
+            return list(index.sorted_cache)
+
+
+# ---------------------------------------------------------
+# SQLITE (WAL modu, indeksli sorgular)
+# ---------------------------------------------------------
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    class_name TEXT NOT NULL DEFAULT '',
+    enrollment_date TEXT,
+    file_content TEXT NOT NULL DEFAULT '',
+    last_updated TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    -- Her yazımda (günlük eklemeleri dahil) artar; StudentSummary.revision
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_students_name ON students(name);
+CREATE INDEX IF NOT EXISTS idx_students_class ON students(class_name, name);
+
+CREATE TABLE IF NOT EXISTS grades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+    subject TEXT NOT NULL,
+    score REAL NOT NULL,
+    date TEXT,
+    appended INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_grades_student ON grades(student_id);
+
+CREATE TABLE IF NOT EXISTS behavior_notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+    note TEXT NOT NULL,
+    type TEXT NOT NULL,
+    date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_behavior_notes_student ON behavior_notes(student_id);
+
+CREATE TABLE IF NOT EXISTS ai_insights (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+    analysis TEXT NOT NULL,
+    model TEXT NOT NULL,
+    date TEXT,
+    stats TEXT,
+    appended INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_ai_insights_student ON ai_insights(student_id);
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    """Tek dosyalık SQLite veritabanı; her thread kendi bağlantısını kullanır.
+
+    Sürüm kontrolü tek bir koşullu UPDATE ile yapılır (WHERE version = ?), bu
+    yüzden yalnızca aynı öğrencinin kayıtları çakışır. Eklenen analiz ve
+    notlar appended=1 ile işaretlenir; bir sonraki tam kayıtta korunurlar.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self._local = threading.local()
+        self._conn().executescript(SQLITE_SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Eski şemayla oluşturulmuş veritabanlarına yeni sütunları ekler."""
+        conn = self._conn()
+        added = {
+            "ai_insights": [("stats", "TEXT"), ("appended", "INTEGER NOT NULL DEFAULT 0")],
+            "grades": [("appended", "INTEGER NOT NULL DEFAULT 0")],
+            "students": [("version", "INTEGER NOT NULL DEFAULT 0"), ("revision", "INTEGER NOT NULL DEFAULT 0")],
+        }
+        for table, new_columns in added.items():
+            columns = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+            for name, definition in new_columns:
+                if name not in columns:
+                    with conn:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _claim_version(self, conn: sqlite3.Connection, student: Student, force: bool) -> int:
+        """Öğrenci satırını sürüm kontrolüyle yazar, yeni sürümü döndürür."""
+        values = (student.name, student.class_name, student.enrollment_date, student.file_content,
+                  student.last_updated)
+        if force:
+            conn.execute(
+                """INSERT INTO students (name, class_name, enrollment_date, file_content, last_updated, id, version,
+                                        revision)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+                   ON CONFLICT(id) DO UPDATE SET
+                       name=excluded.name, class_name=excluded.class_name,
+                       enrollment_date=excluded.enrollment_date, file_content=excluded.file_content,
+                       last_updated=excluded.last_updated, version=students.version + 1,
+                       revision=students.revision + 1""",
+                values + (student.id, student.version + 1)
+            )
+            return conn.execute("SELECT version FROM students WHERE id = ?", (student.id,)).fetchone()[0]
+
+        cur = conn.execute(
+            """UPDATE students SET name = ?, class_name = ?, enrollment_date = ?, file_content = ?,
+                   last_updated = ?, version = version + 1, revision = revision + 1
+               WHERE id = ? AND version = ?""",
+            values + (student.id, student.version)
+        )
+        if cur.rowcount == 0 and student.version == 0:
+            # Yeni kayıt (sürüm sütunundan önceki kayıtlar 0 olduğu için önce güncelleme denenir)
+            cur = conn.execute(
+                """INSERT INTO students (name, class_name, enrollment_date, file_content, last_updated, id, version,
+                                        revision)
+                   VALUES (?, ?, ?, ?, ?, ?, 1, 1) ON CONFLICT(id) DO NOTHING""",
+                values + (student.id,)
+            )
+        if cur.rowcount == 0:
+            raise VersionConflictError([student.id])
+        return student.version + 1
+
+    def _write_student(self, conn: sqlite3.Connection, student: Student, force: bool = False) -> None:
+        version = self._claim_version(conn, student, force)
+        appended_insights = [
+            AIInsight(analysis=r["analysis"], model=r["model"], date=r["date"],
+                      stats=json.loads(r["stats"]) if r["stats"] else {})
+            for r in conn.execute("SELECT analysis, model, date, stats FROM ai_insights "
+                                  "WHERE student_id = ? AND appended = 1 ORDER BY id", (student.id,))
+        ]
+        appended_grades = [
+            Grade(subject=r["subject"], score=r["score"], date=r["date"])
+            for r in conn.execute("SELECT subject, score, date FROM grades WHERE student_id = ? AND appended = 1 "
+                                  "ORDER BY id", (student.id,))
+        ]
+        student.merge_appended(appended_insights, appended_grades)
+
+        for table in ("grades", "behavior_notes", "ai_insights"):
+            conn.execute(f"DELETE FROM {table} WHERE student_id = ?", (student.id,))
+        conn.executemany(
+            "INSERT INTO grades (student_id, subject, score, date) VALUES (?, ?, ?, ?)",
+            [(student.id, g.subject, g.score, g.date) for g in student.grades]
+        )
+        conn.executemany(
+            "INSERT INTO behavior_notes (student_id, note, type, date) VALUES (?, ?, ?, ?)",
+            [(student.id, n.note, n.type, n.date) for n in student.behavior_notes]
+        )
+        conn.executemany(
+            "INSERT INTO ai_insights (student_id, analysis, model, date, stats) VALUES (?, ?, ?, ?, ?)",
+            [(student.id, i.analysis, i.model, i.date, json.dumps(i.stats)) for i in student.ai_insights]
+        )
+        student.version = version
+
+    def save_student(self, student: Student, force: bool = False) -> None:
+        conn = self._conn()
+        with conn:
+            self._write_student(conn, student, force)
+
+    def save_students(self, students: List[Student]) -> List[str]:
+        conn = self._conn()
+        conflicts = []
+        with conn:
+            for student in students:
+                try:
+                    self._write_student(conn, student)
+                except VersionConflictError:
+                    # Çakışma ilk (öğrenci satırı) yazımda anlaşılır; transaction'da değişiklik kalmaz
+                    conflicts.append(student.id)
+        return conflicts
+
+    def load_student(self, student_id: str) -> Optional[Student]:
+        conn = self._conn()
+        row = conn.execute("SELECT * FROM students WHERE id = ?", (student_id,)).fetchone()
+        if row is None:
+            return None
+
+        grades = [
+            Grade(subject=r["subject"], score=r["score"], date=r["date"])
+            for r in conn.execute("SELECT subject, score, date FROM grades WHERE student_id = ? ORDER BY id",
+                                  (student_id,))
+        ]
+        notes = [
+            BehaviorNote(note=r["note"], type=r["type"], date=r["date"])
+            for r in conn.execute("SELECT note, type, date FROM behavior_notes WHERE student_id = ? ORDER BY id",
+                                  (student_id,))
+        ]
+        insights = [
+            AIInsight(analysis=r["analysis"], model=r["model"], date=r["date"],
+                      stats=json.loads(r["stats"]) if r["stats"] else {})
+            for r in conn.execute("SELECT analysis, model, date, stats FROM ai_insights WHERE student_id = ? "
+                                  "ORDER BY id", (student_id,))
+        ]
+        return Student(
+            id=row["id"],
+            name=row["name"],
+            class_name=row["class_name"],
+            enrollment_date=row["enrollment_date"],
+            grades=grades,
+            behavior_notes=notes,
+            ai_insights=insights,
+            file_content=row["file_content"],
+            last_updated=row["last_updated"],
+            version=row["version"]
+        )
+
+    def _touch(self, conn: sqlite3.Connection, student_id: str, updated_at: str) -> None:
+        cur = conn.execute("UPDATE students SET last_updated = ?, revision = revision + 1 WHERE id = ?",
+                           (updated_at, student_id))
+        if cur.rowcount == 0:
+            raise KeyError(f"Öğrenci bulunamadı: {student_id}")
+
+    def append_insight(self, student_id: str, insight: AIInsight, updated_at: str) -> None:
+        conn = self._conn()
+        with conn:
+            self._touch(conn, student_id, updated_at)
+            conn.execute("INSERT INTO ai_insights (student_id, analysis, model, date, stats, appended) "
+                         "VALUES (?, ?, ?, ?, ?, 1)",
+                         (student_id, insight.analysis, insight.model, insight.date, json.dumps(insight.stats)))
+
+    def append_grade(self, student_id: str, grade: Grade, updated_at: str) -> None:
+        conn = self._conn()
+        with conn:
+            self._touch(conn, student_id, updated_at)
+            conn.execute("DELETE FROM grades WHERE student_id = ? AND subject = ?", (student_id, grade.subject))
+            conn.execute("INSERT INTO grades (student_id, subject, score, date, appended) VALUES (?, ?, ?, ?, 1)",
+                         (student_id, grade.subject, grade.score, grade.date))
+
+    def delete_student(self, student_id: str) -> bool:
+        conn = self._conn()
+        with conn:
+            cur = conn.execute("DELETE FROM students WHERE id = ?", (student_id,))
+        return cur.rowcount > 0
+
+    @staticmethod
+    def _summary_filter(class_name: Optional[str], name_prefix: Optional[str]) -> Tuple[str, List]:
+        clauses, params = [], []
+        if class_name is not None:
+            clauses.append("class_name = ?")
+            params.append(class_name)
+        if name_prefix:
+            # LIKE yerine aralık sorgusu: idx_students_name indeksini kullanır
+            clauses.append("name >= ? AND name < ?")
+            params.extend([name_prefix, name_prefix + "\U0010ffff"])
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def list_summaries(self, class_name: Optional[str] = None, name_prefix: Optional[str] = None,
+                       offset: int = 0, limit: Optional[int] = None) -> List[StudentSummary]:
+        where, params = self._summary_filter(class_name, name_prefix)
+        query = f"SELECT id, name, class_name, last_updated, revision FROM students{where} ORDER BY name"
+        if limit is not None or offset:
+            query += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+
+        return [
+            StudentSummary(id=r["id"], name=r["name"], class_name=r["class_name"],
+                           last_updated=r["last_updated"] or "", revision=str(r["revision"]))
+            for r in self._conn().execute(query, params)
+        ]
+
+    def count_summaries(self, class_name: Optional[str] = None, name_prefix: Optional[str] = None) -> int:
+        where, params = self._summary_filter(class_name, name_prefix)
+        return self._conn().execute(f"SELECT COUNT(*) FROM students{where}", params).fetchone()[0]
+
+    def list_classes(self) -> List[str]:
+        rows = self._conn().execute("SELECT DISTINCT class_name FROM students ORDER BY class_name")
+        return [r["class_name"] for r in rows]
+
+    def get_all_students(self) -> List[Student]:
+        ids = [r["id"] for r in self._conn().execute("SELECT id FROM students ORDER BY name")]
+        return [s for s in (self.load_student(i) for i in ids) if s is not None]
+
+
+def create_backend(kind: Optional[str] = None) -> StorageBackend:
+    """Config.STORAGE_BACKEND değerine göre kalıcılık katmanını oluşturur."""
+    kind = (kind or Config.STORAGE_BACKEND).lower()
+    if kind == "sqlite":
+        return SQLiteStorage(os.path.join(Config.DATA_DIR, Config.SQLITE_FILE))
+    if kind == "json":
+        return JsonStorage(Config.DATA_DIR)
+    raise ValueError(f"Bilinmeyen kayıt türü: {kind}")
+
+
+def migrate_json_to_sqlite(json_dir: str, db_path: str) -> int:
+    """Mevcut student_data/ klasöründeki JSON kayıtlarını SQLite'a tek seferde aktarır.
+
+    Tüm kayıtlar tek bir transaction içinde yazılır; aynı id'ye sahip kayıtlar
+    güncellenir, bu yüzden işlem tekrar çalıştırılabilir.
+    """
+    source = JsonStorage(json_dir)
+    target = SQLiteStorage(db_path)
+    # get_all_students() paylaşılan önbellek nesnelerini döndürür; yazım sırasında
+    # sürüm vb. değiştiği için kayıtlar diskten ayrı ayrı, taze nesneler olarak okunur
+    students = [s for s in (source.load_student(student_id)
+                            for student_id, _signature in source._scan_files()) if s is not None]
+
+    conn = target._conn()
+    with conn:
+        for student in students:
+            target._write_student(conn, student, force=True)
+    target.close()
+
+    print(f"✅ {len(students)} öğrenci SQLite'a aktarıldı: {db_path}")
+    return len(students)
+
+
+if __name__ == "__main__":
+    # Kullanım: python storage.py [json_klasörü] [veritabanı_yolu]
+    src = sys.argv[1] if len(sys.argv) > 1 else Config.DATA_DIR
+    dst = sys.argv[2] if len(sys.argv) > 2 else os.path.join(Config.DATA_DIR, Config.SQLITE_FILE)
+    migrate_json_to_sqlite(src, dst)
@@ -0,0 +1,63 @@
+import time
+from typing import List, Optional
+
+from student_streamable import Config
+
+
+class StreamRenderer:
+    """Akış halinde gelen model çıktısını sınırlı kare hızıyla ekrana basar.
+
+    Parçalar bir listede biriktirilir (karesel string birleştirme yok) ve
+    yalnızca 1/max_fps saniyede bir yeniden çizilir. Böylece çıktı ne kadar
+    uzun olursa olsun tarayıcıya giden güncelleme sayısı sabit kalır. İsteğe
+    bağlı durum alanında geçen süre ve token/sn gösterilir.
+    """
+
+    def __init__(self, box, status=None, max_fps: float = Config.STREAM_MAX_FPS, cursor: str = "▌"):
+        self.box = box
+        self.status = status
+        self.min_interval = 1.0 / max_fps
+        self.cursor = cursor
+        self.tokens = 0
+        self.started: Optional[float] = None
+        self._text = ""
+        self._pending: List[str] = []
+        self._last_paint = 0.0
+
+    @property
+    def text(self) -> str:
+        if self._pending:
+            self._text += "".join(self._pending)
+            self._pending = []
+        return self._text
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started if self.started is not None else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.tokens / elapsed if elapsed > 0 else 0.0
+
+    def feed(self, chunk: str) -> None:
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = now
+        self._pending.append(chunk)
+        self.tokens += 1
+        if now - self._last_paint >= self.min_interval:
+            self._paint(final=False)
+            self._last_paint = now
+
+    def finish(self) -> str:
+        """Son hali çizer ve tam metni döndürür."""
+        self._paint(final=True)
+        return self.text
+
+    def _paint(self, final: bool) -> None:
+        self.box.markdown(self.text if final else self.text + self.cursor)
+        if self.status is not None:
+            self.status.caption(
+                f"⏱ {self.elapsed:.1f} sn · ⚡ {self.tokens_per_second:.1f} token/sn · {self.tokens} token"
+            )
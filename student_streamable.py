@@ -1,19 +1,123 @@
 import json
 import os
-import requests
-import PyPDF2
-from docx import Document
+import threading
+import time
 from datetime import datetime
-from typing import List, Optional, Generator, Dict
+from typing import List, Optional, Generator, Dict, Tuple
 from dataclasses import dataclass, field, asdict
 import uuid
 
 
 class Config:
     DATA_DIR = "student_data"
+    # "json" (her öğrenci ayrı dosya) veya "sqlite"
+    STORAGE_BACKEND = os.environ.get("UFT_STORAGE_BACKEND", "json")
+    SQLITE_FILE = "students.db"
+    # JSON kayıtta ekleme günlüğü bu boyutu aşınca ana dosyaya katlanır
+    JOURNAL_MAX_BYTES = 64 * 1024
+    # Bu uzunluktaki metinler (ödev, analiz) DATA_DIR/BLOB_DIR altına taşınır
+    BLOB_DIR = "blobs"
+    BLOB_MIN_CHARS = 1024
+    # Referansı kalmayan blob'lar ancak bu süre (sn) boyunca dokunulmamışsa silinir
+    BLOB_GC_GRACE = 300.0
+    # Toplu analiz: aynı anda çalışan üretim sayısı ve iş dosyalarının klasörü
+    BATCH_WORKERS = 2
+    BATCH_DIR = "batch_jobs"
     OLLAMA_URL = "http://localhost:11434"
     DEFAULT_MODEL = "gemma3"
     TIMEOUT = 60
+    # Ollama durum/model listesi önbellek süresi (sn) ve HTTP bağlantı havuzu boyutu
+    HEALTH_TTL = 5.0
+    HTTP_POOL_SIZE = 8
+    # Ollama'nın modeli bellekte tutma süresi (ör. "30m", "2h", "-1" = sürekli)
+    KEEP_ALIVE = os.environ.get("UFT_OLLAMA_KEEP_ALIVE", "30m")
+    WARMUP_TIMEOUT = 300
+    # Ön yüklemesi başarısız olan model bu süre (sn) dolmadan yeniden denenmez
+    WARMUP_RETRY_DELAY = 60.0
+    # Uzun ödevler: okunacak en fazla karakter, modele verilen bağlam penceresi (token)
+    # ve parça boyutu hesabı için yaklaşık karakter/token oranı
+    MAX_DOCUMENT_CHARS = 100_000
+    NUM_CTX = 4096
+    CHARS_PER_TOKEN = 3.0
+    CHUNK_RESERVE_TOKENS = 1024
+    CHUNK_WORKERS = 2
+    # Önbellek ve dizin veritabanlarının klasörü (DATA_DIR altında). SQLite'ın -wal/-shm
+    # dosyaları her okumada oluşup silinir; bunlar öğrenci dosyalarının yanında dursa
+    # veri klasörünün zaman damgası sürekli değişir ve özet listesi her seferinde taranırdı.
+    CACHE_DIR = ".cache"
+    # İstem → yanıt önbelleği (CACHE_DIR altında) ve üst boyut sınırı
+    RESPONSE_CACHE_FILE = "response_cache.db"
+    RESPONSE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+    # Önbellekten gelen yanıt arayüzde akış gibi bu boyutta parçalarla verilir
+    CACHE_REPLAY_CHUNK = 200
+    # PDF okuma: sayfa başına süre sınırı (sn); bu sayfa sayısından itibaren
+    # belge, işçi süreçlerde PDF_PAGES_PER_TASK sayfalık aralıklarla okunur
+    PDF_PAGE_TIMEOUT = 10.0
+    PDF_PARALLEL_MIN_PAGES = 24
+    PDF_PAGES_PER_TASK = 8
+    PDF_WORKERS = max(1, min(4, os.cpu_count() or 1))
+    # Toplu ödev yükleme: metin çıkarma süreç sayısı ve dosya başına boyut sınırı
+    INGEST_WORKERS = max(1, min(4, os.cpu_count() or 1))
+    INGEST_MAX_FILE_BYTES = 50 * 1024 * 1024
+    # Yüklenen dosyalardan çıkarılan metinlerin önbelleği (CACHE_DIR altında)
+    EXTRACTION_CACHE_FILE = "extraction_cache.db"
+    EXTRACTION_CACHE_MAX_BYTES = 20 * 1024 * 1024
+    EXTRACTION_MEMORY_ENTRIES = 16
+    # Akış sırasında ekranın en fazla saniyede kaç kez yeniden çizileceği
+    STREAM_MAX_FPS = 8
+    # Model yükleme süresi bu değeri (sn) aşarsa üretim "soğuk başlangıç" sayılır
+    COLD_LOAD_THRESHOLD = 1.0
+    # Tam metin arama dizini (CACHE_DIR altında) ve kenar çubuğunda gösterilen sonuç sayısı
+    SEARCH_INDEX_FILE = "search_index.db"
+    SEARCH_LIMIT = 20
+    # Kenar çubuğundaki öğrenci listesinin sayfa boyutu
+    SIDEBAR_PAGE_SIZE = 25
+    # Dışa aktarma (Parquet/CSV) için varsayılan klasör (DATA_DIR altında)
+    EXPORT_DIR = "export"
+    # Sınıf analizi: bu notun altı "kalan" sayılır; ortalaması altında kalan ya da
+    # en az bu kadar dersten kalan öğrenci risk listesine girer
+    AT_RISK_THRESHOLD = 50
+    AT_RISK_MIN_FAILED = 2
+    # Otomatik kayıt: son değişiklikten sonra beklenen sessiz süre (sn) ve üst sınır
+    AUTOSAVE_DELAY = 2.0
+    AUTOSAVE_MAX_DELAY = 10.0
+    # "desktop": son tarayıcı sekmesi kapanınca uygulama kapanır; "server": süreç
+    # açık kalır (run_app.py --server). Masaüstünde kapanmadan önce beklenen süre
+    # (sn) içinde yeni oturum açılırsa (ör. sayfa yenileme) uygulama kapanmaz.
+    APP_MODE = os.environ.get("UFT_APP_MODE", "desktop")
+    DESKTOP_EXIT_GRACE = 5.0
+
+
+class BlobRef:
+    """Blob deposundaki bir metne referans; ilk erişimde okunur."""
+    __slots__ = ("key", "store")
+
+    def __init__(self, key: str, store):
+        self.key = key
+        self.store = store
+
+    def read(self) -> str:
+        return self.store.get(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, BlobRef) and other.key == self.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"BlobRef({self.key[:12]}...)"
+
+
+class BlobBacked:
+    """Alanlarında BlobRef tutabilen modeller: referans ilk okunduğunda metne çözülür."""
+
+    def __getattribute__(self, name):
+        value = object.__getattribute__(self, name)
+        if value.__class__ is BlobRef:
+            value = value.read()
+            object.__setattr__(self, name, value)
+        return value
 
 
 @dataclass
@@ -31,14 +135,55 @@ class BehaviorNote:
 
 
 @dataclass
-class AIInsight:
+class GenerationStats:
+    """Ollama'nın son (done) mesajındaki üretim ölçümleri. Süreler nanosaniyedir."""
+    total_duration: int = 0
+    load_duration: int = 0
+    prompt_eval_count: int = 0
+    prompt_eval_duration: int = 0
+    eval_count: int = 0
+    eval_duration: int = 0
+    prompt_chars: int = 0
+    cached: bool = False
+
+    @classmethod
+    def from_ollama(cls, body: Dict, prompt_chars: int = 0) -> "GenerationStats":
+        values = {k: int(body.get(k) or 0) for k in cls.__annotations__ if k not in ("prompt_chars", "cached")}
+        return cls(**values, prompt_chars=prompt_chars)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "GenerationStats":
+        return cls(**{k: v for k, v in (data or {}).items() if k in cls.__annotations__})
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.eval_count / (self.eval_duration / 1e9) if self.eval_duration else 0.0
+
+    @property
+    def prompt_tokens_per_second(self) -> float:
+        return self.prompt_eval_count / (self.prompt_eval_duration / 1e9) if self.prompt_eval_duration else 0.0
+
+    @property
+    def is_cold_load(self) -> bool:
+        return self.load_duration / 1e9 >= Config.COLD_LOAD_THRESHOLD
+
+
+@dataclass
+class AIInsight(BlobBacked):
     analysis: str
     model: str
     date: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    # GenerationStats sözlüğü; eski kayıtlarda boş
+    stats: Dict = field(default_factory=dict)
+
+
+def insight_key(insight: AIInsight) -> Tuple:
+    """Aynı analizin farklı kopyalarını (kayıt, günlük, form) eşleştirmek için kullanılır."""
+    return insight.model, insight.date, insight.analysis
 
 
 @dataclass
-class Student:
+class Student(BlobBacked):
     id: str
     name: str
     class_name: str
@@ -48,10 +193,26 @@ class Student:
     ai_insights: List[AIInsight] = field(default_factory=list)
     file_content: str = ""
     last_updated: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    # Her tam kayıtta bir artar; 0 = henüz diske yazılmamış yeni kayıt
+    version: int = 0
 
     def to_dict(self) -> Dict:
         return asdict(self)
 
+    def merge_appended(self, insights: List[AIInsight],
+                       grades: List[Grade]) -> Tuple[List[AIInsight], List[Grade]]:
+        """Bu nesnede olmayan (başka yoldan eklenmiş) analiz ve notları katar, eklenenleri döndürür.
+
+        Aynı ders için bu nesnedeki not geçerli kalır.
+        """
+        known = {insight_key(i) for i in self.ai_insights}
+        new_insights = [i for i in insights if insight_key(i) not in known]
+        subjects = {g.subject for g in self.grades}
+        new_grades = [g for g in grades if g.subject not in subjects]
+        self.ai_insights.extend(new_insights)
+        self.grades.extend(new_grades)
+        return new_insights, new_grades
+
     @classmethod
     def from_dict(cls, data: Dict):
         # JSON verisi bir sözlük değilse hata ver
@@ -119,18 +280,65 @@ class Student:
         )
 
 
+@dataclass
+class StudentSummary:
+    """Listeleme için gereken asgari öğrenci bilgisi.
+
+    revision, kayıt (günlük eklemeleri dahil) her değiştiğinde değişen ve
+    yalnızca eşitlikle karşılaştırılan bir belirteçtir; değerini kayıt katmanı
+    verir. last_updated saniye çözünürlüklü olduğu için değişiklik tespitinde
+    ona güvenilmez.
+    """
+    id: str
+    name: str
+    class_name: str
+    last_updated: str = ""
+    revision: str = ""
+
+    @property
+    def display_name(self) -> str:
+        return f"{self.name} ({self.class_name})"
+
+    @classmethod
+    def from_student(cls, student: Student) -> "StudentSummary":
+        return cls(id=student.id, name=student.name, class_name=student.class_name,
+                   last_updated=student.last_updated)
+
+
 class FileHandler:
     @staticmethod
     def extract_text_from_file(uploaded_file) -> str:
+        """Dosyadaki metni döndürür.
+
+        Aynı içerik daha önce okunduysa (SHA-256 ile) ayrıştırma yapılmadan
+        önbellekten verilir; Streamlit her yeniden çalıştırmada bu fonksiyonu
+        çağırdığı için maliyet tek bir özet hesabına iner.
+        """
+        from extraction_cache import get_extraction_cache, extraction_key
+        file_type = uploaded_file.name.split('.')[-1].lower()
+        cache = get_extraction_cache()
+        key = extraction_key(uploaded_file.getvalue(), file_type)
+
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        text = FileHandler._parse(uploaded_file, file_type)
+        # Hatalı okumalar saklanmaz; dosya düzeltilip yeniden yüklenebilir
+        if not is_error_response(text) and text != "Desteklenmeyen dosya formatı":
+            cache.put(key, text)
+        return text
+
+    @staticmethod
+    def _parse(uploaded_file, file_type: str) -> str:
         text = ""
         try:
-            file_type = uploaded_file.name.split('.')[-1].lower()
-
+            uploaded_file.seek(0)
             if file_type == 'pdf':
-                reader = PyPDF2.PdfReader(uploaded_file)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
+                from pdf_extraction import extract_pdf_text
+                text = extract_pdf_text(uploaded_file.getvalue())
             elif file_type in ['docx', 'doc']:
+                from docx import Document
                 doc = Document(uploaded_file)
                 for para in doc.paragraphs:
                     text += para.text + "\n"
@@ -139,73 +347,362 @@ class FileHandler:
             else:
                 return "Desteklenmeyen dosya formatı"
 
-            return text[:15000]
+            return text[:Config.MAX_DOCUMENT_CHARS]
         except Exception as e:
             return f"Hata: {str(e)}"
 
 
+class VersionConflictError(Exception):
+    """Kayıt, okunduğu sürümden sonra başka bir oturumda değiştirilmiş."""
+
+    def __init__(self, student_ids: List[str]):
+        self.student_ids = list(student_ids)
+        super().__init__(f"Kayıt başka bir oturumda değiştirildi: {', '.join(self.student_ids)}")
+
+
+class StudentListener:
+    """Kayıt değişikliklerini izleyen bellek içi yapılar (analiz tablosu, arama dizini vb.).
+
+    StudentManager her başarılı yazımdan sonra ilgili metodu çağırır; alt
+    sınıflar yalnızca ihtiyaç duyduklarını ezer.
+    """
+
+    def student_saved(self, student: "Student") -> None:
+        pass
+
+    def student_changed(self, student_id: str) -> None:
+        """Kaydın bir kısmı (ör. eklenen analiz/not) değişti; gerekirse yeniden okunmalı."""
+        pass
+
+    def student_deleted(self, student_id: str) -> None:
+        pass
+
+
 class StudentManager:
-    def __init__(self):
-        self.data_dir = Config.DATA_DIR
-        if not os.path.exists(self.data_dir):
-            os.makedirs(self.data_dir)
+    """Öğrenci kayıtları için tek giriş noktası; asıl işi seçilen StorageBackend yapar."""
 
-    def _get_path(self, student_id: str) -> str:
-        return os.path.join(self.data_dir, f"{student_id}.json")
+    # Process genelinde tüm StudentManager örneklerinin bildirdiği dinleyiciler
+    _listeners: List[StudentListener] = []
+    _listeners_lock = threading.Lock()
 
-    def save_student(self, student: Student) -> None:
+    def __init__(self, backend=None):
+        # storage modülü bu dosyadaki modelleri kullandığı için içeride import edilir
+        from storage import create_backend
+        self.backend = backend or create_backend()
+
+    @classmethod
+    def add_listener(cls, listener: StudentListener) -> None:
+        with cls._listeners_lock:
+            if listener not in cls._listeners:
+                cls._listeners.append(listener)
+
+    def _notify(self, method: str, arg) -> None:
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                getattr(listener, method)(arg)
+            except Exception as e:
+                # Dinleyici hatası kaydı bozmamalı
+                print(f"Dinleyici hatası ({type(listener).__name__}): {e}")
+
+    def save_student(self, student: Student, force: bool = False) -> None:
+        """Kaydı, diskteki sürüm student.version ile aynıysa yazar (compare-and-swap).
+
+        Başka bir oturum kaydı bu arada değiştirdiyse VersionConflictError
+        fırlatılır; force=True diskteki sürümün üzerine yazar. Başarılı
+        kayıttan sonra student.version yeni sürümü gösterir.
+        """
         student.last_updated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
-            with open(self._get_path(student.id), 'w', encoding='utf-8') as f:
-                json.dump(student.to_dict(), f, ensure_ascii=False, indent=2)
-            print(f"Kayıt OK: {student.name}")
+            self.backend.save_student(student, force=force)
+            print(f"Kayıt OK: {student.name} (sürüm {student.version})")
+        except VersionConflictError as e:
+            print(f"Kayıt çakışması: {e}")
+            raise
         except Exception as e:
             print(f"Kayıt Hatası: {e}")
             raise
+        self._notify("student_saved", student)
 
-    def load_student(self, student_id: str) -> Optional[Student]:
-        path = self._get_path(student_id)
-        if not os.path.exists(path):
-            return None
+    def save_students(self, students: List[Student]) -> None:
+        """Toplu içe aktarma gibi işlemler için kayıtları tek bir toplu yazımla saklar.
+
+        Sürümü çakışan kayıtlar atlanır, diğerleri yazılır; ardından atlananlar
+        için VersionConflictError fırlatılır.
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for student in students:
+            student.last_updated = now
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return Student.from_dict(data)
+            conflicts = self.backend.save_students(students)
+            print(f"Toplu kayıt OK: {len(students) - len(conflicts)} öğrenci")
         except Exception as e:
-            print(f"Dosya Yüklenemedi ({student_id}): {e}")
-            return None
+            print(f"Toplu Kayıt Hatası: {e}")
+            raise
+        for student in students:
+            if student.id not in conflicts:
+                self._notify("student_saved", student)
+        if conflicts:
+            raise VersionConflictError(conflicts)
+
+    def load_student(self, student_id: str) -> Optional[Student]:
+        return self.backend.load_student(student_id)
+
+    def append_insight(self, student_id: str, insight: AIInsight) -> None:
+        """Analizi kaydın tamamını yeniden yazmadan ekler."""
+        updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.backend.append_insight(student_id, insight, updated_at)
+        print(f"Analiz eklendi: {student_id}")
+        self._notify("student_changed", student_id)
+
+    def append_grade(self, student_id: str, grade: Grade) -> None:
+        """Tek bir ders notunu kaydın tamamını yeniden yazmadan ekler/günceller."""
+        updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.backend.append_grade(student_id, grade, updated_at)
+        self._notify("student_changed", student_id)
+
+    def compact(self, student_id: str) -> None:
+        self.backend.compact(student_id)
+
+    def delete_student(self, student_id: str) -> bool:
+        deleted = self.backend.delete_student(student_id)
+        if deleted:
+            self._notify("student_deleted", student_id)
+        return deleted
+
+    def list_summaries(self, class_name: Optional[str] = None, name_prefix: Optional[str] = None,
+                       offset: int = 0, limit: Optional[int] = None) -> List[StudentSummary]:
+        """Kenar çubuğu için isme göre sıralı öğrenci özetlerini (istenirse bir sayfasını) döndürür."""
+        return self.backend.list_summaries(class_name=class_name, name_prefix=name_prefix,
+                                           offset=offset, limit=limit)
+
+    def count_summaries(self, class_name: Optional[str] = None, name_prefix: Optional[str] = None) -> int:
+        return self.backend.count_summaries(class_name=class_name, name_prefix=name_prefix)
+
+    def list_classes(self) -> List[str]:
+        return self.backend.list_classes()
 
     def get_all_students(self) -> List[Student]:
-        students = []
-        if not os.path.exists(self.data_dir):
-            return []
+        """Tüm öğrencileri tam kayıt olarak döndürür.
 
-        # YASAKLI DOSYALAR LİSTESİ
-        ignored_files = {"changelog.json", "settings.json", "config.json", ".ds_store"}
+        Sadece listeleme için list_summaries() tercih edilmelidir.
+        """
+        return self.backend.get_all_students()
 
-        for filename in os.listdir(self.data_dir):
-            if filename.lower() in ignored_files:
-                continue
 
-            if filename.endswith('.json'):
-                student_id = filename.replace('.json', '')
-                try:
-                    student = self.load_student(student_id)
-                    if student:
-                        students.append(student)
-                except Exception as e:
-                    print(f"Öğrenci yüklenirken hata: {student_id}, {e}")
-                    continue
+SYSTEM_PROMPT = "Eğitim koçusun."
+
+# AIService hata durumunda metni bu öneklerle döndürür
+ERROR_PREFIXES = ("Hata:", "API Hata:", "Bağlantı Hatası:")
+
+
+def is_error_response(text: str) -> bool:
+    return not text.strip() or text.startswith(ERROR_PREFIXES)
+
+
+# Türkçe karakterler ASCII karşılıklarına indirilir; "İ"/"I" ile "i"/"ı" ayrımı da
+# kalkar, böylece Türkçe klavyesiz yazılan arama ve dosya adları da eşleşir
+_TR_FOLD = str.maketrans("çğıöşüÇĞİIÖŞÜ", "cgiosucgiiosu")
+
+
+def fold_turkish(text: str) -> str:
+    return text.translate(_TR_FOLD).lower()
+
+
+def build_analysis_prompt(name: str, class_name: str, notes: Dict[str, float], behaviors: List[str],
+                          document: str) -> str:
+    """Tek öğrenci analizi için modele gönderilen veri bloğunu hazırlar.
+
+    document, ödevin kendisi ya da uzun ödevlerde document_analysis.prepare_document
+    ile üretilmiş bölüm özetleridir.
+    """
+    return f"""
+                ÖĞRENCİ: {name} ({class_name})
+                NOTLAR: {json.dumps(notes, ensure_ascii=False)}
+                DAVRANIŞLAR: {', '.join(behaviors)}
+                ÖDEV: {document}
+                GÖREV: Detaylı analiz et, güçlü yönleri ve gelişim alanlarını belirle.
+                """
+
 
-        students.sort(key=lambda x: x.name)
-        return students
+class OllamaClient:
+    """Process genelinde paylaşılan Ollama bağlantısı.
+
+    Keep-alive bağlantı havuzu olan tek bir requests.Session kullanır. Sunucu
+    durumu ve model listesi tek bir /api/tags isteğiyle alınır, Config.HEALTH_TTL
+    süresince önbellekte tutulur ve arka plandaki bir thread tarafından yenilenir;
+    böylece sayfa çizimi hiçbir zaman Ollama'yı beklemez.
+    """
+
+    _instance: Optional["OllamaClient"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, base_url: str = Config.OLLAMA_URL):
+        # requests ilk bağlantıda yüklenir; uygulama açılışı bu importu beklemez
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=Config.HTTP_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._online: Optional[bool] = None
+        self._models: List[str] = []
+        self._probe_thread: Optional[threading.Thread] = None
+        # model adı -> "loading" | "loaded" | "unloaded" | "error"
+        self._model_states: Dict[str, str] = {}
+        # model adı -> son başarısız ön yükleme zamanı (time.monotonic)
+        self._warmup_failed_at: Dict[str, float] = {}
+        self._context_lengths: Dict[str, int] = {}
+
+    @classmethod
+    def shared(cls) -> "OllamaClient":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def refresh(self) -> bool:
+        """/api/tags'ı bir kez sorgular, durum ve model listesini günceller."""
+        online, models = False, []
+        try:
+            r = self.session.get(f"{self.base_url}/api/tags", timeout=3)
+            online = r.status_code == 200
+            if online:
+                models = [m['name'] for m in r.json().get('models', [])]
+        except Exception as e:
+            if self._online is not False:
+                print(f"Ollama bağlantı hatası: {e}")
+
+        loaded = self._loaded_models() if online else None
+        with self._lock:
+            self._online = online
+            self._models = models
+            # /api/ps yanıt vermediyse (eski Ollama, geçici hata) model durumları korunur;
+            # aksi halde yüklü modeller "unloaded" sayılıp her rerun'da yeniden ısıtılırdı
+            if loaded is not None:
+                for name, state in list(self._model_states.items()):
+                    if state == "loaded" and name not in loaded:
+                        self._model_states[name] = "unloaded"
+                for name in loaded:
+                    if self._model_states.get(name) != "loading":
+                        self._model_states[name] = "loaded"
+        return online
+
+    def _loaded_models(self) -> Optional[set]:
+        """Ollama'nın şu an bellekte tuttuğu modeller (/api/ps); sorgu başarısızsa None."""
+        try:
+            r = self.session.get(f"{self.base_url}/api/ps", timeout=3)
+            if r.status_code == 200:
+                return {m['name'] for m in r.json().get('models', [])}
+        except Exception:
+            pass
+        return None
+
+    def warm_up(self, model: str) -> None:
+        """Modeli arka planda belleğe yükler (boş istem + keep_alive).
+
+        Model zaten yüklüyse ya da yükleniyorsa hiçbir şey yapmaz; her rerun'da
+        güvenle çağrılabilir. Başarısız bir denemeden sonra (Ollama kapalı, model
+        yok) Config.WARMUP_RETRY_DELAY saniye yeniden denenmez.
+        """
+        with self._lock:
+            state = self._model_states.get(model)
+            if state in ("loading", "loaded"):
+                return
+            failed_at = self._warmup_failed_at.get(model)
+            if state == "error" and failed_at is not None \
+                    and time.monotonic() - failed_at < Config.WARMUP_RETRY_DELAY:
+                return
+            self._model_states[model] = "loading"
+        threading.Thread(target=self._warm_up, args=(model,), name=f"ollama-warmup-{model}", daemon=True).start()
+
+    def _warm_up(self, model: str) -> None:
+        payload = {"model": model, "prompt": "", "stream": False, "keep_alive": Config.KEEP_ALIVE}
+        try:
+            r = self.session.post(f"{self.base_url}/api/generate", json=payload, timeout=Config.WARMUP_TIMEOUT)
+            state = "loaded" if r.status_code == 200 else "error"
+        except Exception as e:
+            print(f"Model ön yüklemesi başarısız ({model}): {e}")
+            state = "error"
+        self.mark_model(model, state)
+
+    def context_length(self, model: str) -> int:
+        """Modelin bağlam penceresi (token); Config.NUM_CTX ile sınırlanır."""
+        with self._lock:
+            cached = self._context_lengths.get(model)
+        if cached is not None:
+            return cached
+
+        length = Config.NUM_CTX
+        try:
+            r = self.session.post(f"{self.base_url}/api/show", json={"model": model}, timeout=5)
+            if r.status_code == 200:
+                info = r.json().get("model_info", {})
+                native = [v for k, v in info.items() if k.endswith(".context_length")]
+                if native:
+                    length = min(int(native[0]), Config.NUM_CTX)
+        except Exception as e:
+            print(f"Model bilgisi alınamadı ({model}): {e}")
+            return length
+
+        with self._lock:
+            self._context_lengths[model] = length
+        return length
+
+    def mark_model(self, model: str, state: str) -> None:
+        with self._lock:
+            self._model_states[model] = state
+            if state == "error":
+                self._warmup_failed_at[model] = time.monotonic()
+            else:
+                self._warmup_failed_at.pop(model, None)
+
+    def model_state(self, model: str) -> str:
+        with self._lock:
+            return self._model_states.get(model, "unloaded")
+
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(Config.HEALTH_TTL)
+            self.refresh()
+
+    def _ensure_fresh(self) -> None:
+        # İlk çağrı senkron yapılır, sonrası arka planda
+        if self._online is None:
+            self.refresh()
+        with self._lock:
+            if self._probe_thread is None:
+                self._probe_thread = threading.Thread(target=self._probe_loop, name="ollama-probe", daemon=True)
+                self._probe_thread.start()
+
+    def is_online(self) -> bool:
+        self._ensure_fresh()
+        with self._lock:
+            return bool(self._online)
+
+    def models(self) -> List[str]:
+        self._ensure_fresh()
+        with self._lock:
+            return list(self._models)
 
 
 class AIService:
+    """Oturuma özel model ayarları; HTTP işleri paylaşılan OllamaClient'a devredilir."""
+
     def __init__(self):
         self.provider = "Ollama"
         self.model = Config.DEFAULT_MODEL
         self.api_key = None
+        self.client = OllamaClient.shared()
+        self.options = {"temperature": 0.7, "num_ctx": Config.NUM_CTX}
+        # Son üretimin ölçümleri (Ollama'nın done mesajı) ve önbellekten gelip gelmediği
+        self.last_stats: Optional[GenerationStats] = None
+        self.last_from_cache = False
 
     def configure(self, provider: str, model: str, api_key: Optional[str] = None):
         self.provider = provider
@@ -214,47 +711,76 @@ class AIService:
 
     def check_connection(self) -> bool:
         if self.provider == "Ollama":
-            try:
-                response = requests.get(f"{Config.OLLAMA_URL}/api/tags", timeout=3)
-                return response.status_code == 200
-            except Exception as e:
-                print(f"Ollama bağlantı hatası: {e}")
-                return False
+            return self.client.is_online()
         return True
 
     def get_ollama_models(self) -> List[str]:
         if self.provider != "Ollama":
             return [self.model]
-        try:
-            r = requests.get(f"{Config.OLLAMA_URL}/api/tags", timeout=2)
-            if r.status_code == 200:
-                models = [m['name'] for m in r.json().get('models', [])]
-                return models if models else [Config.DEFAULT_MODEL]
-            return [Config.DEFAULT_MODEL]
-        except Exception as e:
-            print(f"Model listesi alınamadı: {e}")
-            return [Config.DEFAULT_MODEL]
+        models = self.client.models()
+        return models if models else [Config.DEFAULT_MODEL]
 
-    def generate_stream(self, prompt: str, system_prompt: str) -> Generator[str, None, None]:
+    def generate_stream(self, prompt: str, system_prompt: str, force: bool = False) -> Generator[str, None, None]:
+        """Yanıtı parça parça üretir.
+
+        Aynı model, istem ve ayarlarla daha önce tamamlanmış bir üretim varsa
+        yanıt diskteki önbellekten anında verilir; force=True önbelleği atlar.
+        """
         full_prompt = f"{system_prompt}\n\nVERİLER:\n{prompt}"
+        self.last_stats = None
+        self.last_from_cache = False
         try:
             if self.provider == "Ollama":
-                yield from self._stream_ollama(full_prompt)
+                from response_cache import get_response_cache, cache_key
+                cache = get_response_cache()
+                key = cache_key(self.model, system_prompt, full_prompt, self.options)
+
+                cached = None if force else cache.get(key)
+                if cached is not None:
+                    self.last_from_cache = True
+                    self.last_stats = GenerationStats(prompt_chars=len(full_prompt), cached=True)
+                    for i in range(0, len(cached), Config.CACHE_REPLAY_CHUNK):
+                        yield cached[i:i + Config.CACHE_REPLAY_CHUNK]
+                    return
+
+                parts = []
+                for chunk in self._stream_ollama(full_prompt):
+                    parts.append(chunk)
+                    yield chunk
+                # Yalnızca Ollama'nın "done" mesajıyla biten üretimler saklanır
+                if self.last_stats is not None:
+                    cache.put(key, self.model, "".join(parts))
             else:
                 yield f"Hata: {self.provider} pasif."
         except Exception as e:
             yield f"Hata: {e}"
 
+    def generation_error(self, text: str) -> Optional[str]:
+        """generate_stream'in birleştirilmiş çıktısı başarısızsa hata açıklaması, değilse None.
+
+        Bağlantı akış ortasında koparsa hata mesajı önceki parçaların sonuna
+        eklenir; bu yüzden yalnızca metnin başına değil, üretimin Ollama'nın
+        "done" mesajıyla bitip bitmediğine (last_stats) de bakılır.
+        """
+        if is_error_response(text):
+            return text.strip() or "Boş yanıt"
+        if self.last_stats is None:
+            position = max(text.rfind(prefix) for prefix in ERROR_PREFIXES)
+            reason = text[position:].strip() if position >= 0 else "Ollama üretimi bitirmedi"
+            return f"Yanıt yarıda kesildi: {reason}"
+        return None
+
     def _stream_ollama(self, prompt: str) -> Generator[str, None, None]:
         payload = {
             "model": self.model,
             "prompt": prompt,
             "stream": True,
-            "options": {"temperature": 0.7}
+            "options": self.options,
+            "keep_alive": Config.KEEP_ALIVE
         }
         try:
-            with requests.post(
-                    f"{Config.OLLAMA_URL}/api/generate",
+            with self.client.session.post(
+                    f"{self.client.base_url}/api/generate",
                     json=payload,
                     stream=True,
                     timeout=Config.TIMEOUT
@@ -267,6 +793,9 @@ class AIService:
                                 response_text = body.get('response', '')
                                 if response_text:
                                     yield response_text
+                                if body.get('done'):
+                                    self.last_stats = GenerationStats.from_ollama(body, len(prompt))
+                                    self.client.mark_model(self.model, "loaded")
                             except json.JSONDecodeError:
                                 continue
                 else:
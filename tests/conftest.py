@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Testler depo kökündeki modülleri doğrudan import eder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from student_streamable import Config  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Config.DATA_DIR'i teste özel geçici bir klasöre yönlendirir."""
+    path = str(tmp_path / "student_data")
+    monkeypatch.setattr(Config, "DATA_DIR", path)
+    return path
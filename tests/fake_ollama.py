@@ -0,0 +1,138 @@
+import asyncio
+import json
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+class FakeOllama:
+    """Testler için Ollama HTTP API'sinin küçük bir asyncio taklidi.
+
+    /api/generate yanıtı NDJSON olarak, chunked kodlamayla ve her parça
+    arasında `delay` saniye beklenerek akıtılır. `drop_after` verilirse o
+    kadar parçadan sonra bağlantı "done" mesajı gönderilmeden yarım bir
+    chunk ile koparılır; `hang=True` ise başlıklardan sonra hiçbir şey
+    gönderilmez. Aynı anda açık üretim sayısı `max_active` ile izlenir.
+    """
+
+    def __init__(self, tokens: Tuple[str, ...] = ("Merhaba", " dünya"), delay: float = 0.0,
+                 drop_after: Optional[int] = None, hang: bool = False,
+                 loaded_models: Optional[List[str]] = None, ps_status: int = 200):
+        self.tokens = tokens
+        self.delay = delay
+        self.drop_after = drop_after
+        self.hang = hang
+        self.loaded_models = loaded_models or []
+        self.ps_status = ps_status
+        self.requests: List[Tuple[str, Dict]] = []
+        self.active = 0
+        self.max_active = 0
+        self.completed = 0
+        self.disconnected = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.port = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self) -> "FakeOllama":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value.strip())
+            body = await reader.readexactly(length) if length else b""
+            payload = json.loads(body) if body else {}
+            self.requests.append((path, payload))
+
+            if path == "/api/generate":
+                await self._generate(writer, payload)
+            elif path == "/api/tags":
+                await self._json(writer, 200, {"models": [{"name": "fake"}]})
+            elif path == "/api/show":
+                await self._json(writer, 200, {"model_info": {"fake.context_length": 8192}})
+            elif path == "/api/ps":
+                await self._json(writer, self.ps_status, {"models": [{"name": m} for m in self.loaded_models]})
+            else:
+                await self._json(writer, 404, {"error": "not found"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _json(writer: asyncio.StreamWriter, status: int, body: Dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("ascii") + data)
+        await writer.drain()
+
+    async def _generate(self, writer: asyncio.StreamWriter, payload: Dict) -> None:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                         b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            if self.hang:
+                await asyncio.sleep(3600)
+
+            for index, token in enumerate(self.tokens):
+                if self.drop_after is not None and index >= self.drop_after:
+                    # Yarım chunk: istemci okurken bağlantı kopar
+                    writer.write(b"40\r\n{\"response\":")
+                    await writer.drain()
+                    return
+                await self._chunk(writer, {"model": payload.get("model"), "response": token, "done": False})
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+            await self._chunk(writer, {"model": payload.get("model"), "response": "", "done": True,
+                                       "eval_count": len(self.tokens), "eval_duration": 1_000_000})
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+            self.completed += 1
+        except (ConnectionError, asyncio.CancelledError):
+            self.disconnected += 1
+            raise
+        finally:
+            self.active -= 1
+
+    @staticmethod
+    async def _chunk(writer: asyncio.StreamWriter, body: Dict) -> None:
+        data = json.dumps(body).encode("utf-8") + b"\n"
+        writer.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        await writer.drain()
+
+
+@contextmanager
+def serve_in_thread(fake: FakeOllama):
+    """Senkron (requests kullanan) testler için sunucuyu ayrı bir event loop'ta çalıştırır."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(fake.start(), loop).result(5)
+    try:
+        yield fake
+    finally:
+        asyncio.run_coroutine_threadsafe(fake.close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
@@ -0,0 +1,16 @@
+import time
+
+import pdf_extraction
+
+
+def fake_extract_range(data: bytes, task: int, start: int, stop: int, max_chars: int):
+    """pdf_extraction._extract_range yerine geçer: `data` içindeki sayfalarda sonsuza dek takılır.
+
+    İşçi süreç bu modülü kendisi import ettiği için ayrı bir dosyada durur.
+    """
+    pdf_extraction._range_started[task] = time.time()
+    stuck = {int(p) for p in data.decode().split(",") if p}
+    if any(page in stuck for page in range(start, stop)):
+        time.sleep(60)
+    time.sleep(0.2)
+    return [f"sayfa {page + 1}" for page in range(start, stop)]
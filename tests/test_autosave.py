@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from autosave import AutoSaver
+from storage import JsonStorage
+from student_streamable import Student, StudentManager
+
+
+class CountingManager(StudentManager):
+    def __init__(self, backend):
+        super().__init__(backend)
+        self.saves = []
+
+    def save_student(self, student, force=False):
+        self.saves.append(student.name)
+        super().save_student(student, force)
+
+
+def build(state):
+    return Student(id=state["id"], name=state["name"], class_name="9A", version=state["version"])
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "zaman aşımı"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def manager(data_dir):
+    return CountingManager(JsonStorage(data_dir))
+
+
+def test_burst_of_edits_is_written_once_after_quiet_period(manager):
+    saver = AutoSaver(manager, delay=0.2, max_delay=10)
+    form = {"id": "s1", "name": "", "version": 0}
+    for name in ("A", "Al", "Ali"):
+        form["name"] = name
+        assert saver.submit("oturum:s1", dict(form), build)
+    assert manager.saves == []
+
+    wait_for(lambda: manager.load_student("s1") is not None)
+    saver.stop()
+    assert manager.saves == ["Ali"]
+    assert manager.load_student("s1").name == "Ali"
+
+
+def test_unchanged_form_is_not_saved_again(manager):
+    saver = AutoSaver(manager, delay=60, max_delay=60)
+    form = {"id": "s1", "name": "Ali", "version": 0}
+    saver.save_now("oturum:s1", form, build)
+    assert form["version"] == 1
+
+    assert not saver.submit("oturum:s1", dict(form), build)
+    assert saver.is_saved("oturum:s1", form)
+    saver.stop()
+    assert manager.saves == ["Ali"]
+
+
+def test_continuous_edits_are_saved_by_max_delay(manager):
+    saver = AutoSaver(manager, delay=0.2, max_delay=0.5)
+    start = time.monotonic()
+    while not manager.saves:
+        assert time.monotonic() - start < 5
+        saver.submit("oturum:s1", {"id": "s1", "name": f"Ali {time.monotonic()}", "version": 0}, build)
+        time.sleep(0.05)
+    assert time.monotonic() - start < 2
+    saver.stop()
+
+
+def test_flush_and_end_session_write_pending_forms(manager):
+    saver = AutoSaver(manager, delay=60, max_delay=60)
+    saver.submit("a:s1", {"id": "s1", "name": "Ali", "version": 0}, build)
+    saver.submit("b:s2", {"id": "s2", "name": "Ayşe", "version": 0}, build)
+
+    assert saver.end_session("a:") == 1
+    assert manager.saves == ["Ali"] and saver.has_pending("b:s2")
+    assert saver.flush() == 1
+    assert manager.saves == ["Ali", "Ayşe"]
+    saver.stop()
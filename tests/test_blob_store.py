@@ -0,0 +1,85 @@
+import os
+import time
+
+import pytest
+
+from blob_store import BlobStore
+from storage import JsonStorage
+from student_streamable import AIInsight, Config, Student
+
+LONG = "uzun ödev metni " * 200
+
+
+def blob_files(data_dir):
+    root = os.path.join(data_dir, Config.BLOB_DIR)
+    return sorted(name for _dir, _subdirs, names in os.walk(root) for name in names)
+
+
+@pytest.fixture
+def no_grace(monkeypatch):
+    monkeypatch.setattr(Config, "BLOB_GC_GRACE", 0.0)
+
+
+def test_same_text_is_stored_once_and_compressed(tmp_path):
+    store = BlobStore(str(tmp_path))
+    key = store.put(LONG)
+    assert store.put(LONG) == key
+
+    names = [name for _dir, _subdirs, names in os.walk(tmp_path) for name in names]
+    assert len(names) == 1
+    assert os.path.getsize(os.path.join(tmp_path, key[:2], names[0])) < len(LONG.encode("utf-8"))
+    assert BlobStore(str(tmp_path)).get(key) == LONG
+
+
+def test_long_fields_are_stored_as_blobs(data_dir):
+    backend = JsonStorage(data_dir)
+    backend.save_student(Student(id="s1", name="Ali", class_name="9A", file_content=LONG))
+    backend.append_insight("s1", AIInsight(analysis=LONG + "analiz", model="m"), "2024-01-02 10:00:00")
+
+    with open(os.path.join(data_dir, "s1.json"), encoding="utf-8") as f:
+        assert LONG not in f.read()
+    student = JsonStorage(data_dir).load_student("s1")
+    assert student.file_content == LONG
+    assert student.ai_insights[0].analysis == LONG + "analiz"
+
+
+def test_replaced_content_removes_the_old_blob(data_dir, no_grace):
+    backend = JsonStorage(data_dir)
+    student = Student(id="s1", name="Ali", class_name="9A", file_content=LONG)
+    backend.save_student(student)
+    old = blob_files(data_dir)
+
+    student.file_content = LONG + "yeni"
+    backend.save_student(student)
+    new = blob_files(data_dir)
+    assert len(new) == 1 and new != old
+    assert backend.load_student("s1").file_content == LONG + "yeni"
+
+
+def test_delete_keeps_blobs_shared_with_other_students(data_dir, no_grace):
+    backend = JsonStorage(data_dir)
+    backend.save_student(Student(id="s1", name="Ali", class_name="9A", file_content=LONG))
+    backend.save_student(Student(id="s2", name="Ayşe", class_name="9A", file_content=LONG))
+    backend.append_insight("s1", AIInsight(analysis=LONG + "analiz", model="m"), "2024-01-02 10:00:00")
+    backend.append_insight("s2", AIInsight(analysis=LONG + "analiz", model="m"), "2024-01-02 10:00:00")
+    assert len(blob_files(data_dir)) == 2
+
+    backend.delete_student("s1")
+    assert len(blob_files(data_dir)) == 2
+    student = backend.load_student("s2")
+    assert student.file_content == LONG
+    assert student.ai_insights[0].analysis == LONG + "analiz"
+
+    backend.delete_student("s2")
+    assert blob_files(data_dir) == []
+
+
+def test_recently_used_blobs_survive_collection(data_dir):
+    backend = JsonStorage(data_dir)
+    key = backend.blobs.put(LONG)
+    assert backend.collect_blobs() == 0
+
+    path = os.path.join(data_dir, Config.BLOB_DIR, key[:2], blob_files(data_dir)[0])
+    os.utime(path, (time.time() - Config.BLOB_GC_GRACE - 1,) * 2)
+    assert backend.collect_blobs() == 1
+    assert blob_files(data_dir) == []
@@ -0,0 +1,58 @@
+import io
+import os
+import zipfile
+
+from bulk_ingest import files_from_folder, files_from_zip, ingest_files, match_student
+from storage import JsonStorage
+from student_streamable import Student, StudentManager, StudentSummary
+
+
+def make_zip(files):
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w") as archive:
+        for name, text in files.items():
+            archive.writestr(name, text)
+    return out.getvalue()
+
+
+def test_match_prefers_the_class_in_the_folder_name():
+    summaries = [StudentSummary(id="a", name="Ali Yılmaz", class_name="9A"),
+                 StudentSummary(id="b", name="Ali Yılmaz", class_name="9B")]
+    assert match_student("9B/ali_yilmaz.txt", summaries)[0].id == "b"
+    assert match_student("ali_yilmaz_9A.txt", summaries)[0].id == "a"
+    summary, error = match_student("ali_yilmaz.txt", summaries)
+    assert summary is None and "Birden fazla" in error
+    assert match_student("odevler/b.txt", summaries)[0].id == "b"
+
+
+def test_same_file_name_in_different_folders(data_dir):
+    manager = StudentManager(JsonStorage(data_dir))
+    manager.save_student(Student(id="a", name="Ali", class_name="9A"))
+    manager.save_student(Student(id="b", name="Ali", class_name="9B"))
+    files = files_from_zip(make_zip({"9A/ali.txt": "9A ödevi", "9B/ali.txt": "9B ödevi",
+                                     "__MACOSX/9A/._ali.txt": "x", "notlar.xlsx": "x"}))
+    assert [name for name, _ in files] == ["9A/ali.txt", "9B/ali.txt"]
+
+    results = ingest_files(manager, files, workers=2)
+    assert [(r.filename, r.student_id, r.error) for r in results] == [
+        ("9A/ali.txt", "a", None), ("9B/ali.txt", "b", None)]
+    assert manager.load_student("a").file_content == "9A ödevi"
+    assert manager.load_student("b").file_content == "9B ödevi"
+
+
+def test_files_of_one_student_are_joined_in_path_order(data_dir, tmp_path, monkeypatch):
+    cwd = tmp_path / "cwd"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+    manager = StudentManager(JsonStorage(data_dir))
+    manager.save_student(Student(id="s1", name="Ayşe Kaya", class_name="10B"))
+    folder = tmp_path / "odevler"
+    for name, text in {"b/ayse_kaya.txt": "ikinci", "a/ayse_kaya.txt": "birinci", "a/mehmet.txt": "?"}.items():
+        os.makedirs(folder / os.path.dirname(name), exist_ok=True)
+        (folder / name).write_text(text, encoding="utf-8")
+
+    results = ingest_files(manager, files_from_folder(str(folder)), workers=1)
+    errors = {r.filename: r.error for r in results}
+    assert errors == {"a/ayse_kaya.txt": None, "a/mehmet.txt": "Eşleşen öğrenci bulunamadı", "b/ayse_kaya.txt": None}
+    assert manager.load_student("s1").file_content == "birinci\n\nikinci"
+    assert os.listdir(cwd) == []  # işçiler testin veri klasörünü kullanır
@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from autosave import AutoSaver
+from storage import JsonStorage, SQLiteStorage
+from student_streamable import AIInsight, Grade, Student, StudentManager, VersionConflictError
+
+
+def form_to_student(data):
+    return Student(id=data["id"], name=data["name"], class_name=data["class_name"],
+                   grades=[Grade(subject=k, score=v) for k, v in data["notes"].items()],
+                   ai_insights=[AIInsight(**i) for i in data["ai_insights"]],
+                   version=data["version"])
+
+
+def student_to_form(student):
+    return {"id": student.id, "name": student.name, "class_name": student.class_name,
+            "notes": {g.subject: g.score for g in student.grades},
+            "ai_insights": [{"analysis": i.analysis, "model": i.model, "date": i.date, "stats": i.stats}
+                            for i in student.ai_insights],
+            "version": student.version}
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def manager(request, data_dir):
+    if request.param == "json":
+        backend = JsonStorage(data_dir)
+    else:
+        backend = SQLiteStorage(os.path.join(data_dir, "students.db"))
+    yield StudentManager(backend)
+    backend.close()
+
+
+@pytest.fixture
+def autosaver(manager):
+    saver = AutoSaver(manager, delay=60, max_delay=60)
+    yield saver
+    saver.stop()
+
+
+def test_appended_insight_survives_repeated_saves_of_stale_form(manager, autosaver):
+    manager.save_student(Student(id="s1", name="Ali", class_name="9A"))
+    form_a = student_to_form(manager.load_student("s1"))
+
+    # B oturumu A'nın formu açıkken analiz ve not ekler
+    manager.append_insight("s1", AIInsight(analysis="insight from B", model="m", date="2024-01-01 10:00"))
+    manager.append_grade("s1", Grade(subject="Fizik", score=70))
+
+    form_a["name"] = "Ali Veli"
+    autosaver.save_now("a:s1", form_a, form_to_student)
+    form_a["class_name"] = "9B"
+    autosaver.save_now("a:s1", form_a, form_to_student)
+
+    stored = manager.load_student("s1")
+    assert [i.analysis for i in stored.ai_insights] == ["insight from B"]
+    assert {g.subject: g.score for g in stored.grades} == {"Fizik": 70}
+    assert (stored.name, stored.class_name) == ("Ali Veli", "9B")
+
+
+def test_merged_changes_are_handed_to_the_form_once(manager, autosaver):
+    manager.save_student(Student(id="s1", name="Ali", class_name="9A"))
+    form_a = student_to_form(manager.load_student("s1"))
+    manager.append_insight("s1", AIInsight(analysis="insight from B", model="m", date="2024-01-01 10:00"))
+
+    form_a["name"] = "Ali Veli"
+    autosaver.save_now("a:s1", form_a, form_to_student)
+    insights, grades = autosaver.take_merged("a:s1")
+    assert [i.analysis for i in insights] == ["insight from B"] and grades == []
+    assert autosaver.take_merged("a:s1") == ([], [])
+
+    # Form analizi aldıktan sonraki kayıtlar onu kendi içeriği olarak yazar
+    form_a["ai_insights"].append({"analysis": "insight from B", "model": "m", "date": "2024-01-01 10:00",
+                                  "stats": {}})
+    form_a["class_name"] = "9B"
+    autosaver.save_now("a:s1", form_a, form_to_student)
+    assert [i.analysis for i in manager.load_student("s1").ai_insights] == ["insight from B"]
+    assert autosaver.take_merged("a:s1") == ([], [])
+
+
+def test_two_sessions_saving_in_turn_keep_each_others_insights(manager, autosaver):
+    manager.save_student(Student(id="s1", name="Ali", class_name="9A"))
+    form_a = student_to_form(manager.load_student("s1"))
+    form_b = student_to_form(manager.load_student("s1"))
+
+    form_b["ai_insights"].append({"analysis": "insight from B", "model": "m", "date": "2024-01-01 10:00",
+                                  "stats": {}})
+    autosaver.save_now("b:s1", form_b, form_to_student)
+
+    # A'nın formu eski sürümde kaldığı için çakışır; güncel hali yükleyip devam eder
+    with pytest.raises(VersionConflictError):
+        autosaver.save_now("a:s1", form_a, form_to_student)
+    form_a = student_to_form(manager.load_student("s1"))
+    autosaver.mark_saved("a:s1", form_a)
+
+    manager.append_insight("s1", AIInsight(analysis="insight from A", model="m", date="2024-01-01 11:00"))
+    form_b["name"] = "Ali Veli"
+    autosaver.save_now("b:s1", form_b, form_to_student)
+    form_b["class_name"] = "9B"
+    autosaver.save_now("b:s1", form_b, form_to_student)
+
+    assert [i.analysis for i in manager.load_student("s1").ai_insights] == ["insight from B", "insight from A"]
@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+pd = pytest.importorskip("pandas")
+
+from data_export import _partition_name, export_parquet, read_parquet_table  # noqa: E402
+from storage import JsonStorage  # noqa: E402
+from student_streamable import AIInsight, Grade, Student, StudentManager  # noqa: E402
+
+
+@pytest.fixture
+def manager(data_dir):
+    manager = StudentManager(JsonStorage(data_dir))
+    manager.save_student(Student(id="s1", name="Ali", class_name="9A", grades=[Grade("Matematik", 80)],
+                                 ai_insights=[AIInsight(analysis="iyi", model="m", date="2024-01-01")]))
+    manager.save_student(Student(id="s2", name="Ayşe", class_name="10B", grades=[Grade("Türkçe", 90)]))
+    return manager
+
+
+def test_partitioned_dataset_reads_back_with_class_names(manager, tmp_path):
+    out_dir = str(tmp_path / "export")
+    export_parquet(manager, out_dir)
+
+    students = pd.read_parquet(os.path.join(out_dir, "students"))
+    assert {row.id: row.class_name for row in students.itertuples()} == {"s1": "9A", "s2": "10B"}
+
+    grades = pq.read_table(os.path.join(out_dir, "grades")).to_pylist()
+    assert sorted((r["student_id"], r["class_name"], r["subject"]) for r in grades) == [
+        ("s1", "9A", "Matematik"), ("s2", "10B", "Türkçe")]
+
+    insights = read_parquet_table(out_dir, "ai_insights").to_pylist()
+    assert [(r["student_id"], r["class_name"], r["analysis"]) for r in insights] == [("s1", "9A", "iyi")]
+
+
+def test_students_without_class_read_back_as_null(manager, tmp_path):
+    manager.save_student(Student(id="s3", name="Can", class_name="", grades=[Grade("Fen", 70)]))
+    out_dir = str(tmp_path / "export")
+    export_parquet(manager, out_dir)
+
+    assert os.path.isdir(os.path.join(out_dir, "students", "class_name=__HIVE_DEFAULT_PARTITION__"))
+    # Hive okuyucusu sınıfsız öğrenciyi düşürmez, sınıfını null verir
+    rows = pq.read_table(os.path.join(out_dir, "students")).to_pylist()
+    assert {r["id"]: r["class_name"] for r in rows} == {"s1": "9A", "s2": "10B", "s3": None}
+
+    students = read_parquet_table(out_dir, "students").to_pandas()
+    assert students.loc[students["id"] == "s3", "class_name"].isna().all()
+    grades = pd.read_parquet(os.path.join(out_dir, "grades"), partitioning="hive",
+                             filters=[("class_name", "=", "10B")])
+    assert grades["student_id"].tolist() == ["s2"]
+
+
+def test_output_from_the_old_layout_is_rewritten(manager, tmp_path):
+    out_dir = str(tmp_path / "export")
+    export_parquet(manager, out_dir)
+    with open(os.path.join(out_dir, "_export_state.json"), "w", encoding="utf-8") as f:
+        f.write('{"class_name=9A": {}}')
+    os.makedirs(os.path.join(out_dir, "students", "__HIVE_DEFAULT_PARTITION__"))
+
+    report = export_parquet(manager, out_dir)
+    partitions = sorted([_partition_name("10B"), _partition_name("9A")])
+    assert sorted(report.written) == partitions
+    assert sorted(os.listdir(os.path.join(out_dir, "students"))) == partitions
+
+
+def test_appended_insight_is_exported_after_restart(manager, data_dir, tmp_path):
+    import storage
+
+    out_dir = str(tmp_path / "export")
+    export_parquet(manager, out_dir)
+    manager.backend.append_insight("s2", AIInsight(analysis="yeni", model="m", date="2024-01-02"),
+                                   "2099-01-01 00:00:00")
+
+    storage._INDEXES.clear()
+    report = export_parquet(StudentManager(JsonStorage(data_dir)), out_dir)
+    assert report.written == [_partition_name("10B")]
+    rows = read_parquet_table(out_dir, "ai_insights").to_pylist()
+    assert sorted(r["analysis"] for r in rows) == ["iyi", "yeni"]
+
+
+def test_saves_within_the_same_second_are_exported(manager, tmp_path):
+    out_dir = str(tmp_path / "export")
+    student = manager.load_student("s1")
+    student.last_updated = "2024-01-01 10:00:00"
+    manager.backend.save_student(student)
+    export_parquet(manager, out_dir)
+
+    # last_updated aynı kalır; değişiklik revision ile fark edilir
+    student = manager.load_student("s1")
+    student.name = "Ali Veli"
+    manager.backend.save_student(student)
+    report = export_parquet(manager, out_dir)
+    assert report.written == [_partition_name("9A")]
+    assert "Ali Veli" in read_parquet_table(out_dir, "students").column("name").to_pylist()
+
+
+def test_similar_class_names_get_separate_partitions(data_dir, tmp_path):
+    manager = StudentManager(JsonStorage(data_dir))
+    classes = ["9/A", "9_A", "9A", "9a", "Çalışkanlar 5-B", "%41"]
+    for i, class_name in enumerate(classes):
+        manager.save_student(Student(id=f"s{i}", name=f"Öğrenci {i}", class_name=class_name,
+                                     grades=[Grade("Fen", 50 + i)]))
+    out_dir = str(tmp_path / "export")
+    report = export_parquet(manager, out_dir)
+
+    assert len(report.written) == len(classes)
+    assert len({p.lower() for p in os.listdir(os.path.join(out_dir, "students"))}) == len(classes)
+    rows = read_parquet_table(out_dir, "grades").to_pylist()
+    assert {r["student_id"]: r["class_name"] for r in rows} == {f"s{i}": c for i, c in enumerate(classes)}
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+import response_cache
+from batch_analysis import BatchAnalysisRunner
+from document_analysis import _summarize
+from storage import JsonStorage
+from student_streamable import AIService, OllamaClient, Student, StudentManager
+from tests.fake_ollama import FakeOllama, serve_in_thread
+
+
+@pytest.fixture
+def ollama(data_dir, monkeypatch):
+    """Paylaşılan OllamaClient'ı sahte sunucuya yönlendirir; dönen nesnenin ayarları testte değiştirilebilir."""
+    fake = FakeOllama(tokens=("Öğrenci ", "konuyu ", "iyi ", "anlamış."))
+    monkeypatch.setattr(response_cache, "_cache", None)
+    with serve_in_thread(fake):
+        monkeypatch.setattr(OllamaClient, "_instance", OllamaClient(base_url=fake.url))
+        yield fake
+
+
+def generate(prompt="ödev"):
+    service = AIService()
+    service.configure("Ollama", "fake")
+    text = "".join(service.generate_stream(prompt, "sistem"))
+    return service, text
+
+
+def test_complete_stream_has_no_error(ollama):
+    service, text = generate()
+    assert text == "Öğrenci konuyu iyi anlamış."
+    assert service.generation_error(text) is None
+
+
+def test_stream_dropped_midway_is_an_error(ollama):
+    ollama.drop_after = 2
+    service, text = generate()
+    # Gelen parçalar ve sonda bağlantı hatası: metin hata önekiyle başlamaz
+    assert text.startswith("Öğrenci konuyu ")
+    error = service.generation_error(text)
+    assert error is not None and "Bağlantı Hatası" in error
+
+
+def test_dropped_stream_is_not_cached(ollama):
+    ollama.drop_after = 2
+    generate()
+    ollama.drop_after = None
+    service, text = generate()
+    assert not service.last_from_cache and text == "Öğrenci konuyu iyi anlamış."
+
+
+def test_batch_marks_cut_off_analysis_as_failed(ollama, data_dir):
+    manager = StudentManager(JsonStorage(data_dir))
+    manager.save_student(Student(id="s1", name="Ali", class_name="9A", file_content="ödev"))
+    ollama.drop_after = 2
+
+    runner = BatchAnalysisRunner(manager, workers=1)
+    job_id = runner.start(["s1"], "fake")
+    deadline = time.monotonic() + 10
+    while runner.is_running(job_id) and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    job = next(j for j in runner.list_jobs() if j.id == job_id)
+    assert job.done == [] and "s1" in job.failed
+    assert "yarıda kesildi" in job.failed["s1"]
+    assert manager.load_student("s1").ai_insights == []
+
+
+def test_cut_off_chunk_summary_falls_back_to_the_chunk(ollama):
+    ollama.drop_after = 1
+    service = AIService()
+    service.configure("Ollama", "fake")
+    chunk = "Birinci paragraf. " * 50
+    assert _summarize(service, chunk, 1, 2, force=False) == chunk[:500]
+
+
+def test_batch_streams_run_concurrently_up_to_the_worker_limit(ollama, data_dir):
+    manager = StudentManager(JsonStorage(data_dir))
+    for i in range(5):
+        manager.save_student(Student(id=f"s{i}", name=f"Öğrenci {i}", class_name="9A", file_content="ödev"))
+    ollama.delay = 0.05
+
+    runner = BatchAnalysisRunner(manager, workers=2)
+    job_id = runner.start([f"s{i}" for i in range(5)], "fake")
+    deadline = time.monotonic() + 10
+    while runner.is_running(job_id) and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    job = next(j for j in runner.list_jobs() if j.id == job_id)
+    assert sorted(job.done) == [f"s{i}" for i in range(5)]
+    assert ollama.max_active == 2
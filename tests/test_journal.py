@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+
+import storage
+from storage import JsonStorage, SQLiteStorage
+from student_streamable import AIInsight, Grade, Student
+
+
+def restart(data_dir):
+    """Süreç yeniden başlamış gibi bellekteki özet önbelleğini atar."""
+    storage._INDEXES.clear()
+    return JsonStorage(data_dir)
+
+
+def test_appends_update_the_persisted_summary(data_dir):
+    backend = JsonStorage(data_dir)
+    backend.save_student(Student(id="s1", name="Ali", class_name="9A", last_updated="2024-01-01 10:00:00"))
+    backend.list_summaries()
+
+    backend.append_insight("s1", AIInsight(analysis="iyi", model="m"), "2024-01-02 10:00:00")
+    assert restart(data_dir).list_summaries()[0].last_updated == "2024-01-02 10:00:00"
+
+    backend = restart(data_dir)
+    backend.append_grade("s1", Grade(subject="Fen", score=70), "2024-01-03 10:00:00")
+    backend = restart(data_dir)
+    assert backend.list_summaries()[0].last_updated == "2024-01-03 10:00:00"
+    assert backend.load_student("s1").last_updated == "2024-01-03 10:00:00"
+
+
+def test_appends_do_not_rewrite_the_manifest(data_dir):
+    backend = JsonStorage(data_dir)
+    for i in range(3):
+        backend.save_student(Student(id=f"s{i}", name=f"Öğrenci {i}", class_name="9A"))
+    backend.list_summaries()
+    manifest = os.path.join(data_dir, storage.MANIFEST_FILE)
+    before = os.stat(manifest).st_mtime_ns
+
+    backend.append_insight("s1", AIInsight(analysis="iyi", model="m"), "2024-02-01 10:00:00")
+    backend.append_grade("s1", Grade(subject="Fen", score=70), "2024-02-02 10:00:00")
+    assert os.stat(manifest).st_mtime_ns == before
+    assert backend.list_summaries()[1].last_updated == "2024-02-02 10:00:00"
+    assert os.stat(manifest).st_mtime_ns == before
+
+
+def test_appends_from_another_process_are_seen_by_the_student_cache(data_dir):
+    backend = JsonStorage(data_dir)
+    backend.save_student(Student(id="s1", name="Ali", class_name="9A"))
+    backend.append_grade("s1", Grade(subject="Fen", score=70), "2024-02-01 10:00:00")
+    assert [g.subject for g in backend.get_all_students()[0].grades] == ["Fen"]
+
+    # Başka bir süreç günlüğe yazar: bu süreçteki önbellek bildirim almaz, yalnızca imza değişir
+    line = {"op": "grade", "data": {"subject": "Tarih", "score": 80}, "updated_at": "2024-02-02 10:00:00"}
+    with open(os.path.join(data_dir, "s1" + storage.JOURNAL_SUFFIX), "a", encoding="utf-8") as f:
+        f.write(json.dumps(line) + "\n")
+    assert [g.subject for g in backend.get_all_students()[0].grades] == ["Fen", "Tarih"]
+
+
+@pytest.mark.parametrize("kind", ["json", "sqlite"])
+def test_revision_changes_on_every_write(data_dir, kind):
+    backend = JsonStorage(data_dir) if kind == "json" else SQLiteStorage(os.path.join(data_dir, "students.db"))
+    student = Student(id="s1", name="Ali", class_name="9A", last_updated="2024-01-01 10:00:00")
+    backend.save_student(student)
+    seen = [backend.list_summaries()[0].revision]
+
+    # Aynı saniye içinde iki ekleme ve bir kayıt: last_updated değişmese de revision değişir
+    backend.append_grade("s1", Grade(subject="Fen", score=70), "2024-01-01 10:00:00")
+    seen.append(backend.list_summaries()[0].revision)
+    backend.append_grade("s1", Grade(subject="Tarih", score=80), "2024-01-01 10:00:00")
+    seen.append(backend.list_summaries()[0].revision)
+    backend.save_student(backend.load_student("s1"))
+    seen.append(backend.list_summaries()[0].revision)
+    assert len(set(seen)) == 4 and "" not in seen
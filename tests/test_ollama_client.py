@@ -0,0 +1,65 @@
+import time
+
+from tests.fake_ollama import FakeOllama, serve_in_thread
+from student_streamable import Config, OllamaClient
+
+
+def test_model_states_survive_a_failed_ps_query():
+    with serve_in_thread(FakeOllama(loaded_models=["gemma3"])) as fake:
+        client = OllamaClient(base_url=fake.url)
+        assert client.refresh()
+        assert client.model_state("gemma3") == "loaded"
+
+        fake.ps_status = 500
+        assert client.refresh()
+        assert client.model_state("gemma3") == "loaded"
+
+        fake.ps_status = 200
+        fake.loaded_models = []
+        client.refresh()
+        assert client.model_state("gemma3") == "unloaded"
+
+
+def test_model_states_are_kept_while_offline():
+    with serve_in_thread(FakeOllama(loaded_models=["gemma3"])) as fake:
+        client = OllamaClient(base_url=fake.url)
+        client.refresh()
+    assert not client.refresh()
+    assert client.model_state("gemma3") == "loaded"
+
+
+def wait_for_state(client, model, state):
+    deadline = time.monotonic() + 5
+    while client.model_state(model) != state and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return client.model_state(model)
+
+
+def test_failed_warm_up_is_not_retried_on_every_rerun(monkeypatch):
+    with serve_in_thread(FakeOllama()) as fake:
+        url = fake.url
+    client = OllamaClient(base_url=url)  # sunucu kapandı: bağlantı reddedilir
+    posts = []
+    original = client.session.post
+    monkeypatch.setattr(client.session, "post", lambda *a, **k: posts.append(a) or original(*a, **k))
+
+    client.warm_up("gemma3")
+    assert wait_for_state(client, "gemma3", "error") == "error"
+    for _ in range(5):  # rerun'lar
+        client.warm_up("gemma3")
+    assert client.model_state("gemma3") == "error" and len(posts) == 1
+
+    monkeypatch.setattr(Config, "WARMUP_RETRY_DELAY", 0.0)
+    client.warm_up("gemma3")
+    assert wait_for_state(client, "gemma3", "error") == "error"
+    assert len(posts) == 2
+
+
+def test_successful_warm_up_clears_the_failure(monkeypatch):
+    with serve_in_thread(FakeOllama()) as fake:
+        client = OllamaClient(base_url=fake.url)
+        client.mark_model("gemma3", "error")
+        monkeypatch.setattr(Config, "WARMUP_RETRY_DELAY", 0.0)
+        client.warm_up("gemma3")
+        assert wait_for_state(client, "gemma3", "loaded") == "loaded"
+    assert "gemma3" not in client._warmup_failed_at
@@ -0,0 +1,72 @@
+import io
+import time
+
+import pytest
+
+PyPDF2 = pytest.importorskip("PyPDF2")
+
+import pdf_extraction  # noqa: E402
+from tests.slow_pdf import fake_extract_range  # noqa: E402
+from student_streamable import Config  # noqa: E402
+
+
+def make_pdf(pages: int = 1) -> bytes:
+    writer = PyPDF2.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=100, height=100)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def test_stuck_ranges_do_not_time_out_the_rest(monkeypatch):
+    monkeypatch.setattr(Config, "PDF_PAGES_PER_TASK", 1)
+    monkeypatch.setattr(pdf_extraction, "_extract_range", fake_extract_range)
+
+    started = time.monotonic()
+    parts = pdf_extraction._extract_parallel(b"0,1", page_count=6, max_chars=10_000, page_timeout=1.0, workers=2)
+
+    assert parts == [pdf_extraction.SKIPPED_PAGE.format("1-1"), pdf_extraction.SKIPPED_PAGE.format("2-2"),
+                     "sayfa 3", "sayfa 4", "sayfa 5", "sayfa 6"]
+    assert time.monotonic() - started < 30
+
+
+def test_defaults_are_read_at_call_time(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pdf_extraction, "_extract_serial", lambda reader, count, max_chars, timeout: calls.append(
+        (max_chars, timeout)) or ["x" * 50])
+    monkeypatch.setattr(Config, "MAX_DOCUMENT_CHARS", 10)
+    monkeypatch.setattr(Config, "PDF_PAGE_TIMEOUT", 3.5)
+    monkeypatch.setattr(Config, "PDF_WORKERS", 1)
+
+    assert pdf_extraction.extract_pdf_text(make_pdf()) == "x" * 10
+    assert calls == [(10, 3.5)]
+
+
+
+def test_serial_reading_stops_at_the_first_stuck_page(monkeypatch):
+    read = []
+
+    def page_text(page):
+        read.append(page)
+        if len(read) == 2:
+            time.sleep(2)
+        return "metin"
+
+    monkeypatch.setattr(pdf_extraction, "_page_text", page_text)
+    text = pdf_extraction.extract_pdf_text(make_pdf(4), page_timeout=0.3, workers=1)
+
+    assert text == "metin\n" + pdf_extraction.SKIPPED_REST.format(2)
+    time.sleep(0.1)
+    assert len(read) == 2  # takılan thread okuyucuyu kullanırken sonraki sayfalar okunmadı
+
+
+def test_opening_a_stuck_pdf_times_out(monkeypatch):
+    def stuck_reader(stream):
+        time.sleep(2)
+
+    monkeypatch.setattr(pdf_extraction.PyPDF2, "PdfReader", stuck_reader)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError, match="PDF açılamadı"):
+        pdf_extraction.extract_pdf_text(make_pdf(), page_timeout=0.3)
+    assert time.monotonic() - started < 1.5
@@ -0,0 +1,134 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+import search_index
+import sqlite_lru
+from search_index import SearchIndex
+from storage import JsonStorage
+from student_streamable import AIInsight, Student, StudentManager
+
+
+@pytest.fixture
+def manager(data_dir):
+    return StudentManager(JsonStorage(data_dir))
+
+
+@pytest.fixture
+def index(manager, data_dir):
+    index = SearchIndex(manager, os.path.join(data_dir, "search_index.db"))
+    yield index
+    StudentManager._listeners.remove(index)
+
+
+def entry_rows(index):
+    with sqlite_lru.connect(index.path) as conn:
+        return conn.execute("SELECT id, kind, label FROM entries ORDER BY id").fetchall()
+
+
+def save_ali(manager, analyses=("Dikkat dağınıklığı gözlendi.",)):
+    student = Student(id="s1", name="Ali", class_name="9A",
+                      file_content="Kesirler konusunu ÇALIŞTIM. " * 100,
+                      ai_insights=[AIInsight(analysis=a, model="m", date=f"2024-01-0{i + 1}")
+                                   for i, a in enumerate(analyses)])
+    manager.save_student(student)
+    return student
+
+
+def test_search_folds_turkish(manager, index):
+    save_ali(manager)
+    hits = index.search("calistim")
+    assert [(h.student.id, h.kind, h.label) for h in hits] == [("s1", "ödev", "Ödev dosyası")]
+    assert index.search("DİKKAT")[0].label == "2024-01-01 · m"
+
+
+def test_search_does_not_load_records(manager, index, monkeypatch):
+    save_ali(manager)
+    index.sync()
+    monkeypatch.setattr(manager, "load_student", lambda student_id: pytest.fail("kayıt okundu"))
+    assert [h.student.name for h in index.search("kesirler")] == ["Ali"]
+
+
+def test_changes_from_another_process_are_found(manager, index, data_dir):
+    save_ali(manager)
+    assert index.search("geometri") == []
+    generation = index.generation
+
+    # Başka bir süreç yeni bir kayıt yazar; bu süreçte bildirim gelmez
+    other = Student(id="s2", name="Ayşe", class_name="9B", file_content="Geometri ödevi")
+    with open(os.path.join(data_dir, "s2.json"), "w", encoding="utf-8") as f:
+        json.dump(other.to_dict(), f)
+    assert [h.student.id for h in index.search("geometri")] == ["s2"]
+    assert index.generation > generation
+
+
+def test_index_keeps_no_copy_of_the_text(manager, index):
+    save_ali(manager)
+    with sqlite_lru.connect(index.path) as conn:
+        columns = [r[1] for r in conn.execute("PRAGMA table_info(entries)")]
+        bodies = conn.execute("SELECT body FROM docs").fetchall()
+    assert "original" not in columns
+    assert bodies and all(body is None for (body,) in bodies)
+
+
+def test_unchanged_texts_are_not_reindexed(manager, index, monkeypatch):
+    student = save_ali(manager)
+    before = entry_rows(index)
+
+    folded = []
+    monkeypatch.setattr(search_index, "fold_turkish", lambda text: folded.append(text) or text.lower())
+    student.name = "Ali Veli"
+    manager.save_student(student)
+    assert entry_rows(index) == before and folded == []
+
+    student.ai_insights.append(AIInsight(analysis="Yeni analiz", model="m", date="2024-02-01"))
+    manager.save_student(student)
+    assert folded == ["Yeni analiz"]
+    assert entry_rows(index)[:2] == before
+
+
+def test_removed_texts_stop_matching(manager, index):
+    student = save_ali(manager, analyses=("Dikkat dağınıklığı gözlendi.", "Sorumluluk sahibi."))
+    student.ai_insights = student.ai_insights[1:]
+    manager.save_student(student)
+    assert index.search("dikkat") == []
+    assert [h.kind for h in index.search("sorumluluk")] == ["analiz"]
+
+    manager.delete_student("s1")
+    assert index.search("sorumluluk") == [] and entry_rows(index) == []
+
+
+def test_stale_rows_trigger_a_rebuild(manager, index, monkeypatch):
+    monkeypatch.setattr(search_index, "CONTENTLESS_DELETE", False)
+    monkeypatch.setattr(search_index, "STALE_REBUILD_MIN", 0)
+    student = save_ali(manager, analyses=("Birinci", "İkinci", "Üçüncü"))
+    index.sync()
+    student.ai_insights = []
+    manager.save_student(student)
+
+    assert index.sync() == 1
+    with sqlite_lru.connect(index.path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM meta").fetchone()[0] == 0
+    assert [h.kind for h in index.search("kesirler")] == ["ödev"]
+    assert index.search("birinci") == [] and index.search("ikinci") == []
+
+
+def test_index_from_the_old_schema_is_rebuilt(manager, data_dir):
+    path = os.path.join(data_dir, "search_index.db")
+    save_ali(manager)
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE VIRTUAL TABLE docs USING fts5(body);
+        CREATE TABLE entries (id INTEGER PRIMARY KEY, student_id TEXT, kind TEXT, label TEXT, original TEXT);
+        CREATE TABLE indexed (student_id TEXT PRIMARY KEY, last_updated TEXT NOT NULL);
+    """)
+    conn.close()
+
+    index = SearchIndex(manager, path)
+    try:
+        assert index.sync() == 1
+        assert [h.kind for h in index.search("kesirler")] == ["ödev"]
+    finally:
+        StudentManager._listeners.remove(index)
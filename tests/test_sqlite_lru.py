@@ -0,0 +1,26 @@
+from extraction_cache import ExtractionCache
+from response_cache import ResponseCache
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.db"), max_bytes=10)
+    cache.put("a", "m", "1234")
+    cache.put("b", "m", "1234")
+    assert cache.get("a") == "1234"  # a artık b'den yeni
+
+    cache.put("c", "m", "1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1234" and cache.get("c") == "1234"
+    assert cache.stats() == {"entries": 2, "bytes": 8}
+
+
+def test_extraction_cache_evicts_on_disk(tmp_path):
+    path = str(tmp_path / "cache" / "extractions.db")
+    cache = ExtractionCache(path, max_bytes=10, memory_entries=0)
+    cache.put("a", "1234")
+    cache.put("b", "1234")
+    cache.get("a")
+    cache.put("c", "1234")
+
+    reopened = ExtractionCache(path, max_bytes=10, memory_entries=0)
+    assert [reopened.get(k) for k in "abc"] == ["1234", None, "1234"]
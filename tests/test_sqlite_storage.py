@@ -0,0 +1,60 @@
+import pytest
+
+from storage import JsonStorage, SQLiteStorage, VersionConflictError, migrate_json_to_sqlite
+from student_streamable import AIInsight, BehaviorNote, Grade, Student
+
+LONG = "uzun ödev metni " * 200
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "students.db")
+
+
+def make_student(student_id="s1"):
+    return Student(id=student_id, name="Ali", class_name="9A", file_content=LONG,
+                   grades=[Grade(subject="Fen", score=80)],
+                   behavior_notes=[BehaviorNote(note="Derse katıldı", type="olumlu")],
+                   ai_insights=[AIInsight(analysis="iyi", model="m", stats={"kelime": 3})])
+
+
+def test_round_trip_keeps_children_and_versions(db_path):
+    backend = SQLiteStorage(db_path)
+    student = make_student()
+    backend.save_student(student)
+    backend.append_grade("s1", Grade(subject="Mat", score=90), "2024-01-02 10:00:00")
+
+    loaded = backend.load_student("s1")
+    assert loaded.version == student.version == 1
+    assert loaded.file_content == LONG
+    assert [g.subject for g in loaded.grades] == ["Fen", "Mat"]
+    assert loaded.behavior_notes[0].note == "Derse katıldı"
+    assert loaded.ai_insights[0].stats == {"kelime": 3}
+    assert loaded.last_updated == "2024-01-02 10:00:00"
+
+    with pytest.raises(VersionConflictError):
+        backend.save_student(Student(id="s1", name="Ali", class_name="9A", version=0))
+    backend.close()
+
+
+def test_migration_copies_records_without_touching_cached_students(data_dir, db_path):
+    source = JsonStorage(data_dir)
+    source.save_student(make_student("s1"))
+    source.save_student(make_student("s2"))
+    source.append_insight("s1", AIInsight(analysis="günlükten", model="m"), "2024-01-02 10:00:00")
+
+    cached = {s.id: s for s in source.get_all_students()}
+    assert migrate_json_to_sqlite(data_dir, db_path) == 2
+    assert migrate_json_to_sqlite(data_dir, db_path) == 2
+
+    assert cached["s1"].version == 1
+    assert [i.analysis for i in cached["s1"].ai_insights] == ["iyi", "günlükten"]
+    # Önbellekteki nesne hâlâ JSON kaydıyla uyumlu, çakışmasız kaydedilebilir
+    source.save_student(cached["s1"])
+
+    target = SQLiteStorage(db_path)
+    migrated = target.load_student("s1")
+    assert migrated.file_content == LONG
+    assert [i.analysis for i in migrated.ai_insights] == ["iyi", "günlükten"]
+    assert sorted(s.id for s in target.list_summaries()) == ["s1", "s2"]
+    target.close()
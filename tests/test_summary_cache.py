@@ -0,0 +1,154 @@
+import json
+import os
+import time
+
+import pytest
+
+import extraction_cache
+import response_cache
+import search_index
+import storage
+from storage import JsonStorage
+from student_streamable import Student, StudentManager
+
+
+def settle(data_dir):
+    """Klasör zaman damgasını geçmişe çeker; önbelleğin güvendiği durumu taklit eder."""
+    old = time.time_ns() - 10 * storage.DIR_MTIME_SETTLE_NS
+    os.utime(data_dir, ns=(old, old))
+
+
+def count_scans(monkeypatch):
+    calls = []
+    original = JsonStorage._scan_files
+
+    def counting(self):
+        calls.append(1)
+        return original(self)
+
+    monkeypatch.setattr(JsonStorage, "_scan_files", counting)
+    return calls
+
+
+def count_loads(monkeypatch):
+    loaded = []
+    original = JsonStorage.load_student
+
+    def counting(self, student_id):
+        loaded.append(student_id)
+        return original(self, student_id)
+
+    monkeypatch.setattr(JsonStorage, "load_student", counting)
+    return loaded
+
+
+def test_get_all_students_reparses_only_changed_records(data_dir, monkeypatch):
+    backend = JsonStorage(data_dir)
+    for i in range(3):
+        backend.save_student(Student(id=f"s{i}", name=f"Öğrenci {i}", class_name="9A"))
+    first = {s.id: s for s in backend.get_all_students()}
+    loads = count_loads(monkeypatch)
+
+    assert [s.id for s in backend.get_all_students()] == ["s0", "s1", "s2"]
+    assert loads == []
+
+    # Başka bir süreç s1'i değiştirir, s2'yi siler
+    changed = Student(id="s1", name="Yeni Ad", class_name="9A", version=5)
+    with open(os.path.join(data_dir, "s1.json"), "w", encoding="utf-8") as f:
+        json.dump(changed.to_dict(), f)
+    os.remove(os.path.join(data_dir, "s2.json"))
+    students = {s.id: s for s in backend.get_all_students()}
+    assert loads == ["s1"]
+    assert students["s0"] is first["s0"]
+    assert students["s1"].name == "Yeni Ad"
+    assert "s2" not in students
+
+
+def test_summaries_come_from_the_manifest_after_restart(data_dir, monkeypatch):
+    backend = JsonStorage(data_dir)
+    for i in range(3):
+        backend.save_student(Student(id=f"s{i}", name=f"Öğrenci {i}", class_name="9A",
+                                     file_content="ödev " * 1000))
+    storage._INDEXES.clear()
+    loads = count_loads(monkeypatch)
+
+    backend = JsonStorage(data_dir)
+    assert [s.name for s in backend.list_summaries()] == ["Öğrenci 0", "Öğrenci 1", "Öğrenci 2"]
+    assert loads == []
+    assert backend.load_student("s1").file_content == "ödev " * 1000
+    assert loads == ["s1"]
+
+
+def test_sidebar_calls_scan_once_while_directory_unchanged(data_dir, monkeypatch):
+    backend = JsonStorage(data_dir)
+    for i in range(3):
+        backend.save_student(Student(id=f"s{i}", name=f"Öğrenci {i}", class_name="9A" if i else "9B"))
+    backend.list_summaries()
+    settle(data_dir)
+    scans = count_scans(monkeypatch)
+
+    for _ in range(2):  # iki rerun
+        assert backend.list_classes() == ["9A", "9B"]
+        assert backend.count_summaries(class_name="9A") == 2
+        assert [s.name for s in backend.list_summaries(offset=0, limit=2)] == ["Öğrenci 0", "Öğrenci 1"]
+    assert len(scans) == 1
+
+
+def test_external_changes_are_picked_up(data_dir, monkeypatch):
+    backend = JsonStorage(data_dir)
+    backend.save_student(Student(id="s1", name="Ali", class_name="9A"))
+    backend.list_summaries()
+    settle(data_dir)
+    backend.list_summaries()
+
+    # Başka bir süreç yeni bir öğrenci yazar: klasör damgası değişir
+    other = Student(id="s2", name="Ayşe", class_name="10B")
+    with open(os.path.join(data_dir, "s2.json"), "w", encoding="utf-8") as f:
+        json.dump(other.to_dict(), f)
+    assert [s.name for s in backend.list_summaries()] == ["Ali", "Ayşe"]
+
+    os.remove(os.path.join(data_dir, "s2.json"))
+    assert backend.list_classes() == ["9A"]
+
+
+def test_recent_directory_change_is_not_trusted(data_dir, monkeypatch):
+    backend = JsonStorage(data_dir)
+    backend.save_student(Student(id="s1", name="Ali", class_name="9A"))
+    backend.list_summaries()
+    scans = count_scans(monkeypatch)
+
+    backend.list_summaries()
+    backend.list_summaries()
+    assert len(scans) == 2
+
+
+@pytest.fixture
+def caches(data_dir, monkeypatch):
+    """Process genelindeki önbellekleri ve arama dizinini teste özel klasörde yeniden açar."""
+    monkeypatch.setattr(response_cache, "_cache", None)
+    monkeypatch.setattr(extraction_cache, "_cache", None)
+    monkeypatch.setattr(search_index, "_index", None)
+    yield
+    if search_index._index is not None:
+        StudentManager._listeners.remove(search_index._index)
+
+
+def test_reading_the_caches_does_not_force_a_rescan(data_dir, caches, monkeypatch):
+    backend = JsonStorage(data_dir)
+    backend.save_student(Student(id="s1", name="Ali", class_name="9A", file_content="Kesirler konusu"))
+    response_cache.get_response_cache().put("k", "m", "yanıt")
+    extraction_cache.get_extraction_cache().put("e", "metin")
+    assert search_index.get_search_index().search("kesirler")
+    backend.list_summaries()
+    settle(data_dir)
+    backend.list_summaries()
+    scans = count_scans(monkeypatch)
+
+    for _ in range(2):
+        assert response_cache.get_response_cache().get("k") == "yanıt"
+        assert extraction_cache.get_extraction_cache().get("e") == "metin"
+        assert search_index.get_search_index().search("kesirler")
+        backend.list_classes()
+        backend.list_summaries(offset=0, limit=25)
+    assert scans == []
+    assert sorted(os.listdir(data_dir)) == [".cache", "_manifest.json", "blobs", "s1.json"]